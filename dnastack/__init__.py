@@ -1,5 +1,29 @@
-from dnastack.client.collections.client import CollectionServiceClient  # noqa: F401
-from dnastack.client.data_connect import DataConnectClient  # noqa: F401
-from dnastack.client.drs import DrsClient  # noqa: F401
-from dnastack.client.models import ServiceEndpoint  # noqa: F401
-from dnastack.context.helper import use  # noqa: F401
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dnastack.client.collections.client import CollectionServiceClient  # noqa: F401
+    from dnastack.client.data_connect import DataConnectClient  # noqa: F401
+    from dnastack.client.drs import DrsClient  # noqa: F401
+    from dnastack.client.models import ServiceEndpoint  # noqa: F401
+    from dnastack.context.helper import use  # noqa: F401
+
+# NOTE: The public shortcuts are imported on first access so that lightweight entry points, e.g., the CLI daemon
+#       front-end, can import submodules without loading every service client.
+_LAZY_ATTRIBUTES = {
+    'CollectionServiceClient': 'dnastack.client.collections.client',
+    'DataConnectClient': 'dnastack.client.data_connect',
+    'DrsClient': 'dnastack.client.drs',
+    'ServiceEndpoint': 'dnastack.client.models',
+    'use': 'dnastack.context.helper',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES.keys())
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,5 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Optional, Dict, List, Iterable, Callable, Any
+from typing import Optional, Dict, List, Iterable, Callable, Any, Iterator
 
 from dnastack.alpha.app.publisher_helper.exceptions import NoCollectionError, TooManyCollectionsError
 from dnastack.alpha.app.publisher_helper.models import ItemType, BaseItemInfo, BlobInfo, TableInfo
@@ -108,7 +109,18 @@ class PerCollectionApiMixin:
             return BaseItemInfo(**row)
 
 
+def _to_sql_string(value: str) -> str:
+    """ Quote the value as a SQL string literal """
+    return "'" + value.replace("'", "''") + "'"
+
+
 class BlobApiMixin:
+    # The maximum number of IDs or names in each lookup query
+    BLOB_LOOKUP_CHUNK_SIZE = 500
+
+    # The maximum number of concurrent lookup queries
+    BLOB_LOOKUP_CONCURRENCY = 4
+
     def blob(self, *, id: Optional[str] = None, name: Optional[str] = None) -> Optional[Blob]:
         blobs = self.blobs(ids=[id] if id else [], names=[name] if name else [])
         if blobs:
@@ -117,32 +129,49 @@ class BlobApiMixin:
             return None
 
     def blobs(self, *, ids: Optional[List[str]] = None, names: Optional[List[str]] = None) -> Dict[str, Optional[Blob]]:
+        """
+        Get the blobs by IDs or names, keyed by the given IDs or names
+
+        The IDs or names are looked up in chunks of "BLOB_LOOKUP_CHUNK_SIZE" with concurrent queries, and then the
+        matching DRS objects are resolved in bulk. The unknown IDs or names are omitted from the result.
+        """
         assert ids or names, 'One of the arguments MUST be defined.'
 
         if ids:
-            conditions: str = ' OR '.join([
-                f"(id = '{id}')"
-                for id in ids
-            ])
+            column_name = 'id'
+            keys = list(dict.fromkeys(ids))
         elif names:
-            conditions: str = ' OR '.join([
-                f"(name = '{name}')"
-                for name in names
-            ])
+            column_name = 'name'
+            keys = list(dict.fromkeys(names))
         else:
             raise NotImplementedError()
 
-        collection: CollectionModel = self._collection
+        id_to_name_map: Dict[str, str] = dict()
+        for rows in self.__query_in_chunks(column_name, keys):
+            id_to_name_map.update({row['id']: row['name'] for row in rows})
 
-        id_to_name_map: Dict[str, str] = SimpleStream(
-            self.query(f"SELECT id, name FROM ({collection.itemsQuery}) WHERE {conditions}").load_data()
-        ).to_map(lambda row: row['id'], lambda row: row['name'])
+        blobs = self._drs.get_blobs(id_to_name_map.keys(), no_auth=self._no_auth)
 
         return {
-            id if ids is not None else id_to_name_map[id]: self._drs.get_blob(id)
+            id if ids else id_to_name_map[id]: blobs[id]
             for id in id_to_name_map.keys()
         }
 
+    def __query_in_chunks(self, column_name: str, keys: List[str]) -> Iterator[List[Dict[str, Any]]]:
+        collection: CollectionModel = self._collection
+        queries = [
+            f"SELECT id, name FROM ({collection.itemsQuery}) WHERE {column_name} IN "
+            f"({', '.join(_to_sql_string(key) for key in keys[offset:offset + self.BLOB_LOOKUP_CHUNK_SIZE])})"
+            for offset in range(0, len(keys), self.BLOB_LOOKUP_CHUNK_SIZE)
+        ]
+
+        if len(queries) == 1:
+            yield self.query(queries[0]).to_list()
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.BLOB_LOOKUP_CONCURRENCY, len(queries))) as pool:
+            yield from pool.map(lambda query: self.query(query).to_list(), queries)
+
     def _find_blob_by_name(self,
                            objectname: str,
                            column_name: str) -> Blob:
@@ -151,7 +180,7 @@ class BlobApiMixin:
         db_slug = collection.slugName.replace("-", "_")
 
         # language=sql
-        q = f"SELECT {column_name} FROM collections.{db_slug}._files WHERE name='{objectname}' LIMIT 1"
+        q = f"SELECT {column_name} FROM collections.{db_slug}._files WHERE name={_to_sql_string(objectname)} LIMIT 1"
 
         results = self.query(q)
         return self._drs.get_blob(next(results.load_data())[column_name], no_auth=self._no_auth)
\ No newline at end of file
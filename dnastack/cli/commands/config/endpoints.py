@@ -1,7 +1,10 @@
 import re
-from typing import Dict, List, Any, Optional, Tuple
+import sys
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Literal
 
 import click
+import yaml
 from imagination import container
 from pydantic import BaseModel
 
@@ -279,6 +282,47 @@ def unset_default(context: Optional[str],
     EndpointCommandHandler(context_name=context).unset_default(id)
 
 
+@formatted_command(
+    group=endpoint_command_group,
+    name='apply',
+    specs=[
+        ArgumentSpec(
+            name='edit_file',
+            arg_type=ArgumentType.POSITIONAL,
+            help='The JSON or YAML file with the list of edits, or "-" to read from the standard input.',
+            required=True,
+        ),
+        CONTEXT_ARG,
+    ]
+)
+def apply_endpoint_edits(context: Optional[str],
+                         edit_file: str):
+    """
+    Apply a list of endpoint edits in one go
+
+    Each edit is an object with "action" (add, remove, set, unset, set-default, or unset-default), "id", and,
+    depending on the action, "type", "property", and "value". The configuration is loaded and written only once.
+    If any edit fails, none of the edits are saved.
+    """
+    if edit_file == '-':
+        raw_edits = sys.stdin.read()
+    else:
+        with open(edit_file, 'r') as f:
+            raw_edits = f.read()
+
+    edits = [EndpointEdit(**edit) for edit in (yaml.load(raw_edits, Loader=yaml.SafeLoader) or [])]
+    EndpointCommandHandler(context_name=context).apply_edits(edits)
+    click.echo(f'Applied {len(edits)} edit(s)', err=True)
+
+
+class EndpointEdit(BaseModel):
+    action: Literal['add', 'remove', 'set', 'unset', 'set-default', 'unset-default']
+    id: str
+    type: Optional[str] = None
+    property: Optional[str] = None
+    value: Optional[Any] = None
+
+
 class EndpointCommandHandler:
     def __init__(self, context_name: Optional[str] = None):
         self.__logger = get_logger(type(self).__name__)
@@ -287,6 +331,54 @@ class EndpointCommandHandler:
         self.__config = self.__config_manager.load()
         self.__context_name = context_name
         self.__wrapper = ConfigurationWrapper(self.__config, context_name)
+        self.__available_properties: Optional[List[str]] = None
+        self.__save_deferred = False
+
+    @contextmanager
+    def batch(self):
+        """
+        Apply the changes in the block within one configuration transaction (see "ConfigurationManager.transaction")
+
+        The configuration is saved once at the end of the block. Nothing is saved if the block fails.
+        """
+        previous_config, previous_wrapper = self.__config, self.__wrapper
+        self.__save_deferred = True
+        try:
+            with self.__config_manager.transaction() as config:
+                self.__config = config
+                self.__wrapper = ConfigurationWrapper(config, self.__context_name)
+                yield self
+        except BaseException:
+            # Discard the partially applied changes.
+            self.__config, self.__wrapper = previous_config, previous_wrapper
+            raise
+        finally:
+            self.__save_deferred = False
+
+    def apply_edits(self, edits: Iterable[EndpointEdit]):
+        """ Apply the edits with one load and one save of the configuration """
+        with self.batch():
+            for edit in edits:
+                if edit.action == 'add':
+                    if not edit.type:
+                        raise ValueError(f'The "type" of the new endpoint "{edit.id}" is required.')
+                    self.add_endpoint(edit.id, edit.type)
+                elif edit.action == 'remove':
+                    self.remove_endpoint(edit.id)
+                elif edit.action in ('set', 'unset'):
+                    if not edit.property:
+                        raise ValueError(f'The "property" to {edit.action} on "{edit.id}" is required.')
+                    self.set_endpoint_property(edit.id,
+                                               edit.property,
+                                               None if edit.action == 'unset' or edit.value is None else str(edit.value))
+                elif edit.action == 'set-default':
+                    self.set_default(edit.id)
+                elif edit.action == 'unset-default':
+                    self.unset_default(edit.id)
+
+    def __save(self):
+        if not self.__save_deferred:
+            self.__config_manager.save(self.__config)
 
     def get_defaults(self):
         return self.__wrapper.defaults
@@ -301,7 +393,7 @@ class EndpointCommandHandler:
 
         context.defaults[self.__get_short_type(endpoint)] = id
 
-        self.__config_manager.save(wrapper.original)
+        self.__save()
 
     def unset_default(self, id: str):
         wrapper = self.__wrapper
@@ -313,7 +405,7 @@ class EndpointCommandHandler:
 
         del context.defaults[self.__get_short_type(endpoint)]
 
-        self.__config_manager.save(self.__wrapper.original)
+        self.__save()
 
     def reset(self):
         # Reset v4 model
@@ -323,13 +415,15 @@ class EndpointCommandHandler:
         self.__wrapper.original.defaults.clear()
         self.__wrapper.original.endpoints.clear()
         # Save the changes
-        self.__config_manager.save(self.__wrapper.original)
+        self.__save()
 
     def list_available_properties(self) -> List[str]:
         """ List all available configuration property """
-        return SimpleStream(self.__list_all_json_path(self.__schema)) \
-            .filter(lambda path: path not in ['id', 'adapter_type', 'mode', 'model_version']) \
-            .to_list()
+        if self.__available_properties is None:
+            self.__available_properties = SimpleStream(self.__list_all_json_path(self.__schema)) \
+                .filter(lambda path: path not in ['id', 'adapter_type', 'mode', 'model_version']) \
+                .to_list()
+        return self.__available_properties
 
     def list_endpoints(self):
         """ List all registered service endpoint """
@@ -383,7 +477,7 @@ class EndpointCommandHandler:
             context.defaults[short_type] = id
 
         # Save the configuration
-        self.__config_manager.save(self.__config)
+        self.__save()
 
     def set_endpoint_property(self, id: str, config_property: str, config_value: Optional[str]):
         """ Set the endpoint property """
@@ -416,7 +510,7 @@ class EndpointCommandHandler:
             JsonPath.set(endpoint, config_property, config_value)
 
         # Save the configuration
-        self.__config_manager.save(self.__config)
+        self.__save()
 
     def remove_endpoint(self, id: str):
         """ Remove an endpoint """
@@ -436,7 +530,7 @@ class EndpointCommandHandler:
                 del context.defaults[short_type]
 
         # Save the configuration
-        self.__config_manager.save(self.__config)
+        self.__save()
 
     @staticmethod
     def __convert_from_short_type_to_full_types(short_type: str) -> List[ServiceType]:
@@ -0,0 +1,10 @@
+from dnastack.cli.commands.daemon.commands import init_daemon_commands
+from dnastack.cli.core.group import formatted_group
+
+
+@formatted_group('daemon')
+def daemon_command_group():
+    """ Manage the background CLI daemon (used when DNASTACK_DAEMON is enabled) """
+
+# Initialize all commands
+init_daemon_commands(daemon_command_group)
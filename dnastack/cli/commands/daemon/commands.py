@@ -0,0 +1,83 @@
+import click
+from click import Group
+
+from dnastack.cli.core.command import formatted_command
+from dnastack.cli.core.command_spec import ArgumentSpec
+from dnastack.cli.daemon.protocol import get_socket_path, is_enabled
+from dnastack.cli.daemon.server import CliDaemon, DEFAULT_IDLE_TIMEOUT, send_control, start_in_background
+
+
+def init_daemon_commands(group: Group):
+    @formatted_command(
+        group=group,
+        name='start',
+        specs=[
+            ArgumentSpec(
+                name='idle_timeout',
+                arg_names=['--idle-timeout'],
+                help='Stop the daemon after being idle for this many seconds',
+                type=int,
+                default=DEFAULT_IDLE_TIMEOUT,
+            ),
+        ]
+    )
+    def start(idle_timeout: int = DEFAULT_IDLE_TIMEOUT):
+        """ Start the daemon in the background """
+        socket_path = get_socket_path()
+        status = send_control(socket_path, 'ping')
+        if status:
+            click.echo(f'The daemon is already running (PID {status["pid"]}).')
+            return
+
+        pid = start_in_background(socket_path, idle_timeout)
+        if pid is None:
+            click.secho('Failed to start the daemon.', fg='red', err=True)
+            raise SystemExit(1)
+
+        click.echo(f'The daemon is running (PID {pid}).')
+        if not is_enabled():
+            click.echo('Set DNASTACK_DAEMON=true and run the commands with "omics-daemon-client" to forward them to the '
+                       'daemon.')
+
+    @formatted_command(
+        group=group,
+        name='stop',
+        specs=[]
+    )
+    def stop():
+        """ Stop the daemon """
+        if send_control(get_socket_path(), 'stop'):
+            click.echo('The daemon is stopped.')
+        else:
+            click.echo('The daemon is not running.')
+
+    @formatted_command(
+        group=group,
+        name='status',
+        specs=[]
+    )
+    def status():
+        """ Show whether the daemon is running """
+        daemon_status = send_control(get_socket_path(), 'ping')
+        if daemon_status:
+            click.echo(f'The daemon is running (PID {daemon_status["pid"]}).')
+        else:
+            click.echo('The daemon is not running.')
+
+    @formatted_command(
+        group=group,
+        name='serve',
+        specs=[
+            ArgumentSpec(
+                name='idle_timeout',
+                arg_names=['--idle-timeout'],
+                help='Stop the daemon after being idle for this many seconds',
+                type=int,
+                default=DEFAULT_IDLE_TIMEOUT,
+            ),
+        ],
+        hidden=True,
+    )
+    def serve(idle_timeout: int = DEFAULT_IDLE_TIMEOUT):
+        """ Run the daemon in the foreground """
+        CliDaemon(get_socket_path(), idle_timeout=idle_timeout).serve_forever()
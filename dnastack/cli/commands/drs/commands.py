@@ -1,6 +1,8 @@
 import os
+import sys
+from contextlib import ExitStack
 from threading import Lock
-from typing import List, Dict, Optional
+from typing import List, Optional, Iterable
 
 import click
 from click import Group
@@ -9,7 +11,11 @@ from dnastack.cli.commands.drs.utils import _get
 from dnastack.cli.core.command import formatted_command
 from dnastack.cli.core.command_spec import ArgumentSpec, ArgumentType, CONTEXT_ARG, SINGLE_ENDPOINT_ID_ARG
 from dnastack.cli.helpers.printer import echo_result
-from dnastack.client.drs import DownloadOkEvent, DownloadFailureEvent, DownloadProgressEvent
+from dnastack.client.drs import DownloadOkEvent, DownloadFailureEvent, DownloadProgressEvent, DownloadScheduler, \
+    DownloadOrder
+from dnastack.common.leases import LeaseCoordinator
+from dnastack.common.progress import ProgressAggregator, ProgressSnapshot, format_byte_rate
+from dnastack.common.throttling import parse_byte_size
 from dnastack.feature_flags import in_interactive_shell
 
 
@@ -35,7 +41,13 @@ def init_drs_commands(group: Group):
             ArgumentSpec(
                 name='input_file',
                 arg_names=['-i', '--input-file'],
-                help='Input file',
+                help='Input file with one DRS ID or URL per line ("-" to read from the standard input)',
+                required=False,
+            ),
+            ArgumentSpec(
+                name='status_file',
+                arg_names=['--status-file'],
+                help='File to write the result of each download to, as JSON lines, as soon as it finishes',
                 required=False,
             ),
             ArgumentSpec(
@@ -44,6 +56,42 @@ def init_drs_commands(group: Group):
                 help='Output directory',
                 required=False,
             ),
+            ArgumentSpec(
+                name='concurrency',
+                arg_names=['--concurrency'],
+                help='Maximum number of concurrent downloads',
+                type=int,
+                required=False,
+            ),
+            ArgumentSpec(
+                name='max_rate',
+                arg_names=['--max-rate'],
+                help='Maximum download rate shared by all downloads, in bytes per second, e.g., 500K, 20M, or 1G',
+                required=False,
+            ),
+            ArgumentSpec(
+                name='order',
+                arg_names=['--order'],
+                help='Order of the downloads by the file sizes',
+                choices=[o.value for o in DownloadOrder],
+                required=False,
+            ),
+            ArgumentSpec(
+                name='coordination_dir',
+                arg_names=['--coordination-dir'],
+                help='Directory shared by the cooperating processes (possibly on different hosts) which download the '
+                     'same files. Each file is downloaded by only one of them, and the progress is recorded in the '
+                     'directory.',
+                required=False,
+            ),
+            ArgumentSpec(
+                name='lease_ttl',
+                arg_names=['--lease-ttl'],
+                help='Number of seconds after which the claim of a process on a file expires if the process stops '
+                     'renewing it, e.g., when it crashes (with --coordination-dir)',
+                type=int,
+                required=False,
+            ),
             ArgumentSpec(
                 name='no_auth',
                 arg_names=['--no-auth'],
@@ -61,26 +109,44 @@ def init_drs_commands(group: Group):
                  id_or_urls: List[str],
                  output_dir: str = os.getcwd(),
                  input_file: str = None,
+                 status_file: Optional[str] = None,
                  quiet: bool = False,
+                 concurrency: Optional[int] = None,
+                 max_rate: Optional[str] = None,
+                 order: str = DownloadOrder.LARGEST_FIRST.value,
+                 coordination_dir: Optional[str] = None,
+                 lease_ttl: Optional[int] = None,
                  no_auth: bool = False):
         """
         Download files with either DRS IDs or URLs, e.g., drs://<hostname>/<drs_id>.
 
+        A DRS bundle is downloaded into a directory named after it, which mirrors the tree of its contents.
+
         You can find out more about DRS URLs from the Data Repository Service Specification 1.1.0 at
         https://ga4gh.github.io/data-repository-service-schemas/preview/release/drs-1.1.0/docs/#_drs_uris.
         """
         output_lock = Lock()
-        download_urls = []
+        download_urls: Iterable[str] = []
         full_output = not quiet and in_interactive_shell
 
         if not output_dir:
             output_dir = os.getcwd()
 
+        try:
+            scheduler = DownloadScheduler(max_concurrency=concurrency,
+                                          max_bytes_per_second=parse_byte_size(max_rate) if max_rate else None,
+                                          order=DownloadOrder(order or DownloadOrder.LARGEST_FIRST))
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+        # The files are closed at the end of the command.
+        resources = ExitStack()
+
         if len(id_or_urls) > 0:
             download_urls = list(id_or_urls)
         elif input_file:
-            with open(input_file, "r") as infile:
-                download_urls = filter(None, infile.read().split("\n"))  # need to filter out invalid values
+            # The lines are read lazily so that the manifest is never loaded in memory as a whole.
+            download_urls = sys.stdin if input_file == '-' else resources.enter_context(open(input_file, "r"))
         else:
             if in_interactive_shell:
                 click.echo("Enter one or more URLs. Press q to quit")
@@ -96,6 +162,9 @@ def init_drs_commands(group: Group):
 
                 download_urls.append(url)
 
+        status_output = resources.enter_context(open(status_file, 'w')) if status_file else None
+        coordinator = LeaseCoordinator(coordination_dir, ttl=lease_ttl or 60) if coordination_dir else None
+
         drs = _get(context, endpoint_id)
 
         def display_ok(event: DownloadOkEvent):
@@ -119,32 +188,44 @@ def init_drs_commands(group: Group):
         drs.events.on('download-ok', display_ok)
         drs.events.on('download-failure', display_failure)
 
-        stats: Dict[str, DownloadProgressEvent] = {}
+        # The handlers run on one thread so that the download workers neither block on the terminal output nor race on
+        # the progress state. Only the latest pending progress of each file is delivered.
+        drs.events.start_async_delivery(['download-progress', 'download-ok', 'download-failure'],
+                                        {'download-progress': lambda e: e.details.get('drs_url')})
 
         if not full_output:
-            drs._download_files(id_or_urls=download_urls,
-                                output_dir=output_dir,
-                                no_auth=no_auth)
+            try:
+                drs._download_files(id_or_urls=download_urls,
+                                    output_dir=output_dir,
+                                    no_auth=no_auth,
+                                    scheduler=scheduler,
+                                    status_output=status_output,
+                                    coordinator=coordinator)
+            finally:
+                drs.events.stop_async_delivery()
+                resources.close()
         else:
             with click.progressbar(label='Downloading...', color=True, length=1) as progress:
-                def update_progress(event: DownloadProgressEvent):
-                    stats[event.drs_url] = event
-
-                    # Update the progress bar.
-                    position = 0
-                    total = 0
-
-                    for e in stats.values():
-                        position += e.read_byte_count
-                        total += e.total_byte_count
+                def render_progress(snapshot: ProgressSnapshot):
+                    progress.pos = snapshot.overall.position
+                    progress.length = snapshot.overall.total if snapshot.overall.total > 0 else 1
+                    progress.label = f'Downloading... {format_byte_rate(snapshot.overall.throughput)}'
+                    progress.render_progress()
 
-                    progress.pos = position
-                    progress.length = total if total > 0 else 1
+                aggregator = ProgressAggregator(keep_completed=False).on_update(render_progress)
 
-                    progress.render_progress()
+                def update_progress(event: DownloadProgressEvent):
+                    aggregator.update(event.drs_url, event.read_byte_count, event.total_byte_count)
 
                 drs.events.on('download-progress', update_progress)
-                drs._download_files(id_or_urls=download_urls,
-                                    output_dir=output_dir,
-                                    no_auth=no_auth)
+                try:
+                    drs._download_files(id_or_urls=download_urls,
+                                        output_dir=output_dir,
+                                        no_auth=no_auth,
+                                        scheduler=scheduler,
+                                        status_output=status_output,
+                                        coordinator=coordinator)
+                finally:
+                    drs.events.stop_async_delivery()
+                    resources.close()
             print('DONE')
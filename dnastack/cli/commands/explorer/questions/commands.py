@@ -169,8 +169,5 @@ def init_questions_commands(group: Group):
             trace=trace
         )
         
-        # Collect results
-        results = list(results_iter)
-        
-        # Output results
-        handle_question_results_output(results, output_file, output)
\ No newline at end of file
+        # Output results as the pages are received
+        handle_question_results_output(results_iter, output_file, output)
\ No newline at end of file
@@ -1,7 +1,8 @@
 import csv
 import json
 import os
-from typing import Optional, Dict, Any, List
+import tempfile
+from typing import Optional, Dict, Any, List, Iterable
 
 import click
 from imagination import container
@@ -166,86 +167,123 @@ def flatten_result_for_export(result: Dict[str, Any]) -> Dict[str, Any]:
     return flattened
 
 
-def handle_question_results_output(results: List[Dict[str, Any]], output_file: Optional[str], output_format: str):
+def handle_question_results_output(results: Iterable[Dict[str, Any]],
+                                   output_file: Optional[str],
+                                   output_format: str) -> int:
     """
     Handle output of question results to file or stdout.
-    
+
+    The results are written as they are iterated, so that the first rows are shown as soon as they are received
+    and the memory usage does not grow with the number of results.
+
     Args:
-        results: List of result dictionaries
+        results: Iterable of result dictionaries
         output_file: Optional file path to write to
         output_format: Output format (json, csv, yaml, etc.)
+
+    Returns:
+        int: The number of results
     """
     if output_file:
-        write_results_to_file(results, output_file, output_format)
+        row_count = write_results_to_file(results, output_file, output_format)
         click.echo(f"Results written to {output_file}")
+        return row_count
     else:
         # Use show_iterator for consistent output handling
-        show_iterator(
+        return show_iterator(
             output_format=output_format,
             iterator=results
         )
 
 
-def write_results_to_file(results: List[Dict[str, Any]], output_file: str, output_format: str):
+def write_results_to_file(results: Iterable[Dict[str, Any]], output_file: str, output_format: str) -> int:
     """
     Write results to file in the specified format.
-    
+
     Args:
-        results: List of result dictionaries
+        results: Iterable of result dictionaries
         output_file: File path to write to
         output_format: Output format (json, csv, yaml)
+
+    Returns:
+        int: The number of written results
     """
     # Ensure output directory exists
     output_dir = os.path.dirname(output_file)
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    
+
     if output_format == 'json':
-        _write_json_results(results, output_file)
+        return _write_json_results(results, output_file)
     elif output_format == 'csv':
-        _write_csv_results(results, output_file)
+        return _write_csv_results(results, output_file)
     elif output_format == 'yaml':
-        _write_yaml_results(results, output_file)
+        return _write_yaml_results(results, output_file)
+    else:
+        return 0
 
 
-def _write_json_results(results: List[Dict[str, Any]], output_file: str):
-    """Write results as JSON."""
+def _write_json_results(results: Iterable[Dict[str, Any]], output_file: str) -> int:
+    """Write results as a JSON array, one result at a time."""
+    row_count = 0
     with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+        for result in results:
+            f.write(',\n' if row_count else '[\n')
+            encoded = json.dumps(result, indent=2, default=str)
+            f.write('\n'.join(f'  {line}' for line in encoded.split('\n')))
+            row_count += 1
+        f.write('\n]' if row_count else '[]')
+    return row_count
 
 
-def _write_csv_results(results: List[Dict[str, Any]], output_file: str):
-    """Write results as CSV with flattened structure."""
-    # Flatten all results
-    flattened_results = [flatten_result_for_export(result) for result in results]
-    
-    if not flattened_results:
-        # Write empty file
-        with open(output_file, 'w') as f:
-            pass
-        return
-    
-    # Get all possible column headers
+def _write_csv_results(results: Iterable[Dict[str, Any]], output_file: str) -> int:
+    """
+    Write results as CSV with flattened structure.
+
+    As the columns are the union of the flattened keys of all results, which is only known after the last result,
+    the flattened results are spooled to a temporary file before writing the CSV file.
+    """
     all_headers = set()
-    for result in flattened_results:
-        all_headers.update(result.keys())
-    
-    headers = sorted(all_headers)
-    
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        
-        for result in flattened_results:
-            # Fill missing keys with empty strings
-            row = {header: result.get(header, '') for header in headers}
-            writer.writerow(row)
+    row_count = 0
+
+    with tempfile.TemporaryFile('w+') as spool:
+        for result in results:
+            flattened_result = flatten_result_for_export(result)
+            all_headers.update(flattened_result.keys())
+            spool.write(json.dumps(flattened_result, default=str) + '\n')
+            row_count += 1
+
+        if not row_count:
+            # Write empty file
+            with open(output_file, 'w') as f:
+                pass
+            return 0
+
+        headers = sorted(all_headers)
+
+        spool.seek(0)
+        with open(output_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=headers)
+            writer.writeheader()
+
+            for line in spool:
+                result = json.loads(line)
+                # Fill missing keys with empty strings
+                row = {header: result.get(header, '') for header in headers}
+                writer.writerow(row)
+
+    return row_count
+
 
+def _write_yaml_results(results: Iterable[Dict[str, Any]], output_file: str) -> int:
+    """Write results as a YAML list, one result at a time."""
+    from yaml import dump as to_yaml_string, SafeDumper
 
-def _write_yaml_results(results: List[Dict[str, Any]], output_file: str):
-    """Write results as YAML."""
+    row_count = 0
     with open(output_file, 'w') as f:
-        normalized_results = [normalize(result) for result in results]
-        from yaml import dump as to_yaml_string, SafeDumper
-        yaml_content = to_yaml_string(normalized_results, Dumper=SafeDumper, sort_keys=False)
-        f.write(yaml_content)
\ No newline at end of file
+        for result in results:
+            f.write(to_yaml_string([normalize(result)], Dumper=SafeDumper, sort_keys=False))
+            row_count += 1
+        if not row_count:
+            f.write(to_yaml_string([], Dumper=SafeDumper, sort_keys=False))
+    return row_count
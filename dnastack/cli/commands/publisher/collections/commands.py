@@ -159,25 +159,40 @@ def init_collections_commands(group: Group):
     def describe_collection(id_or_slugs: List[str]):
         """ View details of a specific collection """
         client = _get_collection_service_client()
+
         # Get unique collections by id, with the last occurrence taking precedence
-        unique_collections = {
-            collection.id: collection
-            for id_or_slug in id_or_slugs
-            for collection in [client.get(id_or_slug_name=id_or_slug)]
-        }
+        unique_collections = {}
+        failure_count = 0
+        for result in client.get_many(id_or_slugs):
+            if result.error:
+                failure_count += 1
+                click.echo(click.style(f'Error: Failed to get the collection "{result.idOrSlugName}". {result.error}',
+                                       fg='red'),
+                           err=True)
+            else:
+                unique_collections[result.collection.id] = result.collection
 
         click.echo(to_json(normalize(list(unique_collections.values()))))
 
+        if failure_count:
+            exit(1)
+
 
     @formatted_command(
         group=group,
         name='status',
         specs=[
-            COLLECTION_ID_ARG,
+            ArgumentSpec(
+                name='collections',
+                arg_names=['--collection', '-c'],
+                help='The ID or slug name of the target collection. Repeat this option to check multiple collections.',
+                required=True,
+                multiple=True,
+            ),
         ]
     )
-    def get_collection_status(collection: str):
-        """ Check status of a collection """
+    def get_collection_status(collections: List[str]):
+        """ Check status of one or more collections """
 
         def format_datetime(dt: Optional[datetime]) -> str:
             """Format datetime in the required format"""
@@ -231,5 +246,22 @@ def init_collections_commands(group: Group):
                 print_missing_items_hint(collection_id)
 
         client = _get_collection_service_client()
-        status = client.get_collection_status(collection_id_or_slug_name_or_db_schema_name=collection)
-        format_collection_status(status, collection)
+        results = client.get_collection_statuses(collections)
+
+        failure_count = 0
+        for index, result in enumerate(results):
+            if len(results) > 1:
+                if index > 0:
+                    click.echo()
+                click.secho(f"Collection: {result.idOrSlugName}", bold=True)
+
+            if result.error:
+                failure_count += 1
+                click.echo(click.style(f"Error: Failed to get the status of the collection \"{result.idOrSlugName}\". "
+                                       f"{result.error}", fg='red'),
+                           err=True)
+            else:
+                format_collection_status(result.status, result.idOrSlugName)
+
+        if failure_count:
+            exit(1)
@@ -10,10 +10,8 @@ from dnastack.cli.core.command import formatted_command
 from dnastack.cli.core.command_spec import ArgumentSpec, RESOURCE_OUTPUT_ARG
 from dnastack.cli.core.group import formatted_group
 from dnastack.cli.helpers.iterator_printer import show_iterator, OutputFormat
-from dnastack.client.collections.model import CreateCollectionItemsRequest, DeleteCollectionItemRequest, \
-    CollectionItemListOptions
+from dnastack.client.collections.model import DeleteCollectionItemsRequest, CollectionItemListOptions
 from dnastack.common.json_argument_parser import FileOrValue
-from dnastack.http.session import ClientError
 
 
 @formatted_group("items")
@@ -95,36 +93,66 @@ def list(collection: str,
             type=FileOrValue,
             required=True,
         ),
+        ArgumentSpec(
+            name='chunk_size',
+            arg_names=['--chunk-size'],
+            help='The maximum number of files submitted in each request.',
+            type=int,
+            default=1000,
+            required=False,
+        ),
+        ArgumentSpec(
+            name='checkpoint',
+            arg_names=['--checkpoint'],
+            help='The path to the file recording the submitted chunks. When the command is run again with the same '
+                 'files and checkpoint, the chunks already submitted are skipped.',
+            required=False,
+        ),
     ]
 )
 def add_files_to_collection(collection: str,
                             datasource: str,
-                            files: FileOrValue):
+                            files: FileOrValue,
+                            chunk_size: int = 1000,
+                            checkpoint: Optional[str] = None):
     """ Add files to a collection """
-    parsed_files = set(item.strip() for item in re.split(r'[,\n]', files.value()) if item.strip())
-    if not parsed_files:
-        click.echo("Error: No valid files provided. Please specify at least one file.", err=True)
-        return
+    assert chunk_size > 0, 'The chunk size (--chunk-size) must be positive.'
 
-    request = CreateCollectionItemsRequest(
-        dataSourceId=datasource,
-        sourceKeys=parsed_files,
-    )
+    client = _get_collection_service_client()
 
+    item_count = 0
+    failed_item_count = 0
     try:
-        client = _get_collection_service_client()
-        client.create_collection_items(
-            collection_id_or_slug_name_or_db_schema_name=collection,
-            create_items_request=request
-        )
-
-        click.echo("Adding items to collection...")
-        click.echo(f"Validation in progress. Run 'status --collection {collection}' for updates.")
-    except ClientError as error:
-        error_message = f"Error: Failed to add items to collection. Server returned status {error.response.status_code}"
-        click.echo(click.style(error_message, fg='red'), err=True)
+        for result in client.create_collection_items_in_chunks(
+                collection_id_or_slug_name_or_db_schema_name=collection,
+                data_source_id=datasource,
+                source_keys=files.iterate_items(),
+                max_chunk_item_count=chunk_size,
+                checkpoint_path=checkpoint,
+        ):
+            item_count += result.itemCount
+            if not result.created:
+                failed_item_count += result.itemCount
+                error_message = f"Error: Failed to add {result.itemCount} item(s) (chunk #{result.index + 1}) " \
+                                f"to collection. {result.error}"
+                click.echo(click.style(error_message, fg='red'), err=True)
+    except ValueError as error:
+        click.echo(click.style(f"Error: {error}", fg='red'), err=True)
+        exit(1)
+
+    if not item_count:
+        click.echo("Error: No valid files provided. Please specify at least one file.", err=True)
+        return
+
+    if failed_item_count:
+        click.echo(click.style(f"Failed to add {failed_item_count} out of {item_count} item(s).", fg='red'), err=True)
+        if checkpoint:
+            click.echo(f"Run the same command with '--checkpoint {checkpoint}' to retry the failed chunks.", err=True)
         exit(1)
 
+    click.echo("Adding items to collection...")
+    click.echo(f"Validation in progress. Run 'status --collection {collection}' for updates.")
+
 
 @formatted_command(
     group=items_command_group,
@@ -157,21 +185,25 @@ def remove_files_from_collection(collection: str,
         return
 
     client = _get_collection_service_client()
-    for file in parsed_files:
-        request = DeleteCollectionItemRequest(
-            dataSourceId=datasource,
-            sourceKey=file,
-        )
-
-        try:
-            client.delete_collection_items(
-                collection_id_or_slug_name_or_db_schema_name=collection,
-                delete_items_request=request
-            )
-        except ClientError as error:
-            error_message = f"Error: Failed to remove item '{file}' from collection. Server returned status {error.response.status_code}"
+    request = DeleteCollectionItemsRequest(
+        dataSourceId=datasource,
+        sourceKeys=sorted(parsed_files),
+    )
+
+    failure_count = 0
+    for result in client.delete_collection_items_in_bulk(
+            collection_id_or_slug_name_or_db_schema_name=collection,
+            delete_items_request=request
+    ):
+        if not result.deleted:
+            failure_count += 1
+            error_message = f"Error: Failed to remove item '{result.sourceKey}' from collection. {result.error}"
             click.echo(click.style(error_message, fg='red'), err=True)
-            return
+
+    if failure_count:
+        click.echo(click.style(f"Failed to remove {failure_count} out of {len(parsed_files)} item(s).", fg='red'),
+                   err=True)
+        exit(1)
 
     click.echo("Removing items from collection...")
     click.echo(f"Validation in progress. Run 'status --collection {collection}' for updates.")
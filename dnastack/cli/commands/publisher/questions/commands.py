@@ -162,11 +162,9 @@ def init_questions_commands(group: Group):
         row_count = None
         try:
             results_iter = client.ask_question(collection, question_name, inputs, trace=trace)
-            results = list(results_iter)
+            # The results are written as the pages are received.
+            row_count = handle_question_results_output(results_iter, output_file, output)
             outcome = 'success'
-            row_count = len(results)
         finally:
             if metrics_enabled:
                 submit_telemetry(client, question_name, collection, start_time_ns, time.time_ns(), outcome, row_count=row_count)
-
-        handle_question_results_output(results, output_file, output)
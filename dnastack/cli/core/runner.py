@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from typing import List, TextIO, Optional, Mapping
+
+import click
+
+
+def run_command(command: click.Command,
+                argv: List[str],
+                prog_name: str,
+                stdout: TextIO,
+                stderr: TextIO,
+                cwd: Optional[str] = None,
+                stdin: Optional[TextIO] = None,
+                environment: Optional[Mapping[str, str]] = None) -> int:
+    """
+    Run the command in the current process with the given streams
+
+    This is for running many commands in one process, e.g., the CLI daemon and the batch command. The standard input
+    is empty unless given. When the environment is given, it replaces the environment variables of the process for
+    the duration of the command.
+
+    :return: the exit code of the command
+    """
+    original_stdin = sys.stdin
+    original_cwd = os.getcwd() if cwd else None
+    original_environment = dict(os.environ) if environment is not None else None
+
+    try:
+        if cwd:
+            os.chdir(cwd)
+        if environment is not None:
+            os.environ.clear()
+            os.environ.update(environment)
+        sys.stdin = stdin if stdin is not None else io.StringIO()
+
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                command.main(args=argv, prog_name=prog_name, standalone_mode=True)
+                return 0
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    return e.code or 0
+                sys.stderr.write(f'{e.code}\n')
+                return 1
+            except Exception:
+                traceback.print_exc()
+                return 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+    finally:
+        sys.stdin = original_stdin
+        if original_environment is not None:
+            os.environ.clear()
+            os.environ.update(original_environment)
+        if original_cwd:
+            os.chdir(original_cwd)
@@ -0,0 +1,118 @@
+"""
+Thin front-end of the omics CLI
+
+This is the entry point of the "omics-daemon-client" script, which users opt into instead of "omics". When the daemon
+mode is enabled (DNASTACK_DAEMON=true) and a daemon is listening, the command is forwarded to the daemon, which
+already has the command tree, the configuration, and the connection pools loaded. Otherwise, or when the daemon
+declines the command, the command runs in this process as usual.
+
+This module is imported before anything else. Keep it limited to the standard library and the protocol module.
+"""
+import os
+import socket
+import struct
+import sys
+from typing import List, Optional
+
+from dnastack.cli.daemon.protocol import is_enabled, get_socket_path, send_json, \
+    send_frame, receive_frame, CHANNEL_REQUEST, CHANNEL_STDOUT, CHANNEL_STDERR, CHANNEL_EXIT, CHANNEL_REJECT, \
+    CHANNEL_STDIN_REQUEST, CHANNEL_STDIN
+
+# Commands that must always run in the current process
+_LOCAL_ONLY_COMMANDS = {'daemon'}
+
+_CONNECT_TIMEOUT_SECONDS = 0.5
+
+
+def run_via_daemon(argv: List[str], prog_name: str, socket_path: Optional[str] = None) -> Optional[int]:
+    """
+    Run the command with the daemon
+
+    :return: the exit code, or None if the daemon is unavailable or declined the command before producing any output.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(_CONNECT_TIMEOUT_SECONDS)
+        sock.connect(socket_path or get_socket_path())
+        sock.settimeout(None)
+    except OSError:
+        sock.close()
+        return None
+
+    stdin = getattr(sys.stdin, 'buffer', None)
+    stdout = sys.stdout.buffer
+    stderr = sys.stderr.buffer
+    output_received = False
+
+    try:
+        send_json(sock, CHANNEL_REQUEST, dict(argv=argv,
+                                              prog_name=prog_name,
+                                              cwd=os.getcwd(),
+                                              env=dict(os.environ),
+                                              tty=dict(stdin=_isatty(sys.stdin),
+                                                       stdout=_isatty(sys.stdout),
+                                                       stderr=_isatty(sys.stderr))))
+
+        while True:
+            frame = receive_frame(sock)
+
+            if frame is None:
+                break
+
+            channel, payload = frame
+
+            if channel == CHANNEL_STDOUT:
+                output_received = True
+                stdout.write(payload)
+                stdout.flush()
+            elif channel == CHANNEL_STDERR:
+                output_received = True
+                stderr.write(payload)
+                stderr.flush()
+            elif channel == CHANNEL_STDIN_REQUEST:
+                # The standard input is only read when the command asks for it, e.g., for a prompt.
+                send_frame(sock, CHANNEL_STDIN, _read(stdin, struct.unpack('!I', payload)[0]))
+            elif channel == CHANNEL_EXIT:
+                return struct.unpack('!i', payload)[0]
+            elif channel == CHANNEL_REJECT:
+                return None
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+    if not output_received:
+        return None
+
+    # The daemon disappeared in the middle of the command.
+    sys.stderr.write('The CLI daemon terminated unexpectedly.\n')
+    return 1
+
+
+def _isatty(stream) -> bool:
+    try:
+        return bool(stream and stream.isatty())
+    except (AttributeError, ValueError):
+        return False
+
+
+def _read(stream, size: int) -> bytes:
+    if stream is None:
+        return b''
+    try:
+        return stream.read1(size)
+    except (OSError, ValueError):
+        return b''
+
+
+def main():
+    argv = sys.argv[1:]
+    prog_name = os.path.basename(sys.argv[0])
+
+    if is_enabled() and not (argv and argv[0] in _LOCAL_ONLY_COMMANDS):
+        exit_code = run_via_daemon(argv, prog_name)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from dnastack.omics_cli import omics
+    omics()
@@ -0,0 +1,87 @@
+"""
+Wire protocol between the CLI front-end and the CLI daemon
+
+This module is imported by the thin front-end. Keep it limited to the standard library.
+"""
+import json
+import os
+import socket
+import struct
+from typing import Optional, Tuple, Dict, Any, Mapping
+
+from dnastack.constants import LOCAL_STORAGE_DIRECTORY
+
+DEFAULT_SOCKET_PATH = os.path.join(LOCAL_STORAGE_DIRECTORY, 'daemon.sock')
+
+# Frame channels
+CHANNEL_REQUEST = b'Q'
+CHANNEL_STDOUT = b'O'
+CHANNEL_STDERR = b'E'
+CHANNEL_EXIT = b'X'
+CHANNEL_REJECT = b'R'
+CHANNEL_STDIN_REQUEST = b'N'
+CHANNEL_STDIN = b'I'
+
+# The environment variables which are read once per process (e.g., the local storage directory, the proxies of the
+# connection pools, the time zone, and the locale), so they must be the same in the front-end and in the daemon
+_PROCESS_WIDE_VARIABLE_NAMES = {
+    'HOME', 'TMPDIR', 'TZ', 'LANG', 'LC_ALL', 'LC_CTYPE',
+    'HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'NO_PROXY', 'http_proxy', 'https_proxy', 'all_proxy', 'no_proxy',
+    'REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE', 'SSL_CERT_FILE', 'SSL_CERT_DIR',
+}
+_PROCESS_WIDE_VARIABLE_PREFIXES = ('DNASTACK_', 'AWS_')
+
+_HEADER = struct.Struct('!cI')
+
+
+def is_enabled() -> bool:
+    return str(os.getenv('DNASTACK_DAEMON') or '').lower() in ['1', 'true']
+
+
+def get_socket_path() -> str:
+    return os.getenv('DNASTACK_DAEMON_SOCKET') or DEFAULT_SOCKET_PATH
+
+
+def get_relevant_environment(environment: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+    """
+    The environment variables that change how the CLI behaves for the whole process. The daemon only serves matching
+    clients. The other variables are taken from the front-end for the duration of each command.
+    """
+    return {
+        k: v
+        for k, v in (os.environ if environment is None else environment).items()
+        if (k in _PROCESS_WIDE_VARIABLE_NAMES or k.startswith(_PROCESS_WIDE_VARIABLE_PREFIXES))
+        and k != 'DNASTACK_DAEMON'
+    }
+
+
+def send_frame(sock: socket.socket, channel: bytes, payload: bytes = b''):
+    sock.sendall(_HEADER.pack(channel, len(payload)) + payload)
+
+
+def send_json(sock: socket.socket, channel: bytes, content: Dict[str, Any]):
+    send_frame(sock, channel, json.dumps(content).encode('utf-8'))
+
+
+def receive_frame(sock: socket.socket) -> Optional[Tuple[bytes, bytes]]:
+    """ Receive one frame. Return None when the connection is closed. """
+    header = _receive_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    channel, length = _HEADER.unpack(header)
+    payload = _receive_exactly(sock, length) if length else b''
+    if payload is None:
+        return None
+    return channel, payload
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
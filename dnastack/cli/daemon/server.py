@@ -0,0 +1,240 @@
+"""
+Persistent CLI daemon
+
+The daemon keeps the command tree, the configuration, the authenticators, and the connection pools warm in memory and
+runs the commands forwarded by the thin front-end (see dnastack.cli.daemon.client). The commands run one at a time in
+the daemon process with their standard streams forwarded to and from the front-end. While a command is running, the
+daemon declines the other commands so that the front-end runs them in its own process.
+"""
+import io
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+from threading import Thread, Lock
+from time import sleep, time
+from typing import Optional, Dict, Any
+
+import click
+
+from dnastack.cli.core.runner import run_command
+from dnastack.cli.daemon.protocol import get_relevant_environment, send_frame, send_json, receive_frame, \
+    CHANNEL_REQUEST, CHANNEL_STDOUT, CHANNEL_STDERR, CHANNEL_EXIT, CHANNEL_REJECT, CHANNEL_STDIN_REQUEST, CHANNEL_STDIN
+from dnastack.common.logger import get_logger
+
+DEFAULT_IDLE_TIMEOUT = 1800  # seconds
+STARTUP_TIMEOUT = 10  # seconds
+ACCEPT_POLL_INTERVAL = 0.5  # seconds
+
+
+class _FrameWriter(io.RawIOBase):
+    """ Raw output stream which forwards everything written to the front-end as frames of the given channel """
+
+    def __init__(self, connection: socket.socket, channel: bytes, tty: bool = False):
+        super().__init__()
+        self.__connection = connection
+        self.__channel = channel
+        self.__tty = tty
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self.__tty
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        if data:
+            send_frame(self.__connection, self.__channel, data)
+        return len(data)
+
+
+class _FrameReader(io.RawIOBase):
+    """ Raw input stream which requests the standard input from the front-end only when the command reads it """
+
+    def __init__(self, connection: socket.socket, tty: bool = False):
+        super().__init__()
+        self.__connection = connection
+        self.__tty = tty
+        self.__ended = False
+
+    def readable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self.__tty
+
+    def readinto(self, b) -> int:
+        if self.__ended or not len(b):
+            return 0
+
+        send_frame(self.__connection, CHANNEL_STDIN_REQUEST, struct.pack('!I', len(b)))
+        frame = receive_frame(self.__connection)
+        if frame is None or frame[0] != CHANNEL_STDIN:
+            raise OSError('The front-end did not send the standard input.')
+
+        data = frame[1][:len(b)]
+        if not data:
+            self.__ended = True
+        b[:len(data)] = data
+        return len(data)
+
+
+class CliDaemon:
+    def __init__(self,
+                 socket_path: str,
+                 command: Optional[click.Command] = None,
+                 idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT):
+        self.__logger = get_logger(type(self).__name__)
+        self.__socket_path = socket_path
+        self.__command = command
+        self.__idle_timeout = idle_timeout
+        self.__environment = get_relevant_environment()
+        self.__running = False
+        self.__command_lock = Lock()
+        self.__last_active_at = time()
+
+    def serve_forever(self):
+        """ Serve the front-end until stopped or idle for longer than the idle timeout """
+        if self.__command is None:
+            from dnastack.omics_cli import omics
+            self.__command = omics
+
+        server = self.__bind()
+        self.__running = True
+        self.__logger.debug(f'Listening on {self.__socket_path}')
+
+        try:
+            while self.__running:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    if self.__is_idle_for_too_long():
+                        self.__logger.debug('Idle for too long. Shutting down.')
+                        break
+                    continue
+
+                self.__last_active_at = time()
+                Thread(target=self.__serve_connection, args=(connection,), daemon=True).start()
+        finally:
+            server.close()
+            if os.path.exists(self.__socket_path):
+                os.unlink(self.__socket_path)
+            # Let the running command finish.
+            with self.__command_lock:
+                pass
+
+    def stop(self):
+        self.__running = False
+
+    def __is_idle_for_too_long(self) -> bool:
+        return bool(self.__idle_timeout) \
+            and not self.__command_lock.locked() \
+            and time() - self.__last_active_at > self.__idle_timeout
+
+    def __serve_connection(self, connection: socket.socket):
+        with connection:
+            try:
+                self.__handle(connection)
+            except OSError as e:
+                self.__logger.debug(f'Lost the connection with the front-end: {e}')
+
+    def __bind(self) -> socket.socket:
+        os.makedirs(os.path.dirname(os.path.abspath(self.__socket_path)), exist_ok=True)
+        if os.path.exists(self.__socket_path):
+            os.unlink(self.__socket_path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.__socket_path)
+        # The socket runs commands with the credentials of the current user.
+        os.chmod(self.__socket_path, 0o600)
+        server.listen()
+        # Poll so that the daemon notices the stop request and the idle timeout while the commands are running.
+        server.settimeout(ACCEPT_POLL_INTERVAL)
+        return server
+
+    def __handle(self, connection: socket.socket):
+        frame = receive_frame(connection)
+        if frame is None or frame[0] != CHANNEL_REQUEST:
+            return
+
+        request: Dict[str, Any] = json.loads(frame[1])
+        control = request.get('control')
+
+        if control == 'ping':
+            send_json(connection, CHANNEL_EXIT, dict(pid=os.getpid()))
+        elif control == 'stop':
+            self.stop()
+            send_json(connection, CHANNEL_EXIT, dict(pid=os.getpid()))
+        elif get_relevant_environment(request.get('env') or {}) != self.__environment:
+            # The command must see the same environment as the one the daemon was started with.
+            send_frame(connection, CHANNEL_REJECT, b'environment mismatch')
+        elif not self.__command_lock.acquire(blocking=False):
+            # The commands share the standard streams, the working directory, and the environment of the process.
+            send_frame(connection, CHANNEL_REJECT, b'busy')
+        else:
+            try:
+                exit_code = self.__run(connection, request)
+            finally:
+                self.__last_active_at = time()
+                self.__command_lock.release()
+            send_frame(connection, CHANNEL_EXIT, struct.pack('!i', exit_code))
+
+    def __run(self, connection: socket.socket, request: Dict[str, Any]) -> int:
+        tty: Dict[str, bool] = request.get('tty') or {}
+        stdin = io.TextIOWrapper(io.BufferedReader(_FrameReader(connection, tty.get('stdin', False))), encoding='utf-8')
+        stdout = io.TextIOWrapper(_FrameWriter(connection, CHANNEL_STDOUT, tty.get('stdout', False)),
+                                  encoding='utf-8',
+                                  write_through=True)
+        stderr = io.TextIOWrapper(_FrameWriter(connection, CHANNEL_STDERR, tty.get('stderr', False)),
+                                  encoding='utf-8',
+                                  write_through=True)
+        return run_command(self.__command,
+                           request['argv'],
+                           request.get('prog_name') or 'omics',
+                           stdout,
+                           stderr,
+                           cwd=request['cwd'],
+                           stdin=stdin,
+                           environment=request.get('env'))
+
+
+def send_control(socket_path: str, control: str) -> Optional[Dict[str, Any]]:
+    """ Send a control request to the daemon. Return None if the daemon is not reachable. """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(STARTUP_TIMEOUT)
+            sock.connect(socket_path)
+            send_json(sock, CHANNEL_REQUEST, dict(control=control))
+            frame = receive_frame(sock)
+    except OSError:
+        return None
+
+    return json.loads(frame[1]) if frame and frame[0] == CHANNEL_EXIT else None
+
+
+def start_in_background(socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> Optional[int]:
+    """ Start the daemon as a detached process and wait until it is ready. Return the PID of the daemon. """
+    subprocess.Popen(
+        [sys.executable, '-m', 'dnastack.cli.daemon.server', socket_path, str(idle_timeout)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+    deadline = time() + STARTUP_TIMEOUT
+    while time() < deadline:
+        status = send_control(socket_path, 'ping')
+        if status:
+            return status['pid']
+        sleep(0.1)
+
+    return None
+
+
+if __name__ == '__main__':
+    CliDaemon(sys.argv[1], idle_timeout=float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_IDLE_TIMEOUT).serve_forever()
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import tempfile
+from threading import Lock
+from time import time
+from typing import Optional, Dict, Any, Callable
+
+from pydantic import BaseModel
+
+from dnastack.common.environments import env
+from dnastack.common.logger import get_logger
+from dnastack.constants import LOCAL_STORAGE_DIRECTORY
+
+
+class CachedCollection(BaseModel):
+    collection: Dict[str, Any]
+    etag: Optional[str] = None
+    lastModified: Optional[str] = None
+    cachedAt: float
+    identity: Optional[str] = None
+
+    def matches(self, id_or_slug_name: str, identity: Optional[str] = None) -> bool:
+        return self.identity == identity and id_or_slug_name in (self.collection.get('id'),
+                                                                 self.collection.get('slugName'),
+                                                                 self.collection.get('dbSchemaName'))
+
+    def get_validation_headers(self) -> Dict[str, str]:
+        """ Return the headers of the conditional request to revalidate this entry """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.lastModified:
+            headers['If-Modified-Since'] = self.lastModified
+        return headers
+
+
+class CollectionMetadataCache:
+    """
+    Cache of the collection metadata (ID, slug name, items query, etc.) of one collection service endpoint
+
+    The entries are fresh for "ttl" seconds. After that, they are kept with the validators of the response (ETag and
+    Last-Modified) so that the client can revalidate them with a conditional request instead of downloading them again.
+
+    The entries are kept apart by the identity under which the collections were fetched (e.g., the authentication or
+    the lack of it), as the visible collections depend on it.
+
+    When the file path is given, the entries are also stored in that file so that they are shared by the subsequent
+    CLI invocations. The file is replaced atomically and re-read before each update, so it can be shared by concurrent
+    processes (the last write wins). The file is only written when an entry is added, refreshed, or outdated.
+    """
+
+    MAX_ENTRY_COUNT = 1000
+
+    def __init__(self, path: Optional[str], ttl: float, clock: Callable[[], float] = time):
+        self._logger = get_logger(type(self).__name__)
+        self.__path = path
+        self.__ttl = ttl
+        self.__clock = clock
+        self.__lock = Lock()
+        self.__entries: Optional[Dict[str, CachedCollection]] = None
+
+    @property
+    def ttl(self) -> float:
+        return self.__ttl
+
+    @classmethod
+    def from_environment(cls, endpoint_url: str) -> Optional['CollectionMetadataCache']:
+        """
+        Create the cache of the endpoint configured with "DNASTACK_COLLECTION_CACHE_DIR" and
+        "DNASTACK_COLLECTION_CACHE_TTL", or None if the cache is disabled
+        """
+        ttl = float(env('DNASTACK_COLLECTION_CACHE_TTL',
+                        default='300',
+                        description='Number of seconds during which the collection metadata is reused without '
+                                    'revalidation (0 to disable the cache)'))
+        if ttl <= 0:
+            return None
+
+        directory = env('DNASTACK_COLLECTION_CACHE_DIR',
+                        default=os.path.join(LOCAL_STORAGE_DIRECTORY, 'cache', 'collections'),
+                        description='Directory of the cache of the collection metadata')
+        file_name = f'{hashlib.sha256(endpoint_url.encode()).hexdigest()}.json'
+
+        return cls(os.path.join(os.path.expanduser(directory), file_name), ttl)
+
+    def get(self, id_or_slug_name: str, identity: Optional[str] = None) -> Optional[CachedCollection]:
+        """ Return the entry, fresh or not, or None if the collection is not cached """
+        with self.__lock:
+            for entry in self.__load().values():
+                if entry.matches(id_or_slug_name, identity):
+                    return entry
+        return None
+
+    def is_fresh(self, entry: CachedCollection) -> bool:
+        return self.__clock() - entry.cachedAt < self.__ttl
+
+    def put(self,
+            collection: Dict[str, Any],
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None,
+            identity: Optional[str] = None):
+        key = collection.get('id') or collection.get('slugName')
+        if not key:
+            return
+
+        entry = CachedCollection(collection=collection,
+                                 etag=etag,
+                                 lastModified=last_modified,
+                                 cachedAt=self.__clock(),
+                                 identity=identity)
+
+        def add(entries: Dict[str, CachedCollection]) -> bool:
+            entries[f'{identity}/{key}' if identity else key] = entry
+            return True
+
+        self.__update(add)
+
+    def update(self,
+               collection: Dict[str, Any],
+               etag: Optional[str] = None,
+               last_modified: Optional[str] = None,
+               identity: Optional[str] = None):
+        """ Replace the cached entry of the collection if it is outdated. The collections not cached are ignored. """
+        key = collection.get('id') or collection.get('slugName')
+        entry = self.get(key, identity) if key else None
+        if entry is None or (entry.collection, entry.etag, entry.lastModified) == (collection, etag, last_modified):
+            return
+        self.put(collection, etag, last_modified, identity)
+
+    def refresh(self, entry: CachedCollection):
+        """ Mark the entry as fresh again, e.g., after the server confirms that it has not been modified """
+        self.put(entry.collection, entry.etag, entry.lastModified, entry.identity)
+
+    def invalidate(self, id_or_slug_name: str, identity: Optional[str] = None):
+        if self.get(id_or_slug_name, identity) is None:
+            return
+
+        def remove(entries: Dict[str, CachedCollection]) -> bool:
+            keys = [key for key, entry in entries.items() if entry.matches(id_or_slug_name, identity)]
+            for key in keys:
+                del entries[key]
+            return bool(keys)
+
+        self.__update(remove)
+
+    def clear(self):
+        def remove_all(entries: Dict[str, CachedCollection]) -> bool:
+            entries.clear()
+            return True
+
+        self.__update(remove_all)
+
+    def __update(self, change: Callable[[Dict[str, CachedCollection]], bool]):
+        """ Apply the change to the entries. The change returns false if it has nothing to save. """
+        with self.__lock:
+            # Re-read the file to keep the entries added by the other processes.
+            self.__entries = None
+            entries = self.__load()
+            if not change(entries):
+                return
+
+            while len(entries) > self.MAX_ENTRY_COUNT:
+                del entries[min(entries, key=lambda k: entries[k].cachedAt)]
+
+            self.__save(entries)
+
+    def __load(self) -> Dict[str, CachedCollection]:
+        if self.__entries is not None:
+            return self.__entries
+
+        self.__entries = {}
+
+        if self.__path and os.path.exists(self.__path):
+            try:
+                with open(self.__path, 'r') as f:
+                    self.__entries = {key: CachedCollection(**raw_entry) for key, raw_entry in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                self._logger.debug(f'Ignored the unreadable cache at {self.__path}: {e}')
+
+        return self.__entries
+
+    def __save(self, entries: Dict[str, CachedCollection]):
+        if not self.__path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.__path), prefix='.', suffix='.tmp')
+            with os.fdopen(file_descriptor, 'w') as f:
+                json.dump({key: entry.model_dump() for key, entry in entries.items()}, f)
+            os.replace(temp_path, self.__path)
+        except OSError as e:
+            # The cache is only an optimization.
+            self._logger.debug(f'Failed to update the cache at {self.__path}: {e}')
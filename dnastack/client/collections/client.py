@@ -1,21 +1,32 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, Future
 from pprint import pformat
-from typing import Dict, Any, List, Union, Optional, Iterator
+from time import sleep
+from typing import Dict, Any, List, Union, Optional, Iterator, Iterable, Set, Callable, Tuple
 from urllib.parse import urljoin
 
+import requests
 from pydantic import ValidationError
 
 from dnastack.client.base_client import BaseServiceClient
 from dnastack.client.base_exceptions import UnauthenticatedApiAccessError, UnauthorizedApiAccessError
+from dnastack.client.collections.cache import CollectionMetadataCache
 from dnastack.client.collections.model import Collection, CreateCollectionItemsRequest, DeleteCollectionItemRequest, \
     CollectionItem, CollectionItemListOptions, PageableApiError, CollectionItemListResponse, \
-    CollectionStatus, Question
+    CollectionStatus, Question, DeleteCollectionItemsRequest, CollectionItemDeletionResult, \
+    CollectionItemsChunkResult, CollectionLookupResult, CollectionStatusLookupResult
 from dnastack.client.data_connect import DATA_CONNECT_TYPE_V1_0
 from dnastack.client.models import ServiceEndpoint
 from dnastack.client.result_iterator import ResultLoader, InactiveLoaderError, ResultIterator
 from dnastack.client.service_registry.models import ServiceType
+from dnastack.common.model_mixin import JsonModelMixin
 from dnastack.common.tracing import Span
 # Feature: Support the service registry integration
 # Feature: Using both root and "singular" soon-to-be-deprecated per-collection data connect endpoints
+from dnastack.http.authenticators.factory import HttpAuthenticatorFactory
 from dnastack.http.session import ClientError, HttpSession, HttpError
 
 STANDARD_COLLECTION_SERVICE_TYPE_V1_0 = ServiceType(group='com.dnastack',
@@ -220,9 +231,99 @@ class QuestionQueryResultLoader(ResultLoader):
             return response_data.get('data', [])
 
 
+class CollectionItemsCheckpoint:
+    """
+    Record of the chunks of items already created, to resume an interrupted bulk creation
+
+    The chunks are identified by their positions in the input, so the checkpoint is only valid for the same input and
+    the same chunking settings (the "signature"). The digest of each completed chunk is recorded too, so that a
+    changed input is detected instead of skipping the wrong items.
+    """
+
+    def __init__(self, path: str, signature: Dict[str, Any]):
+        self.__path = path
+        self.__signature = signature
+        self.__lock = threading.Lock()
+        self.__completed_digests: Dict[int, str] = {}
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                content = json.load(f)
+            if content.get('signature') != signature:
+                raise ValueError(f'The checkpoint ({path}) was made for another collection, data source, or chunking '
+                                 f'settings.')
+            self.__completed_digests = {int(index): digest
+                                        for index, digest in (content.get('completedChunks') or {}).items()}
+
+    @staticmethod
+    def get_digest(chunk: List[str]) -> str:
+        return hashlib.sha256(json.dumps(chunk).encode('utf-8')).hexdigest()
+
+    def is_done(self, index: int, chunk: List[str]) -> bool:
+        """ Check if the chunk was created. Raise ValueError if another chunk was created at the same position. """
+        with self.__lock:
+            digest = self.__completed_digests.get(index)
+
+        if digest is None:
+            return False
+        elif digest != self.get_digest(chunk):
+            raise ValueError(f'The chunk #{index + 1} differs from the one recorded in the checkpoint ({self.__path}). '
+                             f'The checkpoint is only valid for the same input.')
+
+        return True
+
+    def mark_done(self, index: int, chunk: List[str]):
+        with self.__lock:
+            self.__completed_digests[index] = self.get_digest(chunk)
+            temp_path = f'{self.__path}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(dict(signature=self.__signature,
+                               completedChunks={str(i): self.__completed_digests[i]
+                                                for i in sorted(self.__completed_digests)}),
+                          f)
+            os.replace(temp_path, self.__path)
+
+
+def _iterate_chunks(source_keys: Iterable[str], max_item_count: int, max_byte_size: int) -> Iterator[List[str]]:
+    """ Group the source keys into chunks bounded by the number of items and the (approximate) size of the JSON """
+    chunk: Dict[str, None] = {}
+    byte_size = 0
+
+    for source_key in source_keys:
+        if source_key in chunk:
+            continue
+
+        item_byte_size = len(json.dumps(source_key)) + 1
+        if chunk and (len(chunk) >= max_item_count or byte_size + item_byte_size > max_byte_size):
+            yield list(chunk.keys())
+            chunk = {}
+            byte_size = 0
+
+        chunk[source_key] = None
+        byte_size += item_byte_size
+
+    if chunk:
+        yield list(chunk.keys())
+
+
 class CollectionServiceClient(BaseServiceClient):
     """Client for Collection API"""
 
+    # The HTTP statuses which indicate that the service does not implement the bulk deletion of the collection items
+    _BULK_DELETION_UNSUPPORTED_STATUS_CODES = (404, 405, 501)
+
+    # The maximum number of concurrent requests when looking up multiple collections
+    LOOKUP_CONCURRENCY = 8
+
+    # The initial delay (in seconds) between the retries of the failed requests, which doubles after each retry
+    RETRY_BACKOFF_BASE = 0.5
+
+    # Set to false once the service is known to not support the bulk deletion
+    _bulk_deletion_supported = True
+
+    # The cache of the collection metadata, initialized on demand (false if disabled)
+    _metadata_cache: Union[CollectionMetadataCache, bool, None] = None
+
     @staticmethod
     def get_adapter_type() -> str:
         return 'collections'
@@ -240,25 +341,83 @@ class CollectionServiceClient(BaseServiceClient):
     def _get_resource_url(self, id_or_slug_name: str, short_service_type: str):
         return self._get_single_collection_url(id_or_slug_name, f'/{short_service_type}')
 
-    def get(self, id_or_slug_name: str, no_auth: bool = False, trace: Optional[Span] = None) -> Collection:
-        """ Get a collection by ID or slug name """
+    @property
+    def metadata_cache(self) -> Optional[CollectionMetadataCache]:
+        """ The cache of the collection metadata of this endpoint, configured by the environment variables """
+        if self._metadata_cache is None:
+            self._metadata_cache = CollectionMetadataCache.from_environment(self.url) or False
+        return self._metadata_cache or None
+
+    @metadata_cache.setter
+    def metadata_cache(self, cache: Optional[CollectionMetadataCache]):
+        self._metadata_cache = cache or False
+
+    def get(self,
+            id_or_slug_name: str,
+            no_auth: bool = False,
+            trace: Optional[Span] = None,
+            use_cache: bool = False) -> Collection:
+        """
+        Get a collection by ID or slug name
+
+        :param use_cache: Reuse the cached collection if it is still fresh, or revalidate it with a conditional request.
+                          The cached collection may not reflect the latest changes, e.g., the item counts, so this is
+                          only suitable for the lookup of the stable metadata, e.g., the ID or the slug name. Without
+                          it, the cache is only written to replace an outdated entry.
+        """
         trace = trace or Span(origin=self)
         local_logger = trace.create_span_logger(self._logger)
+        cache = self.metadata_cache
+        cache_identity = self.__get_cache_identity(no_auth) if cache else None
+        cached_entry = cache.get(id_or_slug_name, cache_identity) if cache and use_cache else None
+
+        if cached_entry and cache.is_fresh(cached_entry):
+            local_logger.debug(f'Reusing the cached collection {id_or_slug_name}')
+            return Collection(**cached_entry.collection)
+
         with self.create_http_session(no_auth=no_auth) as session:
             try:
                 get_url = self._get_single_collection_url(id_or_slug_name)
-                get_response = session.get(get_url, trace_context=trace)
+                get_response = session.get(get_url,
+                                           headers=cached_entry.get_validation_headers() if cached_entry else None,
+                                           trace_context=trace)
+
+                if cached_entry and get_response.status_code == 304:
+                    local_logger.debug(f'The cached collection {id_or_slug_name} is not modified.')
+                    cache.refresh(cached_entry)
+                    return Collection(**cached_entry.collection)
+
                 try:
-                    return Collection(**get_response.json())
+                    raw_collection = get_response.json()
+                    collection = Collection(**raw_collection)
                 except Exception as e:
                     local_logger.error(f'The response from {get_url} is not a JSON string.')
                     local_logger.error(f'\nHTTP {get_response.status_code} (Content-Type: {get_response.headers.get("Content-Type")})\n\n{get_response.text}\n')
                     raise InvalidApiResponse() from e
+
+                if cache:
+                    cache_arguments = dict(etag=get_response.headers.get('ETag'),
+                                           last_modified=get_response.headers.get('Last-Modified'),
+                                           identity=cache_identity)
+                    if use_cache:
+                        cache.put(raw_collection, **cache_arguments)
+                    else:
+                        cache.update(raw_collection, **cache_arguments)
+
+                return collection
             except ClientError as e:
                 if e.response.status_code == 404:
+                    if cache:
+                        cache.invalidate(id_or_slug_name, cache_identity)
                     raise UnknownCollectionError(id_or_slug_name, trace) from e
                 raise e
 
+    def __get_cache_identity(self, no_auth: bool) -> str:
+        """ The identity under which the collections are cached, i.e., the authentication of the requests """
+        if no_auth:
+            return 'no-auth'
+        return JsonModelMixin.hash(HttpAuthenticatorFactory.get_unique_auth_info_list([self._endpoint]))
+
     def list_collections(self, no_auth: bool = False, trace: Optional[Span] = None) -> List[Collection]:
         """ List all available collections """
         trace = trace or Span(origin=self)
@@ -300,6 +459,69 @@ class CollectionServiceClient(BaseServiceClient):
                               trace_context=trace)
             return CollectionStatus(**res.json())
 
+    def get_many(self,
+                 id_or_slug_names: Iterable[str],
+                 no_auth: bool = False,
+                 max_concurrency: int = LOOKUP_CONCURRENCY,
+                 trace: Optional[Span] = None) -> List[CollectionLookupResult]:
+        """
+        Get multiple collections concurrently
+
+        The results are in the same order as the given IDs or slug names (without duplicates). The failed lookups are
+        reported in the results instead of raising an error.
+        """
+        trace = trace or Span(origin=self)
+        return [
+            CollectionLookupResult(idOrSlugName=id_or_slug_name, collection=collection, error=error)
+            for id_or_slug_name, collection, error in self.__look_up_concurrently(
+                id_or_slug_names,
+                lambda id_or_slug_name: self.get(id_or_slug_name, no_auth=no_auth, trace=trace),
+                max_concurrency
+            )
+        ]
+
+    def get_collection_statuses(self,
+                                collection_id_or_slug_names: Iterable[str],
+                                max_concurrency: int = LOOKUP_CONCURRENCY,
+                                trace: Optional[Span] = None) -> List[CollectionStatusLookupResult]:
+        """
+        Get the statuses of multiple collections concurrently
+
+        The results are in the same order as the given IDs or slug names (without duplicates). The failed lookups are
+        reported in the results instead of raising an error.
+        """
+        trace = trace or Span(origin=self)
+        return [
+            CollectionStatusLookupResult(idOrSlugName=id_or_slug_name, status=status, error=error)
+            for id_or_slug_name, status, error in self.__look_up_concurrently(
+                collection_id_or_slug_names,
+                lambda id_or_slug_name: self.get_collection_status(id_or_slug_name, trace=trace),
+                max_concurrency
+            )
+        ]
+
+    @staticmethod
+    def __look_up_concurrently(keys: Iterable[str],
+                               look_up: Callable[[str], Any],
+                               max_concurrency: int) -> List[Tuple[str, Any, Optional[str]]]:
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(unique_keys)))) as pool:
+            futures = [(key, pool.submit(look_up, key)) for key in unique_keys]
+
+            results = []
+            for key, future in futures:
+                try:
+                    results.append((key, future.result(), None))
+                except UnknownCollectionError:
+                    results.append((key, None, 'The collection does not exist.'))
+                except (HttpError, InvalidApiResponse) as e:
+                    results.append((key, None, str(e) or type(e).__name__))
+
+            return results
+
     def create_collection_items(self,
                                 collection_id_or_slug_name_or_db_schema_name: str,
                                 create_items_request: CreateCollectionItemsRequest,
@@ -311,6 +533,81 @@ class CollectionServiceClient(BaseServiceClient):
                          json=create_items_request.model_dump(), trace_context=trace)
             return None
 
+    def create_collection_items_in_chunks(self,
+                                          collection_id_or_slug_name_or_db_schema_name: str,
+                                          data_source_id: str,
+                                          source_keys: Iterable[str],
+                                          data_source_type: Optional[str] = None,
+                                          max_chunk_item_count: int = 1000,
+                                          max_chunk_byte_size: int = 1024 * 1024,
+                                          max_concurrency: int = 4,
+                                          max_attempts: int = 3,
+                                          checkpoint_path: Optional[str] = None,
+                                          trace: Optional[Span] = None) -> Iterator[CollectionItemsChunkResult]:
+        """
+        Add many items to a collection, yielding the result of each chunk as soon as it is known
+
+        The source keys are consumed lazily and submitted in chunks bounded by the number of items and the size of the
+        request, with up to "max_concurrency" concurrent requests. The duplicates within a chunk are skipped. Each chunk
+        is retried up to "max_attempts" times on the server errors, the throttling (HTTP 429), the connection errors,
+        and the timeouts.
+
+        When "checkpoint_path" is given, the created chunks are recorded in that file, and they are skipped when the
+        same input is submitted again with the same checkpoint, e.g., after an interruption or a failure. ValueError is
+        raised if the input differs from the one of the checkpoint.
+        """
+        trace = trace or Span(origin=self)
+        collection_id = collection_id_or_slug_name_or_db_schema_name
+        url = urljoin(self.url, f'collections/{collection_id}/items')
+        checkpoint = CollectionItemsCheckpoint(
+            checkpoint_path,
+            dict(collection=collection_id,
+                 dataSourceId=data_source_id,
+                 dataSourceType=data_source_type,
+                 maxChunkItemCount=max_chunk_item_count,
+                 maxChunkByteSize=max_chunk_byte_size)
+        ) if checkpoint_path else None
+
+        with self.create_http_session() as session:
+            def create(index: int, chunk: List[str]) -> CollectionItemsChunkResult:
+                request = CreateCollectionItemsRequest(dataSourceId=data_source_id,
+                                                       dataSourceType=data_source_type,
+                                                       sourceKeys=chunk)
+                try:
+                    attempts = self.__call_with_retries(
+                        lambda: session.post(url, json=request.model_dump(), trace_context=trace),
+                        max_attempts
+                    )
+                except (HttpError, requests.exceptions.RequestException) as e:
+                    return CollectionItemsChunkResult(index=index, itemCount=len(chunk), created=False,
+                                                      attempts=max_attempts, error=str(e))
+
+                if checkpoint:
+                    checkpoint.mark_done(index, chunk)
+
+                return CollectionItemsChunkResult(index=index, itemCount=len(chunk), created=True, attempts=attempts)
+
+            max_concurrency = max(max_concurrency, 1)
+
+            with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+                futures: Set[Future] = set()
+
+                for index, chunk in enumerate(_iterate_chunks(source_keys, max_chunk_item_count, max_chunk_byte_size)):
+                    if checkpoint and checkpoint.is_done(index, chunk):
+                        yield CollectionItemsChunkResult(index=index, itemCount=len(chunk), created=True, skipped=True)
+                        continue
+
+                    # Only a bounded number of chunks are kept in memory.
+                    if len(futures) >= max_concurrency * 2:
+                        done_futures, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done_futures:
+                            yield future.result()
+
+                    futures.add(pool.submit(create, index, chunk))
+
+                for future in as_completed(futures):
+                    yield future.result()
+
     def delete_collection_items(self,
                                 collection_id_or_slug_name_or_db_schema_name: str,
                                 delete_items_request: DeleteCollectionItemRequest,
@@ -331,6 +628,103 @@ class CollectionServiceClient(BaseServiceClient):
                            params=params, trace_context=trace)
             return None
 
+    def delete_collection_items_in_bulk(self,
+                                        collection_id_or_slug_name_or_db_schema_name: str,
+                                        delete_items_request: DeleteCollectionItemsRequest,
+                                        batch_size: int = 500,
+                                        max_concurrency: int = 8,
+                                        max_attempts: int = 3,
+                                        trace: Optional[Span] = None) -> Iterator[CollectionItemDeletionResult]:
+        """
+        Delete many items from a collection, yielding the result of each item as soon as it is known
+
+        The items are deleted in batches with the bulk deletion endpoint when the service supports it. Otherwise, they
+        are deleted one by one with up to "max_concurrency" concurrent requests. The requests failed with a server
+        error, a connection error, or a timeout, or throttled (HTTP 429), are retried up to "max_attempts" times with
+        exponential backoff.
+        """
+        trace = trace or Span(origin=self)
+        collection_id = collection_id_or_slug_name_or_db_schema_name
+        source_keys = list(dict.fromkeys(delete_items_request.sourceKeys))
+
+        with self.create_http_session() as session:
+            remaining_source_keys: List[str] = []
+
+            for offset in range(0, len(source_keys), batch_size):
+                batch = source_keys[offset:offset + batch_size]
+
+                if not self._bulk_deletion_supported:
+                    remaining_source_keys.extend(batch)
+                    continue
+
+                try:
+                    attempts = self.__call_with_retries(
+                        lambda: session.post(urljoin(self.url, f'collections/{collection_id}/items/bulk-delete'),
+                                             json=delete_items_request.model_copy(update=dict(sourceKeys=batch))
+                                             .model_dump(),
+                                             trace_context=trace),
+                        max_attempts
+                    )
+                except (HttpError, requests.exceptions.RequestException) as e:
+                    if isinstance(e, HttpError) \
+                            and e.response.status_code in self._BULK_DELETION_UNSUPPORTED_STATUS_CODES:
+                        self._logger.debug('The service does not support the bulk deletion of the collection items.')
+                        self._bulk_deletion_supported = False
+                        remaining_source_keys.extend(batch)
+                        continue
+                    for source_key in batch:
+                        yield CollectionItemDeletionResult(sourceKey=source_key, deleted=False, attempts=max_attempts,
+                                                           error=str(e))
+                    continue
+
+                for source_key in batch:
+                    yield CollectionItemDeletionResult(sourceKey=source_key, deleted=True, attempts=attempts)
+
+            if not remaining_source_keys:
+                return
+
+            def delete(source_key: str) -> CollectionItemDeletionResult:
+                params = {
+                    'dataSourceId': delete_items_request.dataSourceId,
+                    'dataSourceType': delete_items_request.dataSourceType,
+                    'sourceKey': source_key
+                }
+                if params['dataSourceType'] is None:
+                    del params['dataSourceType']
+
+                try:
+                    attempts = self.__call_with_retries(
+                        lambda: session.delete(urljoin(self.url, f'collections/{collection_id}/items'),
+                                               params=params, trace_context=trace),
+                        max_attempts
+                    )
+                    return CollectionItemDeletionResult(sourceKey=source_key, deleted=True, attempts=attempts)
+                except (HttpError, requests.exceptions.RequestException) as e:
+                    return CollectionItemDeletionResult(sourceKey=source_key, deleted=False, attempts=max_attempts,
+                                                        error=str(e))
+
+            with ThreadPoolExecutor(max_workers=max(max_concurrency, 1)) as pool:
+                for future in as_completed([pool.submit(delete, source_key) for source_key in remaining_source_keys]):
+                    yield future.result()
+
+    def __call_with_retries(self, call, max_attempts: int) -> int:
+        """
+        Make the call, retrying on the server errors, the throttling, the connection errors, and the timeouts. Return
+        the number of attempts.
+        """
+        for attempt in range(1, max_attempts + 1):
+            try:
+                call()
+                return attempt
+            except HttpError as e:
+                retriable = e.response.status_code == 429 or e.response.status_code >= 500
+                if not retriable or attempt == max_attempts:
+                    raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == max_attempts:
+                    raise
+            sleep(self.RETRY_BACKOFF_BASE * (2 ** (attempt - 1)))
+
     def delete_collection(self,
                           collection_id: str,
                           trace: Optional[Span] = None) -> None:
@@ -438,8 +832,9 @@ class CollectionServiceClient(BaseServiceClient):
                                      f'{type(collection).__name__}.')
 
             # While this part is not really necessary, it is designed as sanity check to ensure that the requested
-            # collection exists before providing the data-connect endpoint for the given collection.
-            existing_collection = self.get(collection_id, no_auth=no_auth)
+            # collection exists before providing the data-connect endpoint for the given collection. As the slug name
+            # rarely changes, the cached collection is used if available.
+            existing_collection = self.get(collection_id, no_auth=no_auth, use_cache=True)
             sub_endpoint.url = self._get_single_collection_url(existing_collection.slugName, '/data-connect/')
 
         if not no_auth and sub_endpoint.authentication:
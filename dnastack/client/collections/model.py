@@ -160,6 +160,28 @@ class DeleteCollectionItemRequest(BaseModel):
     sourceKey: str
 
 
+class DeleteCollectionItemsRequest(BaseModel):
+    dataSourceId: str
+    dataSourceType: Optional[str] = None
+    sourceKeys: List[str]
+
+
+class CollectionItemsChunkResult(BaseModel):
+    index: int
+    itemCount: int
+    created: bool
+    skipped: bool = False
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+class CollectionItemDeletionResult(BaseModel):
+    sourceKey: str
+    deleted: bool
+    attempts: int = 1
+    error: Optional[str] = None
+
+
 class CollectionValidationStatus(str, Enum):
     VALIDATED = 'VALIDATED'
     VALIDATION_STOPPED = 'VALIDATION_STOPPED'
@@ -176,3 +198,15 @@ class CollectionStatus(BaseModel):
     validationsStatus: CollectionValidationStatus
     lastChecked: Optional[datetime] = None
     missingItems: Optional[int] = None
+
+
+class CollectionLookupResult(BaseModel):
+    idOrSlugName: str
+    collection: Optional[Collection] = None
+    error: Optional[str] = None
+
+
+class CollectionStatusLookupResult(BaseModel):
+    idOrSlugName: str
+    status: Optional[CollectionStatus] = None
+    error: Optional[str] = None
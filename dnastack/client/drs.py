@@ -1,26 +1,45 @@
+import hashlib
+import io
+import json
 import os
 import re
+import shutil
 import threading
-from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
 from contextlib import AbstractContextManager
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
+from itertools import islice
 from io import TextIOWrapper
-from typing import Optional, List, Dict
-from urllib.parse import urlparse, urljoin
+from time import monotonic, time
+from typing import Optional, List, Dict, BinaryIO, Iterable, Iterator, Set, Tuple, Callable, TextIO, NamedTuple, \
+    TypeVar
+from urllib.parse import urlparse, urljoin, parse_qs
+from uuid import uuid4
 
+import requests
 import urllib3
 from pydantic import BaseModel, Field
 
 from .base_client import BaseServiceClient
 from .models import ServiceEndpoint
 from .service_registry.models import ServiceType
+from ..common.buffers import AdaptiveBuffer, MAX_BUFFER_SIZE
+from ..common.content_cache import ContentCache, ContentKey, SUPPORTED_ALGORITHMS
+from ..common.environments import env
 from ..common.events import Event
+from ..common.leases import LeaseCoordinator
 from ..common.logger import get_logger
+from ..common.throttling import ByteRateLimiter, AdaptiveConcurrencyLimiter
 from ..http.session import HttpSession, HttpError
 
 DRS_TYPE_V1_1 = ServiceType(group='org.ga4gh', artifact='drs', version='1.1.0')
 
+DEFAULT_DOWNLOAD_CONCURRENCY = int(env('DNASTACK_DRS_DOWNLOAD_CONCURRENCY',
+                                       default=8,
+                                       description='Maximum number of concurrent DRS downloads'))
+
 
 class MissingOptionalRequirementError(RuntimeError):
     """ Raised when a optional requirement is not available """
@@ -38,6 +57,10 @@ class DrsApiError(RuntimeError):
     """ Raised when the DRS server responds an error """
 
 
+class _LeaseLostError(RuntimeError):
+    """ Raised when the lease of a download has been reclaimed by another process """
+
+
 class NoUsableAccessMethodError(RuntimeError):
     """ Raised when there is no usable access methods """
 
@@ -145,6 +168,19 @@ class DrsObjectChecksum(BaseModel):
     type: Optional[str] = None
 
 
+class DrsObjectContents(BaseModel):
+    """ An item of the contents of a DRS bundle """
+    name: str
+    id: Optional[str] = None
+    drs_uri: Optional[List[str]] = None
+    contents: Optional[List['DrsObjectContents']] = None
+
+    @property
+    def reference(self) -> Optional[str]:
+        """ The DRS URL (preferred) or the ID of the referenced object """
+        return self.drs_uri[0] if self.drs_uri else self.id
+
+
 class DrsObject(BaseModel):
     """
     This is based on https://ga4gh.github.io/data-repository-service-schemas/preview/release/drs-1.1.0/docs/#_drsobject.
@@ -159,6 +195,7 @@ class DrsObject(BaseModel):
     updated_time: datetime
     size: int
     version: Optional[str] = None
+    contents: Optional[List[DrsObjectContents]] = None
 
     def __init__(self, **kwargs):
         # There is an issue in the API where a `[null]` value can be returned in place of the checksums list
@@ -166,6 +203,19 @@ class DrsObject(BaseModel):
         kwargs['checksums'] = [checksum for checksum in kwargs.get('checksums', []) if checksum]
         super().__init__(**kwargs)
 
+    @property
+    def is_bundle(self) -> bool:
+        # NOTE: Some servers return an empty list of contents for the blobs.
+        return self.contents is not None and (len(self.contents) > 0 or not self.access_methods)
+
+    def get_content_key(self) -> Optional[ContentKey]:
+        """ Get the key of the strongest checksum which can be verified locally, if any """
+        keys = [ContentKey.make(checksum.type, checksum.checksum) for checksum in self.checksums]
+        keys = [key for key in keys if key]
+        if not keys:
+            return None
+        algorithm_priorities = list(SUPPORTED_ALGORITHMS.keys())
+        return min(keys, key=lambda key: algorithm_priorities.index(key.algorithm))
 
 
 class DownloadOkEvent(Event):
@@ -227,16 +277,450 @@ class DownloadStatus(Enum):
 
     SUCCESS = 0
     FAIL = 1
+    SKIPPED = 2
+
+
+class DownloadReport:
+    """
+    Running summary of the downloads
+
+    Each result is written as a JSON line to the status output (if given) as soon as the download finishes. Only the
+    counts and the first few failures are kept in memory.
+    """
+
+    MAX_RECORDED_FAILURE_COUNT = 100
+
+    def __init__(self, status_output: Optional[TextIO] = None):
+        self.__lock = threading.Lock()
+        self.__status_output = status_output
+        self.__counts: Dict[DownloadStatus, int] = {status: 0 for status in DownloadStatus}
+        self.__failures: List[DRSException] = []
+
+    @property
+    def total_count(self) -> int:
+        return sum(self.__counts.values())
+
+    @property
+    def failure_count(self) -> int:
+        return self.__counts[DownloadStatus.FAIL]
+
+    @property
+    def failures(self) -> List[DRSException]:
+        """ The first failures (up to MAX_RECORDED_FAILURE_COUNT) """
+        return list(self.__failures)
+
+    def add(self, drs_id_or_url: str, status: DownloadStatus, message: str = '',
+            output_file_path: Optional[str] = None):
+        with self.__lock:
+            self.__counts[status] += 1
+
+            if status == DownloadStatus.FAIL and len(self.__failures) < self.MAX_RECORDED_FAILURE_COUNT:
+                self.__failures.append(DRSException(msg=message, url=drs_id_or_url))
+
+            if self.__status_output:
+                entry = dict(id_or_url=drs_id_or_url, status=status.name.lower(), message=message)
+                if output_file_path:
+                    entry['output_file_path'] = output_file_path
+                self.__status_output.write(json.dumps(entry) + '\n')
+                self.__status_output.flush()
+
+
+def _to_safe_file_name(name: Optional[str], fallback: Optional[str]) -> str:
+    """ Make the name usable as a file name which cannot escape its directory """
+    for candidate in (name, fallback):
+        candidate = (candidate or '').replace('/', '_').replace('\\', '_')
+        if candidate not in ('', '.', '..'):
+            return candidate
+    return 'unnamed'
+
+
+def iterate_unique(id_or_urls: Iterable[str]) -> Iterator[str]:
+    """
+    Iterate the non-empty (stripped) items lazily, skipping the ones seen before
+
+    Only a short digest of each item is kept in memory.
+    """
+    seen_digests: Set[bytes] = set()
+    for id_or_url in id_or_urls:
+        id_or_url = id_or_url.strip()
+        if not id_or_url:
+            continue
+
+        digest = hashlib.blake2b(id_or_url.encode(), digest_size=12).digest()
+        if digest in seen_digests:
+            continue
+
+        seen_digests.add(digest)
+        yield id_or_url
+
+
+class DownloadTask(NamedTuple):
+    """ A file to download, and where to save it (by default, the file name comes from the access URL) """
+    id_or_url: str
+    output_dir: str
+    file_name: Optional[str] = None
+
+
+def get_lease_item(task: DownloadTask, output_dir: str) -> str:
+    """ The item of the task for a lease coordinator, made of the DRS ID or URL and the path relative to the output """
+    return '\0'.join([task.id_or_url, os.path.relpath(task.output_dir, output_dir), task.file_name or ''])
+
+
+T = TypeVar('T')
+
+
+class DownloadOrder(str, Enum):
+    """ The order in which the files are downloaded """
+
+    INPUT = 'input'
+    LARGEST_FIRST = 'largest-first'
+    SMALLEST_FIRST = 'smallest-first'
+
+
+class DownloadScheduler:
+    """
+    Scheduler of concurrent downloads
+
+    The downloads run on up to "max_concurrency" threads, while the number of the active downloads is adjusted to the
+    observed throughput (see "AdaptiveConcurrencyLimiter"). When "max_bytes_per_second" is set, the bytes of all
+    downloads are throttled together, and the download buffers are kept small enough to be throttled smoothly.
+
+    Only a bounded number of downloads are queued ahead of the active ones, so the memory used by the scheduler does
+    not depend on the number of files.
+    """
+
+    # The number of chunks per second allowed by the rate cap, which bounds the size of the download buffers
+    THROTTLED_CHUNKS_PER_SECOND = 4
+
+    # The number of downloads resolved and sorted together when the items are streamed
+    SCHEDULING_WINDOW_SIZE = 1000
+
+    def __init__(self,
+                 max_concurrency: Optional[int] = None,
+                 max_bytes_per_second: Optional[int] = None,
+                 order: DownloadOrder = DownloadOrder.LARGEST_FIRST,
+                 initial_concurrency: Optional[int] = None):
+        max_concurrency = max(max_concurrency or DEFAULT_DOWNLOAD_CONCURRENCY, 1)
+        self.order = DownloadOrder(order)
+        self.__concurrency = AdaptiveConcurrencyLimiter(max_concurrency,
+                                                        initial_concurrency or min(4, max_concurrency))
+        self.__rate_limiter = ByteRateLimiter(max_bytes_per_second) if max_bytes_per_second else None
+
+    @property
+    def concurrency(self) -> AdaptiveConcurrencyLimiter:
+        return self.__concurrency
+
+    def sort(self, items: Iterable[T], sizes: Dict[T, int]) -> List[T]:
+        """ Sort the downloads by the known sizes. The downloads of unknown sizes are scheduled last. """
+        items = list(items)
+
+        if self.order == DownloadOrder.LARGEST_FIRST:
+            return sorted(items, key=lambda item: (item not in sizes, -sizes.get(item, 0)))
+        elif self.order == DownloadOrder.SMALLEST_FIRST:
+            return sorted(items, key=lambda item: (item not in sizes, sizes.get(item, 0)))
+        else:
+            return items
+
+    def create_buffer(self) -> AdaptiveBuffer:
+        if self.__rate_limiter:
+            max_size = max(self.__rate_limiter.bytes_per_second // self.THROTTLED_CHUNKS_PER_SECOND, 1)
+            return AdaptiveBuffer(initial_size=min(max_size, MAX_BUFFER_SIZE), max_size=min(max_size, MAX_BUFFER_SIZE))
+        return AdaptiveBuffer()
+
+    def transfer(self, byte_count: int):
+        """ Account for the transferred bytes, blocking the caller when the rate cap is exceeded """
+        if self.__rate_limiter:
+            self.__rate_limiter.acquire(byte_count)
+        self.__concurrency.record(byte_count)
+
+    def run(self, items: Iterable[T], download: Callable[[T], None]):
+        """ Run the download of every item, and wait for all of them to finish """
+        max_queued_count = self.__concurrency.max_limit * 2
+
+        with ThreadPoolExecutor(max_workers=self.__concurrency.max_limit) as pool:
+            futures: Set[Future] = set()
+
+            for item in items:
+                if len(futures) >= max_queued_count:
+                    done_futures, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done_futures:
+                        future.result()
+
+                futures.add(pool.submit(self.__run_one, download, item))
+
+            for future in as_completed(futures):
+                future.result()
+
+    def __run_one(self, download: Callable[[T], None], item: T):
+        with self.__concurrency:
+            download(item)
+
+
+def get_signed_url_expiry(url: str) -> Optional[float]:
+    """
+    Return the expiry time (in seconds since the epoch) of the signed URL, or None if the URL does not tell
+
+    This recognizes the signatures of AWS S3 (v2 and v4), Google Cloud Storage (v2 and v4), and Azure Blob Storage.
+    """
+    query = {k.lower(): v[0] for k, v in parse_qs(urlparse(url).query).items()}
+
+    try:
+        for prefix in ('x-amz-', 'x-goog-'):
+            if f'{prefix}date' in query and f'{prefix}expires' in query:
+                signed_at = datetime.strptime(query[f'{prefix}date'], '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+                return signed_at.timestamp() + int(query[f'{prefix}expires'])
+
+        if 'expires' in query:
+            return float(query['expires'])
+
+        if 'se' in query:
+            return datetime.fromisoformat(query['se'].replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        pass
+
+    return None
+
+
+class DrsResolutionCache:
+    """
+    Thread-safe cache of the resolved DRS objects and access URLs
+
+    A DRS object is kept for up to OBJECT_TTL seconds, but never longer than the signed access URLs embedded in it.
+    An access URL is kept until shortly before its signature expires, or for UNKNOWN_ACCESS_URL_TTL seconds when the
+    expiry cannot be read from the URL. When the cache is full, the oldest entries are evicted first.
+    """
+
+    MAX_ENTRY_COUNT = 10000
+    OBJECT_TTL = 300  # seconds
+    UNKNOWN_ACCESS_URL_TTL = 60  # seconds
+    EXPIRY_MARGIN = 30  # seconds
+
+    def __init__(self, clock=time):
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__objects: Dict[str, Tuple[DrsObject, float]] = {}
+        self.__access_urls: Dict[str, Tuple[DrsObjectAccessUrl, float]] = {}
+
+    def get_object(self, drs_url: str) -> Optional[DrsObject]:
+        return self.__get(self.__objects, drs_url)
+
+    def set_object(self, drs_url: str, drs_object: DrsObject):
+        valid_until = self.__clock() + self.OBJECT_TTL
+        for access_method in drs_object.access_methods or []:
+            if access_method.access_url:
+                valid_until = min(valid_until, self.__get_valid_until(access_method.access_url))
+
+        self.__set(self.__objects, drs_url, drs_object, valid_until)
+
+    def get_access_url(self, drs_url: str) -> Optional[DrsObjectAccessUrl]:
+        return self.__get(self.__access_urls, drs_url)
+
+    def set_access_url(self, drs_url: str, access_url: DrsObjectAccessUrl):
+        self.__set(self.__access_urls, drs_url, access_url, self.__get_valid_until(access_url))
+
+    def invalidate(self, drs_url: str):
+        with self.__lock:
+            self.__objects.pop(drs_url, None)
+            self.__access_urls.pop(drs_url, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__objects.clear()
+            self.__access_urls.clear()
+
+    def __get_valid_until(self, access_url: DrsObjectAccessUrl) -> float:
+        expiry = get_signed_url_expiry(access_url.url)
+        if expiry is None:
+            return self.__clock() + self.UNKNOWN_ACCESS_URL_TTL
+        return expiry - self.EXPIRY_MARGIN
+
+    def __get(self, entries: dict, drs_url: str):
+        with self.__lock:
+            entry = entries.get(drs_url)
+            if entry is None:
+                return None
+            elif entry[1] <= self.__clock():
+                del entries[drs_url]
+                return None
+            return entry[0]
+
+    def __set(self, entries: dict, drs_url: str, value, valid_until: float):
+        if valid_until <= self.__clock():
+            return
+        with self.__lock:
+            entries.pop(drs_url, None)
+            while len(entries) >= self.MAX_ENTRY_COUNT:
+                del entries[next(iter(entries))]
+            entries[drs_url] = (value, valid_until)
+
+
+# NOTE: All blobs share the same connection pools so that the connections to the storage hosts are reused across
+#       objects and downloads.
+_SHARED_POOL_SIZE = 32
+_shared_pool: Optional[urllib3.PoolManager] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool() -> urllib3.PoolManager:
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = urllib3.PoolManager(maxsize=_SHARED_POOL_SIZE)
+    return _shared_pool
+
+
+class BlobReader(io.RawIOBase):
+    """
+    Seekable read-only stream of a DRS object, backed by HTTP range requests
+
+    The content is fetched in blocks which are kept in a LRU cache. When the reads are sequential, the following blocks
+    are fetched with the same request (read-ahead). When the access URL is rejected (e.g., expired), a new one is
+    requested from the DRS service once before giving up.
+
+    This is not thread-safe. Please use "Blob.open" or "DrsClient.open" to get a buffered reader.
+    """
+
+    _REFRESHABLE_STATUS_CODES = (400, 401, 403)
+
+    def __init__(self, blob: 'Blob', block_size: int = 1024 * 1024, cache_size: int = 64, read_ahead: int = 4):
+        super().__init__()
+        self._logger = get_logger(f'{type(self).__name__}/{blob.drs_url}')
+        self.__blob = blob
+        self.__size = blob.drs_object.size
+        self.__block_size = block_size
+        self.__cache_size = max(cache_size, read_ahead + 1)
+        self.__read_ahead = read_ahead
+        self.__position = 0
+        self.__blocks: OrderedDict[int, bytes] = OrderedDict()
+        self.__next_sequential_block_index: Optional[int] = None
+        self.__access_url: Optional[DrsObjectAccessUrl] = None
+        # The whole content, only kept when the server does not support the range requests.
+        self.__content: Optional[bytes] = None
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.__position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.__position + offset
+        elif whence == io.SEEK_END:
+            position = self.__size + offset
+        else:
+            raise ValueError(f'Invalid whence ({whence})')
+
+        if position < 0:
+            raise ValueError(f'Negative seek position ({position})')
+
+        self.__position = position
+        return self.__position
+
+    def readinto(self, b) -> int:
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+
+        if self.__position >= self.__size or len(b) == 0:
+            return 0
+
+        block_index = self.__position // self.__block_size
+        block = self.__get_block(block_index)
+        offset = self.__position - block_index * self.__block_size
+        read_byte_count = min(len(b), len(block) - offset)
+
+        b[:read_byte_count] = block[offset:offset + read_byte_count]
+        self.__position += read_byte_count
+
+        return read_byte_count
+
+    def __get_block(self, block_index: int) -> bytes:
+        if self.__content is not None:
+            return self.__content[block_index * self.__block_size:(block_index + 1) * self.__block_size]
+
+        block = self.__blocks.get(block_index)
+        if block is not None:
+            self.__blocks.move_to_end(block_index)
+            return block
+
+        last_block_index = (self.__size - 1) // self.__block_size
+        block_count = 1 + (self.__read_ahead if block_index == self.__next_sequential_block_index else 0)
+        end_block_index = min(block_index + block_count - 1, last_block_index)
+
+        start = block_index * self.__block_size
+        end = min((end_block_index + 1) * self.__block_size, self.__size) - 1
+        content = self.__fetch(start, end)
+
+        for index in range(block_index, end_block_index + 1):
+            offset = (index - block_index) * self.__block_size
+            self.__blocks[index] = content[offset:offset + self.__block_size]
+            self.__blocks.move_to_end(index)
+
+        while len(self.__blocks) > self.__cache_size:
+            self.__blocks.popitem(last=False)
+
+        self.__next_sequential_block_index = end_block_index + 1
+
+        return self.__blocks[block_index]
+
+    def __fetch(self, start: int, end: int) -> bytes:
+        """ Fetch the given (inclusive) byte range """
+        for attempt in range(2):
+            if self.__access_url is None or attempt > 0:
+                self.__access_url = self.__blob.get_access_url_object(refresh=attempt > 0)
+
+            headers = dict(self.__access_url.headers or {})
+            headers['Range'] = f'bytes={start}-{end}'
+
+            response = self.__blob._pool.request('GET', self.__access_url.url, headers=headers)
+
+            if response.status == 206:
+                content_range = response.headers.get('Content-Range')
+                if (content_range is not None and not content_range.startswith(f'bytes {start}-{end}/')) \
+                        or len(response.data) != end - start + 1:
+                    raise DrsApiError(f'Failed to read bytes {start}-{end} of {self.__blob.drs_url} '
+                                      f'(received {len(response.data)} bytes, Content-Range: {content_range})')
+                return response.data
+            elif response.status == 200:
+                # The server does not support the range requests, so the whole object is kept to serve the other
+                # blocks instead of downloading it again.
+                if len(response.data) != self.__size:
+                    raise DrsApiError(f'Failed to read {self.__blob.drs_url} (received {len(response.data)} bytes, '
+                                      f'expected {self.__size} bytes)')
+                self._logger.warning('The server ignored the range request. The whole object is kept in memory.')
+                self.__content = response.data
+                self.__blocks.clear()
+                return self.__content[start:end + 1]
+            elif response.status in self._REFRESHABLE_STATUS_CODES and attempt == 0:
+                self._logger.debug(f'The access URL is rejected with HTTP {response.status}. Refreshing...')
+                continue
+            else:
+                raise DrsApiError(f'Failed to read bytes {start}-{end} of {self.__blob.drs_url} '
+                                  f'(HTTP {response.status})')
 
 
 class Blob(AbstractContextManager):
-    def __init__(self, drs_url: str, session: HttpSession):
+    def __init__(self,
+                 drs_url: str,
+                 session: HttpSession,
+                 cache: Optional[DrsResolutionCache] = None,
+                 content_cache: Optional[ContentCache] = None):
         self._logger = get_logger(f'{type(self).__name__}/{drs_url}')
         self.__drs_url = drs_url
         self.__metadata = DrsMinimalMetadata(self.__drs_url)
-        self.__object: Optional[DrsObject] = None
         self.__session = session
-        self.__pool: Optional[urllib3.PoolManager] = None
+        self.__cache = cache or DrsResolutionCache()
+        self.__content_cache = content_cache
         self.__connection: Optional[TextIOWrapper] = None
         self.__cache_data: Optional[bytes] = None
 
@@ -253,15 +737,11 @@ class Blob(AbstractContextManager):
 
     @property
     def drs_object(self) -> DrsObject:
-        if not self.__object:
-            self.get_object()
-        return self.__object
+        return self.get_object()
 
     @property
-    def _pool(self):
-        if not self.__pool:
-            self.__pool = urllib3.PoolManager()
-        return self.__pool
+    def _pool(self) -> urllib3.PoolManager:
+        return get_shared_pool()
 
     @property
     def _connection(self) -> urllib3.HTTPResponse:
@@ -269,13 +749,76 @@ class Blob(AbstractContextManager):
             self.__connection = self._pool.request('GET', self.get_download_url(), preload_content=False)
         return self.__connection
 
+    @property
+    def content_key(self) -> Optional[ContentKey]:
+        """ The key of the content in the local content cache (None if the cache is disabled or not applicable) """
+        return self.drs_object.get_content_key() if self.__content_cache else None
+
+    def get_cached_path(self) -> Optional[str]:
+        """ Get the path to the content in the local content cache, if it is cached """
+        content_key = self.content_key
+        return self.__content_cache.get(content_key) if content_key else None
+
     @property
     def data(self) -> bytes:
         if not self.__cache_data:
-            self.__cache_data = self._connection.read()
-            self.__connection.close()
+            cached_path = self.get_cached_path()
+            if cached_path:
+                with open(cached_path, 'rb') as f:
+                    self.__cache_data = f.read()
+            else:
+                self.__cache_data = self._connection.read()
+                self.__connection.close()
+                self.__add_to_content_cache(self.__cache_data)
         return self.__cache_data
 
+    def __add_to_content_cache(self, content: bytes):
+        content_key = self.content_key
+        if not content_key:
+            return
+
+        hasher = content_key.create_hasher()
+        hasher.update(content)
+        if hasher.hexdigest() == content_key.checksum:
+            try:
+                self.__content_cache.put_stream(content_key, io.BytesIO(content))
+            except OSError as e:
+                self._logger.warning(f'Failed to add the content to the cache: {e}')
+        else:
+            self._logger.warning(f'The {content_key.algorithm} checksum of the content does not match the DRS object.')
+
+    def open(self, block_size: int = 1024 * 1024, cache_size: int = 64, read_ahead: int = 4) -> io.BufferedReader:
+        """
+        Open a seekable reader which only downloads the parts of the object being read
+
+        :param block_size: The number of bytes fetched per block
+        :param cache_size: The maximum number of blocks kept in memory
+        :param read_ahead: The number of blocks fetched in advance when the object is read sequentially
+        """
+        cached_path = self.get_cached_path()
+        if cached_path:
+            return open(cached_path, 'rb', buffering=block_size)
+
+        return io.BufferedReader(BlobReader(self, block_size=block_size, cache_size=cache_size, read_ahead=read_ahead),
+                                 buffer_size=block_size)
+
+    def write_to(self, output: BinaryIO, buffer: Optional[AdaptiveBuffer] = None) -> int:
+        """ Stream the content to the given binary output without holding the whole object in memory """
+        cached_path = self.get_cached_path()
+        if cached_path:
+            with open(cached_path, 'rb') as cached_file:
+                shutil.copyfileobj(cached_file, output)
+                return cached_file.tell()
+
+        written_byte_count = 0
+        try:
+            for chunk in (buffer or AdaptiveBuffer()).chunks(self._connection):
+                output.write(chunk)
+                written_byte_count += len(chunk)
+        finally:
+            self.__connection.close()
+        return written_byte_count
+
     @property
     def name(self) -> str:
         return urlparse(self.get_download_url()).path.split(r'/')[-1]
@@ -283,13 +826,12 @@ class Blob(AbstractContextManager):
     def close(self):
         if self.__connection and not self.__connection.closed:
             self.__connection.close()
-        if self.__pool:
-            self.__pool.clear()
 
     def get_object(self) -> DrsObject:
-        """ Get the DRS Access URL Object """
-        if self.__object:
-            return self.__object
+        """ Get the DRS Object """
+        drs_object = self.__cache.get_object(self.__drs_url)
+        if drs_object:
+            return drs_object
         else:
             api_url = urljoin(self.__metadata.drs_server_url, f'objects/{self.__metadata.object_id}')
 
@@ -307,12 +849,26 @@ class Blob(AbstractContextManager):
 
             object_info = object_info_response.json()
 
-            self.__object = DrsObject(**object_info)
+            drs_object = DrsObject(**object_info)
+            self.__cache.set_object(self.__drs_url, drs_object)
 
-            return self.__object
+            return drs_object
 
-    def get_access_url_object(self) -> DrsObjectAccessUrl:
-        """ Get the DRS Access URL Object """
+    def get_access_url_object(self, refresh: bool = False) -> DrsObjectAccessUrl:
+        """ Get the DRS Access URL Object (set "refresh" to re-fetch the object info, e.g., when the URL expired) """
+        if refresh:
+            self.__cache.invalidate(self.__drs_url)
+        else:
+            access_url = self.__cache.get_access_url(self.__drs_url)
+            if access_url:
+                return access_url
+
+        access_url = self.__resolve_access_url()
+        self.__cache.set_access_url(self.__drs_url, access_url)
+
+        return access_url
+
+    def __resolve_access_url(self) -> DrsObjectAccessUrl:
         drs_obj = self.get_object()
         self._logger.debug(f'DRS Object:\n\n{drs_obj.model_dump_json(indent=2)}\n')
 
@@ -345,13 +901,24 @@ class Blob(AbstractContextManager):
 class DrsClient(BaseServiceClient):
     """Client for Data Repository Service"""
 
+    # The minimum interval (in seconds) between two "download-progress" events of the same download
+    PROGRESS_EVENT_INTERVAL = 0.1
+
+    # The maximum number of IDs per bulk request, and the number of concurrent requests when bulk is not supported
+    BULK_REQUEST_SIZE = 100
+    RESOLUTION_CONCURRENCY = 8
+
+    # The HTTP statuses which indicate that the server does not implement the bulk object resolution (DRS 1.2)
+    _BULK_UNSUPPORTED_STATUS_CODES = (400, 404, 405, 501)
+
     def __init__(self, endpoint: ServiceEndpoint):
         super().__init__(endpoint)
 
-        # A lock to prevent race conditions on exit_codes objects
-        self.__output_lock = threading.Lock()
-        # lock to prevent race conditions for file output
-        self.__exit_code_lock = threading.Lock()
+        self.__resolution_cache = DrsResolutionCache()
+
+        # The local cache of the downloaded content (see "ContentCache.from_environment")
+        self.content_cache: Optional[ContentCache] = ContentCache.from_environment()
+        self.__servers_without_bulk_support: Set[str] = set()
 
         self._events.add_fixed_types('download-ok', 'download-progress', 'download-failure')
 
@@ -365,19 +932,6 @@ class DrsClient(BaseServiceClient):
             DRS_TYPE_V1_1,
         ]
 
-    def exit_download(self, url: str, status: DownloadStatus, message: str = "", exit_codes: dict = None) -> None:
-        """
-        Report a file download with a status and message
-
-        :param url: The downloaded resource's url
-        :param status: The reported status of the download
-        :param message: A message describing the reason for setting the status
-        :param exit_codes: A shared dict for all reports used by download_files
-        """
-        if exit_codes is not None:
-            with self.__exit_code_lock:
-                exit_codes[status][url] = message
-
     def get_blob(self,
                  id_or_url: Optional[str] = None,
                  id: Optional[str] = None,
@@ -385,8 +939,129 @@ class DrsClient(BaseServiceClient):
                  no_auth: bool = False) -> Blob:
         assert id_or_url or id or url, 'Please at least specify either "id_or_url" (first argument), "id", or "url".'
 
-        method_logger = get_logger(f'{self._logger.name}/get_blob')
-        method_logger.debug('Invoked with (id_or_url={id_or_url}, id={id}, url={url}, no_auth={no_auth})')
+        return Blob(self._to_drs_url(id_or_url, id=id, url=url),
+                    self.create_http_session(no_auth=no_auth),
+                    cache=self.__resolution_cache,
+                    content_cache=self.content_cache)
+
+    def get_blobs(self, id_or_urls: Iterable[str], no_auth: bool = False) -> Dict[str, Blob]:
+        """ Get the blobs of the given DRS IDs or URLs, with their metadata resolved in bulk (see "resolve_objects") """
+        id_or_urls = list(id_or_urls)
+        self.resolve_objects(id_or_urls, no_auth=no_auth)
+        return {id_or_url: self.get_blob(id_or_url, no_auth=no_auth) for id_or_url in id_or_urls}
+
+    def resolve_objects(self, id_or_urls: Iterable[str], no_auth: bool = False) -> Dict[str, DrsObject]:
+        """
+        Resolve the DRS objects of the given DRS IDs or URLs
+
+        The objects are requested with the bulk endpoint (DRS 1.2) when the server supports it. Otherwise, they are
+        requested concurrently, one by one. The resolved objects are cached for the blobs created by this client.
+        The unresolvable objects (e.g., invalid URLs, unknown IDs) are not included in the result.
+        """
+        resolved_objects: Dict[str, DrsObject] = {}
+        pending_urls_by_server: Dict[str, Dict[str, List[str]]] = {}
+
+        for id_or_url in set(id_or_urls):
+            try:
+                metadata = DrsMinimalMetadata(self._to_drs_url(id_or_url))
+            except InvalidDrsUrlError:
+                continue
+
+            drs_object = self.__resolution_cache.get_object(metadata.url)
+            if drs_object:
+                resolved_objects[id_or_url] = drs_object
+            else:
+                pending_urls_by_server.setdefault(metadata.drs_server_url, {}) \
+                    .setdefault(metadata.object_id, []) \
+                    .append(id_or_url)
+
+        if not pending_urls_by_server:
+            return resolved_objects
+
+        session = self.create_http_session(no_auth=no_auth)
+        unresolved_ids_by_server: Dict[str, List[str]] = {}
+
+        for server_url, id_or_urls_by_object_id in pending_urls_by_server.items():
+            objects_by_id = self.__resolve_in_bulk(session, server_url, list(id_or_urls_by_object_id.keys()))
+
+            for object_id, requested_id_or_urls in id_or_urls_by_object_id.items():
+                drs_object = objects_by_id.get(object_id)
+                if drs_object is None:
+                    unresolved_ids_by_server.setdefault(server_url, []).append(object_id)
+                    continue
+                for id_or_url in requested_id_or_urls:
+                    resolved_objects[id_or_url] = drs_object
+                    self.__resolution_cache.set_object(self._to_drs_url(id_or_url), drs_object)
+
+        fallback_blobs: Dict[str, Blob] = {
+            id_or_url: Blob(self._to_drs_url(id_or_url), session, cache=self.__resolution_cache)
+            for server_url, object_ids in unresolved_ids_by_server.items()
+            for object_id in object_ids
+            for id_or_url in pending_urls_by_server[server_url][object_id]
+        }
+
+        if fallback_blobs:
+            with ThreadPoolExecutor(max_workers=self.RESOLUTION_CONCURRENCY) as pool:
+                future_to_id_or_url_map = {pool.submit(blob.get_object): id_or_url
+                                           for id_or_url, blob in fallback_blobs.items()}
+                for future in as_completed(future_to_id_or_url_map):
+                    id_or_url = future_to_id_or_url_map[future]
+                    try:
+                        resolved_objects[id_or_url] = future.result()
+                    except (DrsApiError, requests.exceptions.RequestException) as e:
+                        self._logger.debug(f'Failed to resolve {id_or_url}: {e}')
+
+        return resolved_objects
+
+    def __resolve_in_bulk(self, session: HttpSession, server_url: str, object_ids: List[str]) -> Dict[str, DrsObject]:
+        """
+        Resolve the objects with the bulk endpoint. Return an empty map if the server does not support it.
+
+        The objects of the batches which fail for another reason (e.g., HTTP 429 or 5xx, connection errors) and the
+        malformed objects are left out of the result, so that they are resolved one by one.
+        """
+        objects_by_id: Dict[str, DrsObject] = {}
+
+        if len(object_ids) < 2 or server_url in self.__servers_without_bulk_support:
+            return objects_by_id
+
+        for offset in range(0, len(object_ids), self.BULK_REQUEST_SIZE):
+            batch = object_ids[offset:offset + self.BULK_REQUEST_SIZE]
+
+            try:
+                response = session.post(urljoin(server_url, 'objects'), json={'bulk_object_ids': batch})
+                response_body = response.json()
+                resolved_objects = response_body['resolved_drs_object']
+            except HttpError as e:
+                if e.response.status_code not in self._BULK_UNSUPPORTED_STATUS_CODES:
+                    self._logger.debug(f'Failed to resolve {len(batch)} DRS object(s) in bulk '
+                                       f'(HTTP {e.response.status_code} on {server_url}). Resolving them one by one.')
+                    continue
+                self._logger.debug(f'{server_url} does not support the bulk object resolution.')
+                self.__servers_without_bulk_support.add(server_url)
+                break
+            except requests.exceptions.RequestException as e:
+                self._logger.debug(f'Failed to resolve {len(batch)} DRS object(s) in bulk ({type(e).__name__} on '
+                                   f'{server_url}). Resolving them one by one.')
+                continue
+            except (ValueError, KeyError, TypeError):
+                self._logger.debug(f'{server_url} responded an unexpected bulk object resolution.')
+                self.__servers_without_bulk_support.add(server_url)
+                break
+
+            for object_info in resolved_objects:
+                try:
+                    drs_object = DrsObject(**object_info)
+                except (ValueError, TypeError) as e:
+                    self._logger.debug(f'{server_url} responded a malformed DRS object in bulk: {e}')
+                    continue
+                objects_by_id[drs_object.id] = drs_object
+
+        return objects_by_id
+
+    def _to_drs_url(self, id_or_url: Optional[str] = None, id: Optional[str] = None, url: Optional[str] = None) -> str:
+        method_logger = get_logger(f'{self._logger.name}/_to_drs_url')
+        method_logger.debug('Invoked with (id_or_url={id_or_url}, id={id}, url={url})')
 
         if id_or_url:
             method_logger.debug('Using implicit argument')
@@ -409,19 +1084,55 @@ class DrsClient(BaseServiceClient):
             # This is an explicit option for directly using the given URL as DRS URL.
             drs_url = url
 
-        return Blob(drs_url, self.create_http_session(no_auth=no_auth))
+        return drs_url
+
+    def open(self,
+             id_or_url: str,
+             no_auth: bool = False,
+             block_size: int = 1024 * 1024,
+             cache_size: int = 64,
+             read_ahead: int = 4) -> io.BufferedReader:
+        """ Open a seekable reader of the DRS object. See "Blob.open" for the parameters. """
+        return self.get_blob(id_or_url, no_auth=no_auth).open(block_size=block_size,
+                                                              cache_size=cache_size,
+                                                              read_ahead=read_ahead)
 
     def __download_file(
             self,
             drs_id_or_url: str,
             output_dir: str,
-            exit_codes: Optional[dict] = None,
-            no_auth: bool = False
-    ) -> None:
+            scheduler: DownloadScheduler,
+            report: DownloadReport,
+            no_auth: bool = False,
+            file_name: Optional[str] = None,
+            is_lease_held: Optional[Callable[[], bool]] = None
+    ) -> DownloadStatus:
+        """
+        Download the file. The content is written to a temporary file which is renamed once complete.
+
+        When "is_lease_held" is given, the download stops as soon as the lease is lost (e.g., reclaimed by another
+        process), leaving the file to the new holder.
+        """
         # TODO #182443607 Move this method to dnastack.cli.drs
         try:
             with self.get_blob(drs_id_or_url, no_auth=no_auth) as output:
-                output_file_path = os.path.join(output_dir, output.name)
+                os.makedirs(output_dir, exist_ok=True)
+                output_file_path = os.path.join(output_dir, file_name or output.name)
+                content_key = output.content_key
+
+                if content_key and self.content_cache.restore(content_key, output_file_path):
+                    self._logger.debug(f'Restored {drs_id_or_url} from the content cache')
+                    cached_size = os.path.getsize(output_file_path)
+                    self._events.dispatch('download-progress',
+                                          DownloadProgressEvent.make(drs_url=drs_id_or_url,
+                                                                     read_byte_count=cached_size,
+                                                                     total_byte_count=cached_size))
+                    self._events.dispatch('download-ok',
+                                          DownloadOkEvent.make(drs_url=output.drs_url,
+                                                               output_file_path=output_file_path))
+                    report.add(drs_id_or_url, DownloadStatus.SUCCESS, "Restored from the cache", output_file_path)
+                    return DownloadStatus.SUCCESS
+
                 output_connection = output._connection
                 output_headers = output_connection.headers
                 host_service = output_headers.get("Server") or 'Known'
@@ -447,27 +1158,63 @@ class DrsClient(BaseServiceClient):
                         f'(headers = {output_headers})'
                     )
 
-                with open(output_file_path, "wb+") as dest:
-                    stream_size = int(output._connection.headers["Content-Length"])
-                    read_byte_count = 0
-                    for chunk in output._connection.stream(1024):
-                        read_byte_count += len(chunk)
-                        dest.write(chunk)
-                        self._events.dispatch('download-progress',
-                                              DownloadProgressEvent.make(drs_url=drs_id_or_url,
-                                                                         read_byte_count=read_byte_count,
-                                                                         total_byte_count=stream_size)
-                                              )
+                temp_file_path = f'{output_file_path}.{uuid4().hex[:8]}.tmp'
+                try:
+                    with open(temp_file_path, "wb+") as dest:
+                        stream_size = int(output._connection.headers["Content-Length"])
+                        read_byte_count = 0
+                        last_progress_at = 0.0
+                        hasher = content_key.create_hasher() if content_key else None
+                        for chunk in scheduler.create_buffer().chunks(output._connection):
+                            if is_lease_held and not is_lease_held():
+                                raise _LeaseLostError()
+                            read_byte_count += len(chunk)
+                            dest.write(chunk)
+                            if hasher:
+                                hasher.update(chunk)
+                            scheduler.transfer(len(chunk))
+                            if (self._events.has_listeners('download-progress')
+                                    and monotonic() - last_progress_at >= self.PROGRESS_EVENT_INTERVAL):
+                                last_progress_at = monotonic()
+                                self._events.dispatch('download-progress',
+                                                      DownloadProgressEvent.make(drs_url=drs_id_or_url,
+                                                                                 read_byte_count=read_byte_count,
+                                                                                 total_byte_count=stream_size)
+                                                      )
+                    if is_lease_held and not is_lease_held():
+                        raise _LeaseLostError()
+                    os.replace(temp_file_path, output_file_path)
+                except BaseException:
+                    if os.path.exists(temp_file_path):
+                        os.remove(temp_file_path)
+                    raise
                 self._events.dispatch('download-progress',
                                       DownloadProgressEvent.make(drs_url=drs_id_or_url,
                                                                  read_byte_count=read_byte_count,
                                                                  total_byte_count=stream_size)
                                       )
+
+                if hasher:
+                    if hasher.hexdigest() == content_key.checksum:
+                        try:
+                            self.content_cache.put(content_key, output_file_path)
+                        except OSError as e:
+                            self._logger.warning(f'Failed to add {drs_id_or_url} to the content cache: {e}')
+                    else:
+                        self._logger.warning(f'The {content_key.algorithm} checksum of {drs_id_or_url} does not '
+                                             f'match the DRS object. The content is not cached.')
+
                 self._events.dispatch('download-ok',
                                       DownloadOkEvent.make(drs_url=output.drs_url,
                                                            output_file_path=output_file_path))
 
-            self.exit_download(drs_id_or_url, DownloadStatus.SUCCESS, "Download Successful", exit_codes)
+            report.add(drs_id_or_url, DownloadStatus.SUCCESS, "Download Successful", output_file_path)
+            return DownloadStatus.SUCCESS
+        except _LeaseLostError:
+            self._logger.warning(f'Stopped the download of {drs_id_or_url} as its lease has been reclaimed by another '
+                                 f'process')
+            report.add(drs_id_or_url, DownloadStatus.SKIPPED, 'Claimed by another process')
+            return DownloadStatus.SKIPPED
         except InvalidDrsUrlError as e:
             self._logger.info(f'failed to download from {drs_id_or_url}: {type(e).__name__}: {e}')
             self._events.dispatch('download-progress',
@@ -478,95 +1225,201 @@ class DrsClient(BaseServiceClient):
             self._events.dispatch('download-failure',
                                   DownloadFailureEvent.make(drs_url=drs_id_or_url,
                                                             reason='Invalid DRS URL'))
-            self.exit_download(
-                drs_id_or_url,
-                DownloadStatus.FAIL,
-                f"{type(e).__name__}: {e}",
-                exit_codes,
-            )
+            report.add(drs_id_or_url, DownloadStatus.FAIL, f"{type(e).__name__}: {e}")
+            return DownloadStatus.FAIL
         except NoUsableAccessMethodError as e:
             self._logger.info(f'failed to download from {drs_id_or_url}: {type(e).__name__}: {e}')
             self._events.dispatch('download-failure',
                                   DownloadFailureEvent.make(drs_url=drs_id_or_url,
                                                             reason='No access method'))
-            self.exit_download(
-                drs_id_or_url,
-                DownloadStatus.FAIL,
-                f"{type(e).__name__}: {e}",
-                exit_codes,
-            )
+            report.add(drs_id_or_url, DownloadStatus.FAIL, f"{type(e).__name__}: {e}")
+            return DownloadStatus.FAIL
         except DrsApiError as e:
             self._logger.info(f'failed to download from {drs_id_or_url}: {type(e).__name__}: {e}')
             self._events.dispatch('download-failure',
                                   DownloadFailureEvent.make(drs_url=drs_id_or_url,
                                                             reason='Unexpected error while communicating with DRS API',
                                                             error=e))
-            self.exit_download(
-                drs_id_or_url,
-                DownloadStatus.FAIL,
-                f"{type(e).__name__}: {e}",
-                exit_codes,
-            )
+            report.add(drs_id_or_url, DownloadStatus.FAIL, f"{type(e).__name__}: {e}")
+            return DownloadStatus.FAIL
         except Exception as e:
             self._logger.info(f'failed to download from {drs_id_or_url}: {type(e).__name__}: {e}')
             self._events.dispatch('download-failure',
                                   DownloadFailureEvent.make(drs_url=drs_id_or_url,
                                                             reason='Unexpected error',
                                                             error=e))
-            self.exit_download(
-                drs_id_or_url,
-                DownloadStatus.FAIL,
-                f"{type(e).__name__}: {e}",
-                exit_codes,
-            )
+            report.add(drs_id_or_url, DownloadStatus.FAIL, f"{type(e).__name__}: {e}")
+            return DownloadStatus.FAIL
 
     def _download_files(
             self,
-            id_or_urls: List[str],
+            id_or_urls: Iterable[str],
             output_dir: str = os.getcwd(),
-            no_auth: bool = False
-    ) -> None:
+            no_auth: bool = False,
+            scheduler: Optional[DownloadScheduler] = None,
+            status_output: Optional[TextIO] = None,
+            coordinator: Optional[LeaseCoordinator] = None
+    ) -> DownloadReport:
+        """
+        Download the files of the given DRS IDs or URLs
+
+        The items are consumed lazily, so that they can be streamed from a large manifest. The duplicates are skipped.
+        The result of each download is written as a JSON line to the status output (if given) as soon as it finishes.
+
+        A DRS bundle is downloaded into a directory named after it, which mirrors the tree of its contents.
+
+        When a coordinator is given, each file is claimed before its download, so that the cooperating processes
+        sharing the coordinator's directory split the files between them. The files claimed by another process or
+        downloaded before are skipped. The failed downloads are released so that another process may retry them.
+        A file is claimed with its path relative to the output directory, as the same object may be saved in several
+        places (e.g., in two bundles).
+        """
         # TODO #182443607 Move this method to dnastack.cli.drs
-        exit_codes = {status: {} for status in DownloadStatus}
-        unique_urls = set(id_or_urls)
+        scheduler = scheduler or DownloadScheduler()
+        report = DownloadReport(status_output)
 
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Define the maximum number of workers, limited to the number of CPUs.
-        max_worker_count = os.cpu_count()
-        if max_worker_count < 2:
-            max_worker_count = 2
-
-        future_to_url_map: Dict[Future, str] = {}
-
-        with ThreadPoolExecutor(max_workers=max_worker_count) as pool:
-            for url in unique_urls:
-                future = pool.submit(
-                    self.__download_file,
-                    drs_id_or_url=url,
-                    output_dir=output_dir,
-                    exit_codes=exit_codes,
-                    no_auth=no_auth
-                )
-                future_to_url_map[future] = url
-
-        # Wait for all tasks to complete
-        for future in as_completed(future_to_url_map.keys()):
-            future.result()
+        def download(task: DownloadTask):
+            item = get_lease_item(task, output_dir)
+            if coordinator and not coordinator.claim(item):
+                report.add(task.id_or_url, DownloadStatus.SKIPPED, 'Done or claimed by another process')
+                return
 
-        # at least one download failed, create exceptions
-        failed_downloads = [
-            DRSException(msg=msg, url=url)
-            for url, msg in exit_codes.get(DownloadStatus.FAIL).items()
-        ]
+            status = None
+            try:
+                status = self.__download_file(drs_id_or_url=task.id_or_url,
+                                              output_dir=task.output_dir,
+                                              file_name=task.file_name,
+                                              scheduler=scheduler,
+                                              report=report,
+                                              no_auth=no_auth,
+                                              is_lease_held=lambda: coordinator.is_held(item) if coordinator else True)
+            finally:
+                if coordinator and status == DownloadStatus.SUCCESS:
+                    coordinator.complete(item, dict(status=status.name.lower()))
+                elif coordinator:
+                    coordinator.release(item)
+
+        if coordinator:
+            coordinator.start()
 
-        if len(unique_urls) == len(failed_downloads):
-            self._logger.error(f'All of {len(unique_urls)} download(s) failed unexpectedly')
-            raise DRSDownloadException(failed_downloads)
-        elif len(failed_downloads) > 0:
-            self._logger.warning(f'{len(failed_downloads)} out of {len(unique_urls)} download(s) failed unexpectedly')
+        try:
+            scheduler.run(self.__iterate_scheduled(iterate_unique(id_or_urls), output_dir, scheduler, report, no_auth),
+                          download)
+        finally:
+            if coordinator:
+                coordinator.stop()
+
+        if report.failure_count > 0 and report.failure_count == report.total_count:
+            self._logger.error(f'All of {report.total_count} download(s) failed unexpectedly')
+            raise DRSDownloadException(report.failures)
+        elif report.failure_count > 0:
+            self._logger.warning(f'{report.failure_count} out of {report.total_count} download(s) failed unexpectedly')
             index = 0
-            for failed_download in failed_downloads:
+            for failed_download in report.failures:
                 self._logger.warning(f'Failure #{index}: {failed_download}')
                 index += 1
+
+        return report
+
+    def __iterate_scheduled(self, id_or_urls: Iterator[str], output_dir: str, scheduler: DownloadScheduler,
+                            report: DownloadReport, no_auth: bool) -> Iterator[DownloadTask]:
+        """ Sort the download tasks by size, window by window """
+        sized_tasks = self.__iterate_tasks(id_or_urls, output_dir, scheduler, report, no_auth)
+        while True:
+            window = list(islice(sized_tasks, scheduler.SCHEDULING_WINDOW_SIZE))
+            if not window:
+                return
+
+            yield from scheduler.sort([task for task, _ in window],
+                                      {task: size for task, size in window if size is not None})
+
+    def __iterate_tasks(self, id_or_urls: Iterator[str], output_dir: str, scheduler: DownloadScheduler,
+                        report: DownloadReport, no_auth: bool) -> Iterator[Tuple[DownloadTask, Optional[int]]]:
+        """
+        Resolve the objects ahead of the downloads, window by window, and expand the bundles
+
+        The bundles without any blob have no download task, so they are reported here with an empty directory.
+        """
+        while True:
+            window = list(islice(id_or_urls, scheduler.SCHEDULING_WINDOW_SIZE))
+            if not window:
+                return
+
+            # The failures are reported by the individual downloads.
+            drs_objects = self.__resolve_quietly(window, no_auth)
+
+            for id_or_url in window:
+                drs_object = drs_objects.get(id_or_url)
+
+                if drs_object is not None and drs_object.is_bundle:
+                    bundle_dir = os.path.join(output_dir, _to_safe_file_name(drs_object.name, drs_object.id))
+                    blob_count = 0
+                    for path, child_id_or_url, child_object in self.iterate_bundle(drs_object, no_auth=no_auth):
+                        blob_count += 1
+                        yield (DownloadTask(child_id_or_url,
+                                            os.path.normpath(os.path.join(bundle_dir, os.path.dirname(path))),
+                                            os.path.basename(path)),
+                               child_object.size if child_object else None)
+
+                    if blob_count == 0:
+                        os.makedirs(bundle_dir, exist_ok=True)
+                        report.add(id_or_url, DownloadStatus.SUCCESS, 'Empty bundle', bundle_dir)
+                else:
+                    yield DownloadTask(id_or_url, output_dir), drs_object.size if drs_object else None
+
+    def iterate_bundle(self, bundle: DrsObject, no_auth: bool = False) \
+            -> Iterator[Tuple[str, str, Optional[DrsObject]]]:
+        """
+        Iterate the blobs in the tree of the bundle's contents
+
+        The tree is resolved level by level, resolving all the objects of the same level concurrently (see
+        "resolve_objects"). Each item is a tuple of the relative path of the blob (built from the names of the
+        contents), the DRS ID or URL of the blob, and the blob's DRS object (None if it cannot be resolved).
+        """
+        visited_references: Set[str] = {bundle.id}
+        level: List[Tuple[str, DrsObjectContents]] = [
+            (_to_safe_file_name(entry.name, entry.id), entry)
+            for entry in bundle.contents or []
+        ]
+
+        while level:
+            references = [entry.reference for _, entry in level if entry.contents is None and entry.reference]
+            drs_objects = self.__resolve_quietly(references, no_auth) if references else {}
+            next_level: List[Tuple[str, DrsObjectContents]] = []
+
+            for path, entry in level:
+                children = entry.contents
+
+                if children is None:
+                    if not entry.reference:
+                        self._logger.warning(f'Skipped the bundle item without reference ({path})')
+                        continue
+
+                    drs_object = drs_objects.get(entry.reference)
+
+                    if drs_object is None or not drs_object.is_bundle:
+                        yield path, entry.reference, drs_object
+                        continue
+                    elif entry.reference in visited_references:
+                        self._logger.warning(f'Skipped the bundle which contains itself ({entry.reference})')
+                        continue
+
+                    visited_references.add(entry.reference)
+                    children = drs_object.contents or []
+
+                next_level.extend(
+                    (os.path.join(path, _to_safe_file_name(child.name, child.id)), child)
+                    for child in children
+                )
+
+            level = next_level
+
+    def __resolve_quietly(self, id_or_urls: List[str], no_auth: bool) -> Dict[str, DrsObject]:
+        try:
+            return self.resolve_objects(id_or_urls, no_auth=no_auth)
+        except Exception as e:
+            self._logger.debug(f'Failed to resolve the DRS objects ahead of the downloads: {type(e).__name__}: {e}')
+            return {}
@@ -1,7 +1,8 @@
 from abc import ABC
+from collections import deque
 from logging import Logger
 from threading import Lock
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
 from uuid import uuid4
 
 from dnastack.common.logger import get_logger
@@ -38,7 +39,7 @@ class ResultIterator:
     def __init__(self, loader: ResultLoader):
         self.__read_lock = Lock()
         self.__loader = loader
-        self.__buffer: List[Dict[str, Any]] = []
+        self.__buffer: Deque[Dict[str, Any]] = deque()
         self.__depleted = False
 
     def __iter__(self):
@@ -63,6 +64,6 @@ class ResultIterator:
                         raise StopIteration('No more result to iterate')
 
             # Read within the lock
-            item = self.__buffer.pop(0)
+            item = self.__buffer.popleft()
 
         return item
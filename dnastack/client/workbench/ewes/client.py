@@ -256,6 +256,8 @@ class EWesClient(BaseWorkbenchClient):
                 if 'Content-Length' in response.headers and int(response.headers['Content-Length']) == 0:
                     yield None
                     return
+                # Each chunk is passed on as soon as it arrives, so that the live logs are not held back to fill a
+                # buffer.
                 for chunk in response.iter_content(chunk_size=None):
                     yield chunk
 
@@ -1,4 +1,4 @@
-from typing import Optional, List, Any, Dict, Iterator, Callable
+from typing import Optional, List, Any, Dict, Iterator, Callable, Tuple
 
 from pydantic import Field
 
@@ -44,19 +44,17 @@ class AuthManager:
         return self.__events
 
     def revoke(self, endpoint_ids: List[str], confirmation_operation: Optional[Callable[[], bool]] = None) -> List[str]:
-        states = list(self.get_states(endpoint_ids))
-        authenticators = self.get_authenticators(endpoint_ids)
+        indexed_states = self._index_states(endpoint_ids)
 
+        requested_endpoint_ids = set(endpoint_ids or [])
         endpoint_ids_with_access_removed: List[str] = []
-        index = 0
-        total = len(authenticators)
+        total = len(indexed_states)
 
-        for authenticator in authenticators:
-            state = [s for s in states if s.id == authenticator.session_id][0]
+        for index, (session_id, (authenticator, state)) in enumerate(indexed_states.items()):
             status = state.status
 
             affected_endpoint_ids = [
-                f'{endpoint_id} (requested)' if endpoint_id in endpoint_ids else endpoint_id
+                f'{endpoint_id} (requested)' if endpoint_id in requested_endpoint_ids else endpoint_id
                 for endpoint_id in state.endpoints
             ]
 
@@ -64,7 +62,7 @@ class AuthManager:
             if state.session_info and state.session_info.get('scope'):
                 granted_scopes.extend(sorted(str(state.session_info.get('scope')).split(r' ')))
 
-            basic_event_info = {'session_id': authenticator.session_id, 'index': index, 'total': total, 'state': state,
+            basic_event_info = {'session_id': session_id, 'index': index, 'total': total, 'state': state,
                                 'endpoint_ids': affected_endpoint_ids, 'scopes': granted_scopes}
 
             self.events.dispatch('revoke-begin', basic_event_info)
@@ -84,35 +82,42 @@ class AuthManager:
         return endpoint_ids_with_access_removed
 
     def get_states(self, endpoint_ids: List[str] = None) -> Iterator[ExtendedAuthState]:
+        for _, state in self._index_states(endpoint_ids).values():
+            yield state
+
+    def _index_states(self, endpoint_ids: List[str] = None) -> Dict[str, Tuple[Authenticator, ExtendedAuthState]]:
+        """
+        Build the index from session ID to the authenticator and its state, including the associated endpoints
+
+        The endpoints are grouped by the hash of their authentication information once per call so that matching
+        a session to its endpoints is a dictionary lookup instead of a scan over every endpoint.
+        """
         endpoints = self.get_filtered_endpoints(endpoint_ids)
-        for authenticator in self.get_authenticators(endpoint_ids):
-            auth_state = authenticator.get_state()
-            state = ExtendedAuthState(**auth_state.model_dump())
 
-            # Simplify the auth info.
-            simplified_auth_info = self._remove_none_entry_from(auth_state.auth_info)
+        endpoint_ids_by_auth_hash: Dict[str, List[str]] = {}
+        for endpoint in endpoints:
+            for auth_info in endpoint.get_authentications():
+                endpoint_ids_by_auth_hash.setdefault(self._compute_auth_info_hash(auth_info), []).append(endpoint.id)
 
-            # When type is omitted, the type is default to 'oauth2'. This is required for session-endpoint matching.
-            if not simplified_auth_info.get('type'):
-                simplified_auth_info['type'] = 'oauth2'
+        indexed_states: Dict[str, Tuple[Authenticator, ExtendedAuthState]] = {}
+        for authenticator in self._create_authenticators(endpoints):
+            auth_state = authenticator.get_state()
+            state = ExtendedAuthState(**auth_state.model_dump())
+            state.endpoints.extend(endpoint_ids_by_auth_hash.get(self._compute_auth_info_hash(auth_state.auth_info),
+                                                                 []))
 
-            # Compute the session hash.
-            current_hash = JsonModelMixin.hash(simplified_auth_info)
+            indexed_states[authenticator.session_id] = (authenticator, state)
 
-            # Retrieve the associated endpoints.
-            for endpoint in endpoints:
-                for auth_info in endpoint.get_authentications():
-                    # When type is omitted, the type is default to 'oauth2'.
-                    if not auth_info.get('type'):
-                        auth_info['type'] = 'oauth2'
+        return indexed_states
 
-                    # Compute reference hash
-                    ref_hash = JsonModelMixin.hash(self._remove_none_entry_from(auth_info))
+    def _compute_auth_info_hash(self, auth_info: Dict[str, Any]) -> str:
+        simplified_auth_info = self._remove_none_entry_from(auth_info)
 
-                    if ref_hash == current_hash:
-                        state.endpoints.append(endpoint.id)
+        # When type is omitted, the type is default to 'oauth2'. This is required for session-endpoint matching.
+        if not simplified_auth_info.get('type'):
+            simplified_auth_info['type'] = 'oauth2'
 
-            yield state
+        return JsonModelMixin.hash(simplified_auth_info)
 
     def _remove_none_entry_from(self, d: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -178,9 +183,12 @@ class AuthManager:
     def get_authenticators(self, endpoint_ids: List[str] = None) -> List[Authenticator]:
         filtered_endpoints = self.get_filtered_endpoints(endpoint_ids)
         self._logger.debug(f'get_authenticators({endpoint_ids}): filtered_endpoints = {filtered_endpoints}')
+        return self._create_authenticators(filtered_endpoints)
+
+    def _create_authenticators(self, endpoints: List[ServiceEndpoint]) -> List[Authenticator]:
         authenticators: List[Authenticator] = []
 
-        for authenticator in HttpAuthenticatorFactory.create_multiple_from(endpoints=filtered_endpoints):
+        for authenticator in HttpAuthenticatorFactory.create_multiple_from(endpoints=endpoints):
             authenticator.events.on('blocking-response-required', self.handle_block_response_required_event)
             authenticators.append(authenticator)
 
@@ -0,0 +1,101 @@
+from time import perf_counter
+from typing import Optional, Iterator, Protocol
+
+from dnastack.common.environments import env
+
+DEFAULT_BUFFER_SIZE = int(env('DNASTACK_IO_BUFFER_SIZE',
+                              default=256 * 1024,
+                              description='Initial size (in bytes) of the buffer used to stream the downloads'))
+MAX_BUFFER_SIZE = int(env('DNASTACK_IO_MAX_BUFFER_SIZE',
+                          default=8 * 1024 * 1024,
+                          description='Maximum size (in bytes) of the buffer used to stream the downloads'))
+
+
+class ReadableInto(Protocol):
+    def readinto(self, b) -> Optional[int]:
+        ...
+
+
+class DecodedContentReader:
+    """
+    Adapter of "readinto" for the HTTP responses which are decoded on the fly (e.g., "Content-Encoding: gzip")
+
+    The "readinto" of urllib3 responses reads up to the size of the buffer from the socket and then decodes it, so the
+    decoded data may not fit into the buffer or may be empty before the end of the stream. This adapter keeps the
+    remainder of the decoded data for the next read and keeps reading until there is some data or the stream ends.
+    """
+
+    def __init__(self, response):
+        self.__response = response
+        self.__pending = memoryview(b'')
+
+    def readinto(self, b) -> int:
+        while not self.__pending and not self.__response.closed:
+            self.__pending = memoryview(self.__response.read(len(b), decode_content=True))
+
+        read_byte_count = min(len(b), len(self.__pending))
+        b[:read_byte_count] = self.__pending[:read_byte_count]
+        self.__pending = self.__pending[read_byte_count:]
+
+        return read_byte_count
+
+    @staticmethod
+    def is_required(reader) -> bool:
+        headers = getattr(reader, 'headers', None)
+        content_encoding = (headers.get('Content-Encoding') if headers is not None else None) or 'identity'
+        return bool(getattr(reader, 'decode_content', False)) and content_encoding.lower() != 'identity'
+
+
+class AdaptiveBuffer:
+    """
+    Reusable read buffer which grows with the observed throughput
+
+    The buffer doubles (up to the maximum size) whenever a read fills it faster than the target duration, i.e., the
+    source delivers data faster than the buffer can hold. The data is read into the same bytearray, so the views
+    returned by "read_from" and "chunks" are only valid until the next read.
+    """
+
+    TARGET_READ_DURATION = 0.05  # seconds
+
+    def __init__(self, initial_size: Optional[int] = None, max_size: Optional[int] = None):
+        self.__max_size = max(max_size or MAX_BUFFER_SIZE, 1)
+        self.__buffer = bytearray(min(initial_size or DEFAULT_BUFFER_SIZE, self.__max_size))
+        self.__view = memoryview(self.__buffer)
+
+    @property
+    def size(self) -> int:
+        return len(self.__buffer)
+
+    def read_from(self, reader: ReadableInto) -> memoryview:
+        """
+        Read the next chunk. Return an empty view at the end of the stream.
+
+        The reader must not decode the content on the fly; "chunks" takes care of the responses which do.
+        """
+        started_at = perf_counter()
+        read_byte_count = reader.readinto(self.__view) or 0
+        duration = perf_counter() - started_at
+
+        chunk = self.__view[:read_byte_count]
+
+        if read_byte_count == len(self.__buffer) and duration < self.TARGET_READ_DURATION:
+            self.__grow()
+
+        return chunk
+
+    def chunks(self, reader: ReadableInto) -> Iterator[memoryview]:
+        if DecodedContentReader.is_required(reader):
+            reader = DecodedContentReader(reader)
+
+        while True:
+            chunk = self.read_from(reader)
+            if not chunk:
+                return
+            yield chunk
+
+    def __grow(self):
+        new_size = min(len(self.__buffer) * 2, self.__max_size)
+        if new_size > len(self.__buffer):
+            # The views of the previous chunk may still be alive, so the new buffer is a new object.
+            self.__buffer = bytearray(new_size)
+            self.__view = memoryview(self.__buffer)
@@ -0,0 +1,218 @@
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+from threading import Lock
+from time import time
+from typing import Optional, NamedTuple, BinaryIO, Iterable, List, Tuple
+
+from dnastack.common.environments import env, flag
+from dnastack.common.logger import get_logger
+from dnastack.common.throttling import parse_byte_size
+
+# The hash algorithms which can be verified locally, by the normalized names of the checksum types
+SUPPORTED_ALGORITHMS = {
+    'sha256': 'sha256',
+    'sha512': 'sha512',
+    'sha1': 'sha1',
+    'md5': 'md5',
+}
+
+# NOTE: This is the "FICLONE" request of "ioctl" on Linux, which creates a copy-on-write clone of a file (reflink).
+_FICLONE = 0x40049409
+
+
+class ContentKey(NamedTuple):
+    algorithm: str
+    checksum: str
+
+    @classmethod
+    def make(cls, checksum_type: str, checksum: str) -> Optional['ContentKey']:
+        """ Return the key if the checksum can be verified locally. Otherwise, return None. """
+        algorithm = (checksum_type or '').lower().replace('-', '').replace('_', '')
+        checksum = (checksum or '').strip().lower()
+
+        if algorithm not in SUPPORTED_ALGORITHMS or not checksum or not checksum.isalnum():
+            return None
+
+        return cls(algorithm, checksum)
+
+    def create_hasher(self):
+        return hashlib.new(SUPPORTED_ALGORITHMS[self.algorithm])
+
+
+class ContentCache:
+    """
+    Local content-addressed cache of files, keyed by the checksum of their content
+
+    The files are stored as read-only files under "<directory>/<algorithm>/<first two characters>/<checksum>". When
+    the total size exceeds the maximum size, the least recently used files (by access time) are evicted until the
+    total size is back to the eviction target. The cached files are restored by reflink (copy-on-write clone) or by
+    copy. With "hard_link", they are restored by hard link first, so the restored files are read-only and share their
+    content with the cache, i.e., they must not be modified in place.
+
+    The cache can be shared by concurrent processes as the files are added atomically.
+    """
+
+    # The ratio of the maximum size to which each eviction reduces the cache, so that it is not walked on every put
+    EVICTION_TARGET_RATIO = 0.9
+
+    def __init__(self, directory: str, max_size: int, hard_link: bool = False):
+        self._logger = get_logger(type(self).__name__)
+        self.__directory = directory
+        self.__max_size = max_size
+        self.__hard_link = hard_link
+        self.__eviction_lock = Lock()
+        self.__total_size: Optional[int] = None
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @classmethod
+    def from_environment(cls) -> Optional['ContentCache']:
+        """
+        Create the cache configured with "DNASTACK_DRS_CACHE_DIR", "DNASTACK_DRS_CACHE_MAX_SIZE", and
+        "DNASTACK_DRS_CACHE_HARD_LINK", if enabled
+        """
+        directory = env('DNASTACK_DRS_CACHE_DIR',
+                        required=False,
+                        description='Directory of the local cache of the DRS downloads (disabled if not set)')
+        if not directory:
+            return None
+
+        max_size = env('DNASTACK_DRS_CACHE_MAX_SIZE',
+                       default='10G',
+                       description='Maximum size of the local cache of the DRS downloads, e.g., 500M or 10G')
+
+        hard_link = flag('DNASTACK_DRS_CACHE_HARD_LINK',
+                         description='Restore the cached DRS downloads by hard link. The restored files are read-only '
+                                     'and must not be modified in place.')
+
+        return cls(os.path.expanduser(directory), parse_byte_size(str(max_size)), hard_link=hard_link)
+
+    def get_path(self, key: ContentKey) -> str:
+        return os.path.join(self.__directory, key.algorithm, key.checksum[:2], key.checksum)
+
+    def get(self, key: ContentKey) -> Optional[str]:
+        """ Return the path to the cached file (and mark it as recently used) or None if it is not cached """
+        path = self.get_path(key)
+        try:
+            # Only the access time is updated as the modification time is shared with the hard-linked files.
+            os.utime(path, (time(), os.stat(path).st_mtime))
+        except OSError:
+            return None
+        return path
+
+    def restore(self, key: ContentKey, destination_path: str) -> bool:
+        """ Restore the cached content to the destination. Return false if the content is not cached. """
+        cached_path = self.get(key)
+        if not cached_path:
+            return False
+
+        if os.path.lexists(destination_path):
+            os.remove(destination_path)
+
+        if self.__reflink(cached_path, destination_path):
+            return True
+
+        if self.__hard_link:
+            try:
+                os.link(cached_path, destination_path)
+                return True
+            except OSError:
+                pass
+
+        shutil.copyfile(cached_path, destination_path)
+        return True
+
+    def put(self, key: ContentKey, source_path: str):
+        """ Add a copy of the file to the cache """
+        with open(source_path, 'rb') as source:
+            self.put_stream(key, source)
+
+    def put_stream(self, key: ContentKey, source: BinaryIO):
+        """ Add the content of the stream to the cache """
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temp_file:
+                shutil.copyfileobj(source, temp_file)
+                size = temp_file.tell()
+            os.chmod(temp_path, 0o444)
+            replaced_size = os.stat(path).st_size if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self.__eviction_lock:
+            if self.__total_size is None:
+                self.__total_size = sum(size for _, size, _ in self.__list_entries())
+            else:
+                self.__total_size += size - replaced_size
+            over_limit = self.__total_size > self.__max_size
+
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """ Remove the least recently used files until the total size is within the eviction target """
+        with self.__eviction_lock:
+            entries = self.__list_entries()
+            total_size = sum(size for _, size, _ in entries)
+            target_size = self.__max_size * self.EVICTION_TARGET_RATIO
+
+            for _, size, path in sorted(entries):
+                if total_size <= target_size:
+                    break
+                try:
+                    os.remove(path)
+                    total_size -= size
+                except OSError as e:
+                    if e.errno != errno.ENOENT:
+                        self._logger.warning(f'Failed to evict {path}: {e}')
+
+            # Entries added or removed by the other processes are taken into account here.
+            self.__total_size = total_size
+
+    def __list_entries(self) -> List[Tuple[float, int, str]]:
+        """ Return the access time, the size, and the path of every cached file """
+        entries = []
+        for path in self.__iterate_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        return entries
+
+    def __iterate_files(self) -> Iterable[str]:
+        for parent_path, _, file_names in os.walk(self.__directory):
+            for file_name in file_names:
+                if not file_name.startswith('.'):
+                    yield os.path.join(parent_path, file_name)
+
+    @staticmethod
+    def __reflink(source_path: str, destination_path: str) -> bool:
+        try:
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+            with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+                fcntl.ioctl(destination.fileno(), _FICLONE, source.fileno())
+            return True
+        except OSError:
+            if os.path.exists(destination_path):
+                os.remove(destination_path)
+            return False
@@ -1,23 +1,50 @@
-import hashlib
 import logging
+from collections import deque
 from copy import deepcopy
-from typing import Any, Dict, Optional, Callable, List, Union
+from threading import RLock, Condition, Thread, current_thread
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Callable, List, Union, Mapping, Tuple, Hashable, Deque
 
-from pydantic import Field, BaseModel
+from pydantic import BaseModel, ConfigDict, PrivateAttr, field_serializer, field_validator
 
 from dnastack.common.logger import get_logger
 
 
 class Event(BaseModel):
-    details: Dict[str, Any]
-    propagated: bool = Field(default=True)
+    """
+    Immutable Event
+
+    The details are a read-only view of a shallow copy of the given details. Use "with_details" to derive an event with
+    different details.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    details: Mapping[str, Any]
+
+    _propagated: bool = PrivateAttr(default=True)
+
+    @field_validator('details', mode='after')
+    @classmethod
+    def _freeze_details(cls, details: Mapping[str, Any]) -> Mapping[str, Any]:
+        return MappingProxyType(dict(details))
+
+    @field_serializer('details')
+    def _serialize_details(self, details: Mapping[str, Any]) -> Dict[str, Any]:
+        return dict(details)
+
+    @property
+    def propagated(self) -> bool:
+        return self._propagated
 
     def stop_propagation(self):
-        self.propagated = False
+        self._propagated = False
+
+    def with_details(self, **changes):
+        return type(self)(details={**self.details, **changes})
 
     @classmethod
     def make(cls, details: Optional[Dict[str, Any]] = None):
-        return Event(details=deepcopy(details) if details else {})
+        return Event(details=details or {})
 
 
 class EventHandler:
@@ -52,11 +79,16 @@ class AbstractEventSource:
         raise NotImplementedError()
 
 
+# Function to compute the coalescing key of an event, e.g., the URL of the file for download progress events
+CoalescingKeyFunction = Callable[[Event], Hashable]
+
+
 class EventSource(AbstractEventSource):
     """
     Event Source
 
-    This is not thread-safe.
+    The registration and the dispatch are thread-safe. By default, the handlers are invoked on the dispatching thread.
+    With "start_async_delivery", the events are queued and delivered by a dedicated thread instead.
     """
 
     def __init__(self, fixed_types: Optional[List[str]] = None, origin: Optional[Any] = None):
@@ -70,8 +102,11 @@ class EventSource(AbstractEventSource):
                 self._alias = f'{type(self._origin).__name__}/{hash(self._origin)}/{self._alias}'
 
         self._event_logger = get_logger(self._alias, logging.WARNING)
-        self._event_handlers: Dict[str, List[Union[EventHandler, Callable[[Event], None]]]] = {}
+        self._lock = RLock()
+        # NOTE: The handler tuples are replaced, not modified, so that the dispatch can iterate without locking.
+        self._event_handlers: Dict[str, Tuple[Union[EventHandler, Callable[[Event], None]], ...]] = {}
         self._fixed_types = fixed_types or []
+        self._async_delivery: Optional[_AsyncDelivery] = None
 
         self._event_logger.debug('Initialized')
 
@@ -79,72 +114,110 @@ class EventSource(AbstractEventSource):
         return str(hash(self))
 
     def get_fixed_types(self) -> List[str]:
-        return deepcopy(self._fixed_types)
+        with self._lock:
+            return deepcopy(self._fixed_types)
 
     def add_fixed_types(self, *fixed_types):
-        self._fixed_types.extend(fixed_types)
+        with self._lock:
+            self._fixed_types = self._fixed_types + list(fixed_types)
+
+    def has_listeners(self, event_type: str) -> bool:
+        """ Check if any handlers are listening to the event type, e.g., to skip building expensive events """
+        return bool(self._event_handlers.get(event_type))
 
     def dispatch(self, event_type: str, event: Union[None, Event, Dict[str, Any]]):
         self._raise_error_for_non_registered_event_type(event_type)
-        actual_event = event if isinstance(event, Event) else Event.make(details=event)
 
-        event_logger = get_logger(
-            f'{self._event_logger.name}/{event_type}/{self._compute_event_hash(actual_event)}/DISPATCH',
-            self._event_logger.level
-        )
+        handlers = self._event_handlers.get(event_type)
+        if not handlers:
+            return
 
-        event_logger.debug('BEGIN')
+        actual_event = event if isinstance(event, Event) else Event.make(details=event)
 
-        if event_type in self._event_handlers:
-            for handler in self._event_handlers[event_type]:
-                if not actual_event.propagated:
-                    break
-                event_logger.debug(f'INVOKE {handler}')
-                handler(actual_event)
+        async_delivery = self._async_delivery
+        if async_delivery and async_delivery.accepts(event_type):
+            async_delivery.put(event_type, actual_event)
         else:
-            pass
+            self._deliver(event_type, actual_event, handlers)
+
+    def start_async_delivery(self,
+                             event_types: Optional[List[str]] = None,
+                             coalesced_types: Optional[Dict[str, Optional[CoalescingKeyFunction]]] = None):
+        """
+        Deliver the events of the given types (or all events if not specified) on a dedicated thread
+
+        The dispatching threads only queue the events. For each coalesced type, only the latest pending event per
+        coalescing key is delivered. If the key function is not given, only the latest pending event of the type is
+        delivered.
+        """
+        with self._lock:
+            if not self._async_delivery:
+                self._async_delivery = _AsyncDelivery(self, event_types, coalesced_types or {})
+        return self
+
+    def stop_async_delivery(self, timeout: Optional[float] = None):
+        """ Deliver all pending events and switch back to the synchronous delivery """
+        with self._lock:
+            async_delivery = self._async_delivery
+            self._async_delivery = None
+
+        if async_delivery:
+            async_delivery.stop(timeout)
 
-        event_logger.debug('END')
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """ Wait until all queued events are delivered. Return False on timeout. """
+        async_delivery = self._async_delivery
+        return async_delivery.flush(timeout) if async_delivery else True
 
     def on(self, event_type: str, handler: Union[EventHandler, Callable[[Event], None]]):
         self._raise_error_for_non_registered_event_type(event_type)
 
-        if event_type not in self._event_handlers:
-            self._event_handlers[event_type] = []
+        with self._lock:
+            handlers = self._event_handlers.get(event_type, tuple())
 
-        if handler in self._event_handlers[event_type]:
-            self._event_logger.debug(f'E/{event_type}: IGNORE BINDING {handler} (duplicate)')
-        else:
-            self._event_handlers[event_type].append(handler)
-            self._event_logger.debug(f'E/{event_type}: BIND {handler}')
+            if handler in handlers:
+                self._event_logger.debug(f'E/{event_type}: IGNORE BINDING {handler} (duplicate)')
+            else:
+                self._event_handlers[event_type] = handlers + (handler,)
+                self._event_logger.debug(f'E/{event_type}: BIND {handler}')
 
         return self
 
     def off(self, event_type: str, handler: Union[EventHandler, Callable[[Event], None]]):
         self._raise_error_for_non_registered_event_type(event_type)
 
-        if event_type not in self._event_handlers:
-            self._event_handlers[event_type] = []
-
-        new_handlers = [
-            existing_handler
-            for existing_handler in self._event_handlers[event_type]
-            if hash(handler) != hash(existing_handler)
-        ]
-
-        self._event_handlers[event_type] = new_handlers
-        self._event_logger.debug(f'E/{event_type}: UNBIND {handler}')
+        with self._lock:
+            self._event_handlers[event_type] = tuple(
+                existing_handler
+                for existing_handler in self._event_handlers.get(event_type, tuple())
+                if hash(handler) != hash(existing_handler)
+            )
+            self._event_logger.debug(f'E/{event_type}: UNBIND {handler}')
 
         return self
 
     def clear(self, event_type: Optional[str] = None):
-        if event_type:
-            if event_type in self._event_handlers:
-                self._event_handlers[event_type].clear()
+        with self._lock:
+            if event_type:
+                if event_type in self._event_handlers:
+                    self._event_handlers[event_type] = tuple()
+                else:
+                    pass
             else:
-                pass
-        else:
-            self._event_handlers.clear()
+                self._event_handlers.clear()
+
+    def _deliver(self,
+                 event_type: str,
+                 event: Event,
+                 handlers: Optional[Tuple[Union[EventHandler, Callable[[Event], None]], ...]] = None):
+        debug_enabled = self._event_logger.isEnabledFor(logging.DEBUG)
+
+        for handler in (handlers if handlers is not None else self._event_handlers.get(event_type, tuple())):
+            if not event.propagated:
+                break
+            if debug_enabled:
+                self._event_logger.debug(f'E/{event_type}: INVOKE {handler}')
+            handler(event)
 
     def _raise_error_for_non_registered_event_type(self, event_type: str):
         if self._fixed_types and event_type not in self._fixed_types:
@@ -162,15 +235,6 @@ class EventSource(AbstractEventSource):
         self._event_logger.debug(f'SET RELAY ON {event_type}: {origin} => {self}')
         origin.on(event_type, EventRelay(self, event_type))
 
-    @staticmethod
-    def _compute_event_hash(obj: Event) -> str:
-        h = hashlib.new('sha1')
-        try:
-            h.update(obj.model_dump_json().encode('utf-8'))
-        except TypeError:
-            h.update(str(obj.model_dump()).encode('utf-8'))
-        return h.hexdigest()[:8]
-
     def __repr__(self):
         return self._alias
 
@@ -186,3 +250,80 @@ class EventRelay(EventHandler):
         self.__logger.debug('Relaying...')
         self.__relay_source.dispatch(self.__event_type, event)
         self.__logger.debug('Relayed')
+
+
+class _AsyncDelivery:
+    """ Queue of the events to deliver on a dedicated thread, with the coalescing of high-frequency event types """
+
+    def __init__(self,
+                 source: EventSource,
+                 event_types: Optional[List[str]],
+                 coalesced_types: Dict[str, Optional[CoalescingKeyFunction]]):
+        self.__source = source
+        self.__event_types = set(event_types) if event_types is not None else None
+        self.__coalesced_types = coalesced_types
+        self.__logger = get_logger(f'{source}/async-delivery', logging.WARNING)
+        self.__condition = Condition()
+        # Each entry is either (event type, event, None) or (event type, None, coalescing key).
+        self.__queue: Deque[Tuple[str, Optional[Event], Optional[Tuple[str, Hashable]]]] = deque()
+        self.__pending_coalesced_events: Dict[Tuple[str, Hashable], Event] = {}
+        self.__busy = False
+        self.__running = True
+        self.__thread = Thread(target=self.__run, name=f'{source}/async-delivery', daemon=True)
+        self.__thread.start()
+
+    def accepts(self, event_type: str) -> bool:
+        return self.__event_types is None or event_type in self.__event_types
+
+    def put(self, event_type: str, event: Event):
+        with self.__condition:
+            if event_type in self.__coalesced_types:
+                get_key = self.__coalesced_types[event_type]
+                key = (event_type, get_key(event) if get_key else None)
+                if key not in self.__pending_coalesced_events:
+                    self.__queue.append((event_type, None, key))
+                self.__pending_coalesced_events[key] = event
+            else:
+                self.__queue.append((event_type, event, None))
+
+            self.__condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        if current_thread() is self.__thread:
+            # A handler cannot wait for itself.
+            return False
+
+        with self.__condition:
+            return self.__condition.wait_for(lambda: not self.__queue and not self.__busy, timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        with self.__condition:
+            self.__running = False
+            self.__condition.notify_all()
+
+        if current_thread() is not self.__thread:
+            self.__thread.join(timeout)
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__queue and self.__running:
+                    self.__condition.wait()
+
+                if not self.__queue:
+                    return
+
+                event_type, event, key = self.__queue.popleft()
+                if key is not None:
+                    event = self.__pending_coalesced_events.pop(key)
+
+                self.__busy = True
+
+            try:
+                self.__source._deliver(event_type, event)
+            except Exception as e:
+                self.__logger.error(f'E/{event_type}: Failed to deliver the event: {type(e).__name__}: {e}')
+            finally:
+                with self.__condition:
+                    self.__busy = False
+                    self.__condition.notify_all()
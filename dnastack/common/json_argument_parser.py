@@ -3,7 +3,7 @@ import sys
 import traceback
 from enum import Enum
 from io import UnsupportedOperation
-from typing import List, Dict, Union, Tuple
+from typing import List, Dict, Union, Tuple, Iterator
 
 # from dnastack.cli.workbench.utils import UnableToDecodeFileError, UnableToDecodeJSONDataError
 from dnastack.common.logger import get_logger
@@ -64,6 +64,23 @@ class FileOrValue:
             loaded_value = read_file_content(self.raw_value)
         return loaded_value
 
+    def iterate_items(self, separator: str = LIST_SEPARATOR) -> Iterator[str]:
+        """ Iterate the non-empty items separated by new lines or the separator, reading the file or stdin lazily """
+        if self.argument_type == ArgumentType.STDIN_PARAM_TYPE:
+            if sys.stdin.isatty():
+                raise ValueError("No input provided via stdin")
+            lines = sys.stdin
+        elif self.argument_type == ArgumentType.FILE:
+            lines = iterate_file_lines(self.raw_value)
+        else:
+            lines = self.raw_value.split('\n')
+
+        for line in lines:
+            for item in line.split(separator):
+                item = item.strip()
+                if item:
+                    yield item
+
 
 class JsonLike(FileOrValue):
     def parsed_value(self) -> JSONType:
@@ -137,6 +154,13 @@ def read_file_content(argument: str) -> str:
         return argument_fp.read()
 
 
+def iterate_file_lines(argument: str) -> Iterator[str]:
+    # Handle file with "@" prefix
+    argument = argument.replace("@", "", 1)
+    with open(argument) as argument_fp:
+        yield from argument_fp
+
+
 def read_stdin(argument: str) -> str:
     # Handle stdin with "-"
     if argument == "-":
@@ -0,0 +1,217 @@
+import errno
+import hashlib
+import json
+import os
+import socket
+import threading
+from time import time
+from typing import Optional, Dict, Any
+from uuid import uuid4
+
+from dnastack.common.logger import get_logger
+
+
+class LeaseCoordinator:
+    """
+    Coordination of the work items shared by cooperating processes, possibly on different hosts, through a directory
+
+    A process claims an item by creating its lease file exclusively ("leases/<digest>.lease"). While the item is in
+    progress, the lease is kept alive by a background heartbeat which refreshes the modification time of the lease
+    file. A lease which has not been refreshed for "ttl" seconds is considered stalled (e.g., the process crashed) and
+    can be reclaimed by any other process. When an item is completed, a marker ("done/<digest>.json") records the
+    result so that no process claims it again.
+
+    The directory must be shared by all processes (e.g., on a network file system), and the TTL must be much longer
+    than the clock skew between the hosts.
+    """
+
+    def __init__(self, directory: str, ttl: float = 60, owner: Optional[str] = None):
+        self._logger = get_logger(type(self).__name__)
+        self.__directory = directory
+        self.__ttl = ttl
+        self.__owner = owner or f'{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}'
+        self.__lock = threading.Lock()
+        self.__held_lease_paths: Dict[str, str] = {}
+        self.__heartbeat_stopped = threading.Event()
+        self.__heartbeat_thread: Optional[threading.Thread] = None
+
+        os.makedirs(os.path.join(directory, 'leases'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'done'), exist_ok=True)
+
+    @property
+    def owner(self) -> str:
+        return self.__owner
+
+    @property
+    def ttl(self) -> float:
+        return self.__ttl
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """ Start the heartbeat """
+        if self.__heartbeat_thread is None:
+            self.__heartbeat_stopped.clear()
+            self.__heartbeat_thread = threading.Thread(target=self.__heartbeat,
+                                                       name=f'{type(self).__name__}/heartbeat',
+                                                       daemon=True)
+            self.__heartbeat_thread.start()
+
+    def stop(self):
+        """ Stop the heartbeat, and release the leases still held by this process """
+        if self.__heartbeat_thread is not None:
+            self.__heartbeat_stopped.set()
+            self.__heartbeat_thread.join()
+            self.__heartbeat_thread = None
+
+        with self.__lock:
+            items = list(self.__held_lease_paths.keys())
+        for item in items:
+            self.release(item)
+
+    def is_held(self, item: str) -> bool:
+        """ Check if this process still holds the lease of the item, i.e., it has not been reclaimed by another one """
+        with self.__lock:
+            return item in self.__held_lease_paths
+
+    def is_done(self, item: str) -> bool:
+        return os.path.exists(self.__get_done_path(item))
+
+    def get_result(self, item: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.__get_done_path(item), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def claim(self, item: str) -> bool:
+        """ Claim the item. Return false if it is done or claimed by another live process. """
+        if self.is_done(item):
+            return False
+
+        lease_path = self.__get_lease_path(item)
+
+        if not self.__create_lease(lease_path, item):
+            if not self.__remove_stalled_lease(lease_path):
+                return False
+            if not self.__create_lease(lease_path, item):
+                return False
+
+        # The item may have been completed between the check and the creation of the lease.
+        if self.is_done(item):
+            self.__remove_lease(lease_path)
+            return False
+
+        with self.__lock:
+            self.__held_lease_paths[item] = lease_path
+
+        return True
+
+    def complete(self, item: str, result: Optional[Dict[str, Any]] = None):
+        """ Record the item as done, and release its lease """
+        done_path = self.__get_done_path(item)
+        temp_path = f'{done_path}.{uuid4().hex}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(dict(item=item, owner=self.__owner, completed_at=time(), **(result or {})), f)
+        os.replace(temp_path, done_path)
+
+        self.release(item)
+
+    def release(self, item: str):
+        """ Release the lease without completing the item, so that another process can claim it """
+        with self.__lock:
+            lease_path = self.__held_lease_paths.pop(item, None)
+
+        if lease_path and self.__read_owner(lease_path) == self.__owner:
+            self.__remove_lease(lease_path)
+
+    def __heartbeat(self):
+        while not self.__heartbeat_stopped.wait(self.__ttl / 3):
+            with self.__lock:
+                held_lease_paths = dict(self.__held_lease_paths)
+
+            for item, lease_path in held_lease_paths.items():
+                if self.__read_owner(lease_path) != self.__owner:
+                    self._logger.warning(f'The lease of {item} has been reclaimed by another process.')
+                    with self.__lock:
+                        self.__held_lease_paths.pop(item, None)
+                    continue
+
+                try:
+                    os.utime(lease_path)
+                except OSError as e:
+                    self._logger.warning(f'Failed to refresh the lease of {item}: {e}')
+
+    def __create_lease(self, lease_path: str, item: str) -> bool:
+        try:
+            file_descriptor = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(file_descriptor, 'w') as f:
+            json.dump(dict(item=item, owner=self.__owner, claimed_at=time()), f)
+
+        return True
+
+    def __remove_stalled_lease(self, lease_path: str) -> bool:
+        """ Remove the lease if it is stalled. Only one of the competing processes succeeds. """
+        if not self.__is_stalled(lease_path):
+            return False
+
+        # Renaming is atomic, so only one process moves the stalled lease out of the way.
+        moved_path = f'{lease_path}.{uuid4().hex}.stalled'
+        try:
+            os.rename(lease_path, moved_path)
+        except FileNotFoundError:
+            return False
+
+        if not self.__is_stalled(moved_path):
+            # The holder refreshed the lease in the meantime, so put it back unless it is already replaced.
+            try:
+                os.link(moved_path, lease_path)
+            except OSError:
+                pass
+            self.__remove_lease(moved_path)
+            return False
+
+        self._logger.info(f'Reclaiming the stalled lease {os.path.basename(lease_path)} '
+                          f'(owner: {self.__read_owner(moved_path)})')
+        self.__remove_lease(moved_path)
+        return True
+
+    def __is_stalled(self, lease_path: str) -> bool:
+        try:
+            return os.stat(lease_path).st_mtime + self.__ttl < time()
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def __read_owner(lease_path: str) -> Optional[str]:
+        try:
+            with open(lease_path, 'r') as f:
+                return json.load(f).get('owner')
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def __remove_lease(lease_path: str):
+        try:
+            os.remove(lease_path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def __get_lease_path(self, item: str) -> str:
+        return os.path.join(self.__directory, 'leases', f'{self.__digest(item)}.lease')
+
+    def __get_done_path(self, item: str) -> str:
+        return os.path.join(self.__directory, 'done', f'{self.__digest(item)}.json')
+
+    @staticmethod
+    def __digest(item: str) -> str:
+        return hashlib.sha256(item.encode()).hexdigest()
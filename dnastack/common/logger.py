@@ -1,12 +1,17 @@
 # Enable logging for "requests"
+import atexit
 import logging
+from functools import lru_cache
 from http.client import HTTPConnection
-from sys import stderr
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+import sys
+from threading import Lock
 from traceback import print_stack
-from typing import Optional
+from typing import Optional, Dict, Union
 
 from dnastack.common.environments import env
-from dnastack.feature_flags import currently_in_debug_mode, on_debug_mode_change
+from dnastack.feature_flags import currently_in_debug_mode, on_debug_mode_change, async_logging_enabled
 
 __DEBUG_LOG_ACTIVATION_NOTIFIED = False
 
@@ -44,8 +49,31 @@ def reconfigure_logger_on_debug_mode_change(in_debug_mode):
     requests_log.propagate = in_debug_mode
 
 
+class _StandardErrorHandler(logging.StreamHandler):
+    """
+    Stream handler which writes to the current sys.stderr, e.g., the output of the command run by the CLI daemon, unless
+    another stream is set
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__stream = None
+
+    @property
+    def stream(self):
+        return self.__stream or sys.stderr
+
+    @stream.setter
+    def stream(self, stream):
+        self.__stream = stream
+
+    @stream.deleter
+    def stream(self):
+        self.__stream = None
+
+
 logging_format = '[ %(asctime)s | %(levelname)s ] %(name)s: %(message)s'
-logging.basicConfig(format=logging_format)
+logging.basicConfig(format=logging_format, handlers=[_StandardErrorHandler()])
 
 overriding_logging_level_name = env(
     'DNASTACK_LOG_LEVEL',
@@ -59,6 +87,64 @@ reconfigure_logger_on_debug_mode_change(currently_in_debug_mode())
 on_debug_mode_change(reconfigure_logger_on_debug_mode_change)
 
 
+_TRACE_LOGGER_NAME_ATTRIBUTE = 'dnastack_traceable_name'
+
+# Loggers and handlers are shared as they are requested far more often than they are used. The logger cache is bounded
+# as some logger names are unique to an object.
+LOGGER_CACHE_SIZE = 1024
+
+_handler_lock = Lock()
+_handler_cache: Dict[int, logging.Handler] = {}
+_queue_listener: Optional[QueueListener] = None
+
+
+class _TraceableNameFilter(logging.Filter):
+    """ Rename the records from the span loggers to include the trace ID and the span ID """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        traceable_name = getattr(record, _TRACE_LOGGER_NAME_ATTRIBUTE, None)
+        if traceable_name:
+            record.name = traceable_name
+        return True
+
+
+def _make_stream_handler() -> logging.Handler:
+    handler = _StandardErrorHandler()
+    handler.setFormatter(logging.Formatter(logging_format))
+    return handler
+
+
+def _get_handler(level: int) -> logging.Handler:
+    """
+    Get the shared handler of the given level
+
+    When DNASTACK_LOG_ASYNC is enabled, the handler only puts the record into a queue and the records are formatted and
+    written to stderr by a background thread.
+    """
+    global _queue_listener
+
+    handler = _handler_cache.get(level)
+    if handler is not None:
+        return handler
+
+    with _handler_lock:
+        if level not in _handler_cache:
+            if async_logging_enabled:
+                if _queue_listener is None:
+                    _queue_listener = QueueListener(SimpleQueue(), _make_stream_handler())
+                    _queue_listener.start()
+                    atexit.register(_queue_listener.stop)
+                handler = QueueHandler(_queue_listener.queue)
+            else:
+                handler = _make_stream_handler()
+
+            handler.setLevel(level)
+            handler.addFilter(_TraceableNameFilter())
+            _handler_cache[level] = handler
+
+        return _handler_cache[level]
+
+
 class TraceableLogger(logging.Logger):
     def __init__(self, name, level=logging.NOTSET, trace_id: Optional[str] = None, span_id: Optional[str] = None):
         super().__init__(name, level)
@@ -84,24 +170,59 @@ class TraceableLogger(logging.Logger):
         global default_logging_level
 
         self.setLevel(default_logging_level)
-        for handler in self.handlers:
-            handler.setLevel(default_logging_level)
+        for handler in list(self.handlers):
+            self.removeHandler(handler)
+        self.addHandler(_get_handler(default_logging_level))
 
     @classmethod
-    def make(cls, name, level: Optional[int] = None, trace_id: Optional[str] = None, span_id: Optional[str] = None):
-        log_level = level or default_logging_level
+    def make(cls,
+             name,
+             level: Optional[int] = None,
+             trace_id: Optional[str] = None,
+             span_id: Optional[str] = None) -> Union['TraceableLogger', 'SpanLoggerAdapter']:
+        logger = _get_shared_logger(cls, name, level or default_logging_level)
 
-        formatter = logging.Formatter(logging_format)
+        if trace_id and span_id:
+            return SpanLoggerAdapter(logger, trace_id, span_id)
 
-        handler = logging.StreamHandler(stderr)
-        handler.setLevel(log_level)
-        handler.setFormatter(formatter)
+        return logger
 
-        logger = cls(name, level=log_level, trace_id=trace_id, span_id=span_id)
-        logger.setLevel(log_level)
-        logger.addHandler(handler)
 
-        return logger
+@lru_cache(maxsize=LOGGER_CACHE_SIZE)
+def _get_shared_logger(cls, name: str, level: int) -> TraceableLogger:
+    logger = cls(name, level=level)
+    logger.setLevel(level)
+    logger.addHandler(_get_handler(level))
+    return logger
+
+
+class SpanLoggerAdapter(logging.LoggerAdapter):
+    """ Lightweight view of a shared logger with the trace context """
+
+    def __init__(self, logger: TraceableLogger, trace_id: str, span_id: str):
+        super().__init__(logger, None)
+        self.actual_name = logger.actual_name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.__name = f'{self.actual_name},{self.trace_id},{self.span_id}'
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def level(self) -> int:
+        return self.logger.level
+
+    def process(self, msg, kwargs):
+        kwargs['extra'] = {**(kwargs.get('extra') or {}), _TRACE_LOGGER_NAME_ATTRIBUTE: self.name}
+        return msg, kwargs
+
+    def fork(self, level: Optional[int] = None, trace_id: Optional[str] = None, span_id: Optional[str] = None):
+        return self.logger.make(self.actual_name, level or self.level, trace_id, span_id)
+
+    def reconfigure(self):
+        self.logger.reconfigure()
 
 
 def get_logger(name: str, level: Optional[int] = None) -> TraceableLogger:
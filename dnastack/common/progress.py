@@ -0,0 +1,116 @@
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional, Callable, List
+
+from pydantic import BaseModel
+
+
+class TransferProgress(BaseModel):
+    position: int = 0
+    total: int = 0
+    started_at: float
+    updated_at: float
+
+    @property
+    def throughput(self) -> float:
+        """ Average bytes per second since the transfer started """
+        elapsed = self.updated_at - self.started_at
+        return self.position / elapsed if elapsed > 0 else 0.0
+
+
+class ProgressSnapshot(BaseModel):
+    overall: TransferProgress
+    transfers: Dict[str, TransferProgress]
+
+
+ProgressListener = Callable[[ProgressSnapshot], None]
+
+
+class ProgressAggregator:
+    """
+    Aggregated progress of many concurrent transfers
+
+    The running totals are updated incrementally on each update. The listeners are notified at most
+    "max_updates_per_second" times per second, except when a transfer completes. When "keep_completed" is false, the
+    completed transfers are dropped from the snapshots (but not from the overall progress) so that the memory does not
+    grow with the number of transfers. This is thread-safe.
+    """
+
+    def __init__(self,
+                 max_updates_per_second: float = 10,
+                 clock: Callable[[], float] = monotonic,
+                 keep_completed: bool = True):
+        self.__lock = Lock()
+        self.__clock = clock
+        self.__min_interval = 1 / max_updates_per_second if max_updates_per_second > 0 else 0
+        self.__last_notified_at: Optional[float] = None
+        self.__keep_completed = keep_completed
+        self.__listeners: List[ProgressListener] = []
+
+        started_at = self.__clock()
+        self.__overall = TransferProgress(started_at=started_at, updated_at=started_at)
+        self.__transfers: Dict[str, TransferProgress] = {}
+
+    def on_update(self, listener: ProgressListener):
+        self.__listeners.append(listener)
+        return self
+
+    def update(self, key: str, position: int, total: int):
+        """ Set the current position and the total size of the transfer """
+        with self.__lock:
+            now = self.__clock()
+            transfer = self.__transfers.get(key)
+
+            if transfer is None:
+                transfer = TransferProgress(started_at=now, updated_at=now)
+                self.__transfers[key] = transfer
+
+            self.__overall.position += position - transfer.position
+            self.__overall.total += total - transfer.total
+            self.__overall.updated_at = now
+
+            transfer.position = position
+            transfer.total = total
+            transfer.updated_at = now
+
+            completed = total > 0 and position >= total
+            if completed and not self.__keep_completed:
+                del self.__transfers[key]
+
+            snapshot = self.__take_snapshot_if_due(now, force=completed)
+
+        self.__notify(snapshot)
+
+    def snapshot(self) -> ProgressSnapshot:
+        with self.__lock:
+            return self.__take_snapshot()
+
+    def __take_snapshot_if_due(self, now: float, force: bool) -> Optional[ProgressSnapshot]:
+        if not self.__listeners:
+            return None
+
+        if not force and self.__last_notified_at is not None and now - self.__last_notified_at < self.__min_interval:
+            return None
+
+        self.__last_notified_at = now
+        return self.__take_snapshot()
+
+    def __take_snapshot(self) -> ProgressSnapshot:
+        return ProgressSnapshot(overall=self.__overall.model_copy(),
+                                transfers={k: v.model_copy() for k, v in self.__transfers.items()})
+
+    def __notify(self, snapshot: Optional[ProgressSnapshot]):
+        if snapshot is None:
+            return
+
+        for listener in self.__listeners:
+            listener(snapshot)
+
+
+def format_byte_rate(bytes_per_second: float) -> str:
+    rate = bytes_per_second
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if rate < 1024:
+            return f'{rate:.1f} {unit}/s'
+        rate /= 1024
+    return f'{rate:.1f} TiB/s'
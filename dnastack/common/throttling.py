@@ -0,0 +1,120 @@
+import re
+from threading import Lock, Condition
+from time import monotonic, sleep
+from typing import Optional, Callable
+
+_RE_BYTE_SIZE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*$', re.IGNORECASE)
+_BYTE_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_byte_size(value: str) -> int:
+    """ Parse the number of bytes, e.g., "512", "64K", "1.5M", or "2GiB" (the units are binary) """
+    match = _RE_BYTE_SIZE.search(value)
+    if not match:
+        raise ValueError(f'Invalid byte size ({value})')
+    return int(float(match.group(1)) * _BYTE_SIZE_UNITS[match.group(2).upper()])
+
+
+class ByteRateLimiter:
+    """
+    Thread-safe token bucket which caps the rate of the bytes shared by all callers
+
+    The bucket holds up to one second worth of bytes. A caller may take more bytes than available, in which case it
+    sleeps until the debt is paid back, so that large chunks are throttled as accurately as small ones.
+    """
+
+    def __init__(self, bytes_per_second: int, clock: Callable[[], float] = monotonic, sleeper=sleep):
+        assert bytes_per_second > 0, 'The rate must be positive.'
+        self.__rate = bytes_per_second
+        self.__clock = clock
+        self.__sleep = sleeper
+        self.__lock = Lock()
+        self.__available = float(bytes_per_second)
+        self.__updated_at = clock()
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.__rate
+
+    def acquire(self, byte_count: int):
+        with self.__lock:
+            now = self.__clock()
+            self.__available = min(self.__rate, self.__available + (now - self.__updated_at) * self.__rate)
+            self.__updated_at = now
+            self.__available -= byte_count
+            deficit = -self.__available
+
+        if deficit > 0:
+            self.__sleep(deficit / self.__rate)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Thread-safe gate which limits the number of concurrent tasks according to the observed throughput
+
+    The limit starts at the initial value and is re-evaluated every adjustment interval (hill climbing): it increases
+    while the throughput keeps improving, and decreases when the throughput drops. It never goes beyond the range
+    between 1 and the maximum.
+    """
+
+    ADJUSTMENT_INTERVAL = 2.0  # seconds
+    IMPROVEMENT_THRESHOLD = 1.05
+    DEGRADATION_THRESHOLD = 0.9
+
+    def __init__(self, max_limit: int, initial_limit: Optional[int] = None, clock: Callable[[], float] = monotonic):
+        assert max_limit > 0, 'The maximum limit must be positive.'
+        self.__max_limit = max_limit
+        self.__limit = max(1, min(initial_limit or max_limit, max_limit))
+        self.__clock = clock
+        self.__condition = Condition()
+        self.__active_count = 0
+        self.__window_started_at = clock()
+        self.__window_byte_count = 0
+        self.__last_throughput: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        return self.__limit
+
+    @property
+    def max_limit(self) -> int:
+        return self.__max_limit
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def acquire(self):
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__active_count < self.__limit)
+            self.__active_count += 1
+
+    def release(self):
+        with self.__condition:
+            self.__active_count -= 1
+            self.__condition.notify_all()
+
+    def record(self, byte_count: int):
+        """ Record the transferred bytes, and adjust the limit at the end of each interval """
+        with self.__condition:
+            self.__window_byte_count += byte_count
+
+            now = self.__clock()
+            elapsed_time = now - self.__window_started_at
+            if elapsed_time < self.ADJUSTMENT_INTERVAL:
+                return
+
+            throughput = self.__window_byte_count / elapsed_time
+            self.__window_started_at = now
+            self.__window_byte_count = 0
+
+            if self.__last_throughput is None or throughput >= self.__last_throughput * self.IMPROVEMENT_THRESHOLD:
+                self.__limit = min(self.__limit + 1, self.__max_limit)
+            elif throughput < self.__last_throughput * self.DEGRADATION_THRESHOLD:
+                self.__limit = max(self.__limit - 1, 1)
+
+            self.__last_throughput = throughput
+            self.__condition.notify_all()
@@ -1,5 +1,8 @@
+import json
 import os
 import shutil
+from contextlib import contextmanager
+from typing import Optional, Tuple, Iterator
 
 import yaml
 from imagination.decorator import service, EnvironmentVariable
@@ -14,6 +17,13 @@ from dnastack.common.logger import get_logger
 from dnastack.configuration.models import Configuration, DEFAULT_CONTEXT
 from dnastack.constants import LOCAL_STORAGE_DIRECTORY
 from dnastack.context.models import Context
+from dnastack.feature_flags import config_snapshot_enabled
+
+# Use the C-accelerated loader when LibYAML is available.
+_YamlSafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# (mtime in nanoseconds, size in bytes) of the configuration file
+_SourceSignature = Tuple[int, int]
 
 
 class InvalidExistingConfigurationError(RuntimeError):
@@ -27,12 +37,23 @@ class InvalidExistingConfigurationError(RuntimeError):
     ]
 )
 class ConfigurationManager:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, use_snapshot: Optional[bool] = None):
         self.__logger = get_logger(f'{type(self).__name__}')
         self.__file_path = file_path
         self.__swap_file_path = f'{self.__file_path}.swp'
+        self.__snapshot_file_path = f'{self.__file_path}.snapshot.json'
+        self.__use_snapshot = config_snapshot_enabled if use_snapshot is None else use_snapshot
+
+        # In-process cache of the migrated configuration, validated with the signature of the source file.
+        self.__cached_configuration: Optional[Configuration] = None
+        self.__cached_source_signature: Optional[_SourceSignature] = None
 
     def hard_reset(self):
+        self.__clear_cache()
+
+        if os.path.exists(self.__snapshot_file_path):
+            os.unlink(self.__snapshot_file_path)
+
         if os.path.exists(self.__file_path):
             self.__logger.warning('Resetting the configuration')
             os.unlink(self.__file_path)
@@ -48,13 +69,40 @@ class ConfigurationManager:
             return f.read()
 
     def load(self) -> Configuration:
-        """ Load the configuration object """
+        """
+        Load the configuration object
+
+        The parsed configuration is cached in memory (and, optionally, as a pre-parsed snapshot on disk) until the
+        modification time or the size of the configuration file changes. Every call returns a new copy, so callers
+        can modify the returned object freely.
+        """
+        source_signature = self.__get_source_signature()
+
+        if source_signature is None:
+            return Configuration()
+
+        if self.__cached_configuration is not None and self.__cached_source_signature == source_signature:
+            return self.__cached_configuration.model_copy(deep=True)
+
+        config = self.__load_snapshot(source_signature) if self.__use_snapshot else None
+
+        if config is None:
+            config = self.__parse()
+            if self.__use_snapshot:
+                self.__save_snapshot(config, source_signature)
+
+        self.__cached_configuration = config
+        self.__cached_source_signature = source_signature
+
+        return config.model_copy(deep=True)
+
+    def __parse(self) -> Configuration:
         self.__logger.debug(f'Reading the configuration from {self.__file_path}...')
         raw_config = self.load_raw()
         if not raw_config or raw_config.strip() in ('', '{}'):
             return Configuration()
         try:
-            parsed_config = yaml.load(raw_config, Loader=yaml.SafeLoader)
+            parsed_config = yaml.load(raw_config, Loader=_YamlSafeLoader)
             # Handle empty or None yaml results
             if not parsed_config or parsed_config == {}:
                 return Configuration()
@@ -63,6 +111,43 @@ class ConfigurationManager:
         except ValidationError as e:
             raise InvalidExistingConfigurationError(f'The existing configuration file at {self.__file_path} is invalid.') from e
 
+    def __get_source_signature(self) -> Optional[_SourceSignature]:
+        try:
+            stat = os.stat(self.__file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def __load_snapshot(self, source_signature: _SourceSignature) -> Optional[Configuration]:
+        """ Load the pre-parsed (and already migrated) configuration if it is made from the current source file """
+        try:
+            with open(self.__snapshot_file_path, 'r') as f:
+                snapshot = json.load(f)
+            if tuple(snapshot['source']) != source_signature:
+                return None
+            config = Configuration(**snapshot['configuration'])
+        except (OSError, ValueError, KeyError, TypeError, ValidationError):
+            # The snapshot is disposable. When it is unavailable or unusable, the source file will be parsed instead.
+            return None
+
+        self.__logger.debug(f'Restored the configuration from the snapshot at {self.__snapshot_file_path}')
+        return config
+
+    def __save_snapshot(self, configuration: Configuration, source_signature: _SourceSignature):
+        temp_file_path = f'{self.__snapshot_file_path}.swp'
+        try:
+            with open(temp_file_path, 'w') as f:
+                json.dump(dict(source=list(source_signature),
+                               configuration=configuration.model_dump(exclude_none=True)),
+                          f)
+            os.replace(temp_file_path, self.__snapshot_file_path)
+        except (OSError, TypeError, ValueError) as e:
+            self.__logger.debug(f'Unable to save the configuration snapshot: {e}')
+
+    def __clear_cache(self):
+        self.__cached_configuration = None
+        self.__cached_source_signature = None
+
     def save(self, configuration: Configuration):
         """ Save the configuration object """
         # Note (1): This is designed to have file operation done as quickly as possible to reduce race conditions.
@@ -92,6 +177,25 @@ class ConfigurationManager:
         shutil.copyfile(self.__swap_file_path, self.__file_path)
         os.unlink(self.__swap_file_path)
 
+        # Keep the cache in sync with what has just been written.
+        source_signature = self.__get_source_signature()
+        self.__cached_configuration = configuration.model_copy(deep=True)
+        self.__cached_source_signature = source_signature
+
+        if self.__use_snapshot and source_signature is not None:
+            self.__save_snapshot(self.__cached_configuration, source_signature)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Configuration]:
+        """
+        Apply any number of changes to the configuration with one load, one validation and one write
+
+        The configuration is saved when the block exits normally. Nothing is saved if the block raises an error.
+        """
+        configuration = self.load()
+        yield configuration
+        self.save(configuration)
+
     @classmethod
     def migrate(cls, configuration: Configuration) -> Configuration:
         """
@@ -37,3 +37,9 @@ show_distributed_trace_stack_on_error = flag('DNASTACK_DISPLAY_TRACE_ON_ERROR',
 
 metrics_enabled = flag('DNASTACK_METRICS_ENABLED',
                        description='Enable telemetry submission after publisher question execution')
+
+config_snapshot_enabled = flag('DNASTACK_CONFIG_SNAPSHOT',
+                               description='Keep a pre-parsed snapshot of the configuration file to skip YAML parsing')
+
+async_logging_enabled = flag('DNASTACK_LOG_ASYNC',
+                             description='Format and write the log records in a background thread')
@@ -1,21 +1,98 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from threading import Lock
+from time import time
+from typing import Optional, Dict, Tuple, TYPE_CHECKING
 from enum import Enum
 from pydantic import BaseModel, Field
 import logging
 import os
 
-import boto3
+import jwt
+from urllib3 import Retry
 
 from dnastack.common.tracing import Span
 from dnastack.http.client_factory import HttpClientFactory
 
+if TYPE_CHECKING:
+    import boto3 as boto3_module
+
+# NOTE: boto3 is imported on demand by "_import_boto3" so that only the processes that actually select the AWS
+#       provider pay for loading the SDK.
+boto3 = None
+
+
+def _import_boto3():
+    global boto3
+    if boto3 is None:
+        import boto3 as boto3_module
+        boto3 = boto3_module
+    return boto3
+
 
 class CloudProvider(str, Enum):
     GCP = "gcp"
     AWS = "aws"
 
 
+class CloudMetadataCache:
+    """
+    Process-wide cache of the provider availability and the identity tokens
+
+    This is shared by all providers (and therefore all authenticators) in the process so that the hosts outside of
+    the cloud only pay for the availability probe once and the hosts in the cloud reuse identity tokens until they are
+    about to expire.
+    """
+
+    AVAILABILITY_TTL = 600  # seconds
+    IDENTITY_TOKEN_MAX_TTL = 3600  # seconds
+    IDENTITY_TOKEN_EXPIRY_MARGIN = 60  # seconds
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__availability: Dict[str, Tuple[bool, float]] = {}
+        self.__identity_tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+    def get_availability(self, provider_name: str) -> Optional[bool]:
+        with self.__lock:
+            entry = self.__availability.get(provider_name)
+            if entry is None or entry[1] < time():
+                return None
+            return entry[0]
+
+    def set_availability(self, provider_name: str, available: bool):
+        with self.__lock:
+            self.__availability[provider_name] = (available, time() + self.AVAILABILITY_TTL)
+
+    def get_identity_token(self, provider_name: str, audience: str) -> Optional[str]:
+        with self.__lock:
+            entry = self.__identity_tokens.get((provider_name, audience))
+            if entry is None or entry[1] < time():
+                return None
+            return entry[0]
+
+    def set_identity_token(self, provider_name: str, audience: str, token: str):
+        """ Cache the token until shortly before it expires. Tokens without a readable expiry are not cached. """
+        try:
+            expires_at = int(jwt.decode(token, options={'verify_signature': False}).get('exp'))
+        except Exception:
+            return
+
+        valid_until = min(expires_at - self.IDENTITY_TOKEN_EXPIRY_MARGIN, time() + self.IDENTITY_TOKEN_MAX_TTL)
+        if valid_until <= time():
+            return
+
+        with self.__lock:
+            self.__identity_tokens[(provider_name, audience)] = (token, valid_until)
+
+    def clear(self):
+        with self.__lock:
+            self.__availability.clear()
+            self.__identity_tokens.clear()
+
+
+cloud_metadata_cache = CloudMetadataCache()
+
+
 class CloudMetadataProvider(ABC):
     """Abstract base class for cloud metadata providers."""
 
@@ -26,14 +103,34 @@ class CloudMetadataProvider(ABC):
         self.timeout = timeout
         self._logger = logging.getLogger(type(self).__name__)
 
-    @abstractmethod
     def is_available(self) -> bool:
-        """Check if this cloud provider's metadata service is available."""
+        """Check if this cloud provider's metadata service is available (cached per process)."""
+        available = cloud_metadata_cache.get_availability(self.name)
+        if available is None:
+            available = self._probe()
+            cloud_metadata_cache.set_availability(self.name, available)
+        return available
+
+    def get_identity_token(self, audience: str, trace_context: Span) -> Optional[str]:
+        """Fetch an identity token from the cloud metadata service (cached per process until near its expiry)."""
+        token = cloud_metadata_cache.get_identity_token(self.name, audience)
+        if token:
+            self._logger.debug(f'Reusing the cached {self.name} identity token for audience: {audience}')
+            return token
+
+        token = self._fetch_identity_token(audience, trace_context)
+        if token:
+            cloud_metadata_cache.set_identity_token(self.name, audience, token)
+        return token
+
+    @abstractmethod
+    def _probe(self) -> bool:
+        """Check if this cloud provider's metadata service is available without using the cache."""
         pass
 
     @abstractmethod
-    def get_identity_token(self, audience: str, trace_context: Span) -> Optional[str]:
-        """Fetch an identity token from the cloud metadata service."""
+    def _fetch_identity_token(self, audience: str, trace_context: Span) -> Optional[str]:
+        """Fetch an identity token from the cloud metadata service without using the cache."""
         pass
 
     @property
@@ -54,10 +151,11 @@ class GCPMetadataProvider(CloudMetadataProvider):
     def name(self) -> str:
         return CloudProvider.GCP.value
 
-    def is_available(self) -> bool:
+    def _probe(self) -> bool:
         """Check if GCP metadata service is available."""
         try:
-            with HttpClientFactory.make() as http_session:
+            # No retries: off-cloud hosts should fail the probe as quickly as possible.
+            with HttpClientFactory.make(Retry(total=0)) as http_session:
                 response = http_session.get(
                     f'{self._METADATA_BASE_URL}/project/project-id',
                     headers={'Metadata-Flavor': self._METADATA_FLAVOR},
@@ -67,7 +165,7 @@ class GCPMetadataProvider(CloudMetadataProvider):
         except Exception:
             return False
 
-    def get_identity_token(self, audience: str, trace_context: Span) -> Optional[str]:
+    def _fetch_identity_token(self, audience: str, trace_context: Span) -> Optional[str]:
         """Fetch GCP identity token from metadata service.
            '&format=full' ensures we get email in response"""
         url = f'{self._METADATA_BASE_URL}{self._IDENTITY_ENDPOINT}?audience={audience}&format=full'
@@ -98,26 +196,26 @@ class AWSMetadataProvider(CloudMetadataProvider):
 
     def __init__(self, timeout: int = 5):
         super().__init__(timeout)
-        self._session: Optional[boto3.Session] = None
+        self._session: Optional['boto3_module.Session'] = None
 
     @property
     def name(self) -> str:
         return CloudProvider.AWS.value
 
-    def is_available(self) -> bool:
+    def _probe(self) -> bool:
         """Check if AWS credentials are available."""
         try:
-            self._session = boto3.Session()
+            self._session = _import_boto3().Session()
             credentials = self._session.get_credentials()
             return credentials is not None
         except Exception:
             return False
 
-    def get_identity_token(self, audience: str, trace_context: Span) -> Optional[str]:
+    def _fetch_identity_token(self, audience: str, trace_context: Span) -> Optional[str]:
         """Fetch AWS identity token from STS GetWebIdentityToken."""
         try:
             if self._session is None:
-                self._session = boto3.Session()
+                self._session = _import_boto3().Session()
 
             region = os.environ.get('AWS_REGION') or self._session.region_name or 'us-east-1'
             sts_client = self._session.client('sts', region_name=region)
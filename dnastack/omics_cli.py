@@ -1,5 +1,7 @@
+import io
+import shlex
 import sys
-from typing import Optional
+from typing import Optional, Iterator, Dict, Any, TextIO
 
 import click
 
@@ -8,14 +10,17 @@ from dnastack.cli.commands.auth import auth_command_group
 from dnastack.cli.commands.collections import collections_command_group
 from dnastack.cli.commands.config import config_command_group
 from dnastack.cli.commands.config.contexts import contexts_command_group, ContextCommandHandler
+from dnastack.cli.commands.daemon import daemon_command_group
 from dnastack.cli.commands.dataconnect import data_connect_command_group
 from dnastack.cli.commands.explorer.commands import explorer_command_group
 from dnastack.cli.commands.drs import drs_command_group
 from dnastack.cli.commands.publisher import publisher_command_group
 from dnastack.cli.commands.workbench import workbench_command_group
 from dnastack.cli.core.command import formatted_command
-from dnastack.cli.core.command_spec import ArgumentSpec, ArgumentType
+from dnastack.cli.core.command_spec import ArgumentSpec, ArgumentType, RESOURCE_OUTPUT_ARG
 from dnastack.cli.core.group import formatted_group
+from dnastack.cli.core.runner import run_command
+from dnastack.cli.helpers.iterator_printer import show_iterator
 from dnastack.common.logger import get_logger
 # This is important to be called first
 from dnastack.constants import __version__, PYPI_PACKAGE_NAME
@@ -118,6 +123,89 @@ def use(registry_hostname_or_url: str,
     _context_command_handler.use(registry_hostname_or_url, context_name=context_name, no_auth=no_auth, platform_credentials=platform_credentials, subject_token=subject_token)
 
 
+# Commands which cannot be nested in a batch
+_NON_BATCHABLE_COMMANDS = {'batch', 'daemon'}
+
+
+@formatted_command(
+    group=omics,
+    name='batch',
+    specs=[
+        ArgumentSpec(
+            name='input_file',
+            arg_type=ArgumentType.POSITIONAL,
+            help='The file with one command per line (without the program name), or "-" to read from the standard '
+                 'input.',
+            required=False,
+            default='-',
+        ),
+        ArgumentSpec(
+            name='stop_on_error',
+            arg_names=['--stop-on-error'],
+            help='Stop at the first command that fails',
+            type=bool,
+            required=False,
+        ),
+        RESOURCE_OUTPUT_ARG,
+    ]
+)
+def batch(input_file: str, stop_on_error: bool = False, output: str = RESOURCE_OUTPUT_ARG.default):
+    """
+    Run many commands in one process
+
+    Each line is one command, e.g., "collections list". Empty lines and lines starting with "#" are ignored. The
+    commands share the configuration, sessions, and connections, and each command runs with an empty standard input.
+    The output and the exit code of each command are reported separately.
+    """
+    failure_count = 0
+
+    def run_all(lines: TextIO) -> Iterator[Dict[str, Any]]:
+        nonlocal failure_count
+
+        for line_number, line in enumerate(lines, start=1):
+            command_line = line.strip()
+            if not command_line or command_line.startswith('#'):
+                continue
+
+            stdout = io.StringIO()
+            stderr = io.StringIO()
+
+            try:
+                argv = shlex.split(command_line)
+            except ValueError as e:
+                argv = None
+                exit_code = 2
+                stderr.write(f'Invalid command line: {e}\n')
+
+            if argv is not None:
+                if argv[0] in _NON_BATCHABLE_COMMANDS:
+                    exit_code = 2
+                    stderr.write(f'The "{argv[0]}" command cannot be used in a batch.\n')
+                else:
+                    exit_code = run_command(omics, argv, APP_NAME, stdout, stderr)
+
+            if exit_code != 0:
+                failure_count += 1
+
+            yield dict(line=line_number,
+                       command=command_line,
+                       exit_code=exit_code,
+                       output=stdout.getvalue(),
+                       error=stderr.getvalue())
+
+            if exit_code != 0 and stop_on_error:
+                break
+
+    if input_file == '-':
+        show_iterator(output, run_all(sys.stdin))
+    else:
+        with open(input_file, 'r') as f:
+            show_iterator(output, run_all(f))
+
+    if failure_count:
+        raise SystemExit(1)
+
+
 # noinspection PyTypeChecker
 omics.add_command(data_connect_command_group)
 # noinspection PyTypeChecker
@@ -138,6 +226,8 @@ omics.add_command(alpha_command_group)
 omics.add_command(publisher_command_group)
 # noinspection PyTypeChecker
 omics.add_command(workbench_command_group)
+# noinspection PyTypeChecker
+omics.add_command(daemon_command_group)
 
 
 @omics.result_callback()
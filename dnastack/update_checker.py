@@ -1,6 +1,8 @@
 import json
 import os
+import subprocess
 import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Tuple
@@ -22,6 +24,9 @@ _logger = get_logger(__name__)
 CACHE_TTL = timedelta(hours=24)
 PYPI_URL = f"https://pypi.org/pypi/{PYPI_PACKAGE_NAME}/json"
 REQUEST_TIMEOUT_SECONDS = 5
+# Minimum interval between background refresh attempts, so that hosts without network access do not spawn
+# a refresh process with every command.
+BACKGROUND_REFRESH_RETRY_INTERVAL = timedelta(hours=1)
 
 # Flag to prevent double notification when `version` command already did an explicit check
 _skip_passive_notification = False
@@ -76,6 +81,42 @@ def _write_cache(cache_path: str, latest_version: str) -> None:
         _logger.debug("Failed to write update check cache", exc_info=True)
 
 
+def _get_background_refresh_marker_path(cache_path: str) -> str:
+    return f"{cache_path}.refreshing"
+
+
+def _start_background_refresh(cache_path: str) -> bool:
+    """Refresh the cache in a detached process so that the current command never waits for PyPI.
+
+    The refreshed cache is only used by the next invocation.
+    """
+    marker_path = _get_background_refresh_marker_path(cache_path)
+    try:
+        last_attempt = os.path.getmtime(marker_path)
+        if time.time() - last_attempt < BACKGROUND_REFRESH_RETRY_INTERVAL.total_seconds():
+            return False
+    except OSError:
+        pass  # No previous attempts
+
+    try:
+        os.makedirs(os.path.dirname(marker_path), exist_ok=True)
+        with open(marker_path, "w"):
+            pass
+
+        subprocess.Popen(
+            [sys.executable, "-c", "from dnastack.update_checker import check_for_update; check_for_update(force=True)"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+        return True
+    except Exception:
+        _logger.debug("Failed to start the background update check", exc_info=True)
+        return False
+
+
 def _get_latest_stable_version() -> Optional[str]:
     try:
         response = requests.get(PYPI_URL, timeout=REQUEST_TIMEOUT_SECONDS)
@@ -101,14 +142,21 @@ def _get_latest_stable_version() -> Optional[str]:
         return None
 
 
-def check_for_update(force: bool = False) -> UpdateCheckResult:
+def check_for_update(force: bool = False, refresh_in_background: bool = False) -> UpdateCheckResult:
+    """Check for a newer stable release.
+
+    When ``refresh_in_background`` is set and the cache is stale or missing, the cache is refreshed by a detached
+    process instead of querying PyPI here, and the result is based on the stale cache (if any).
+    """
     cache_path = _get_cache_path()
 
     if not force:
         cached_version, last_checked = _read_cache(cache_path)
         if cached_version and last_checked:
             cache_age = datetime.now(timezone.utc) - last_checked
-            if cache_age < CACHE_TTL:
+            if cache_age < CACHE_TTL or refresh_in_background:
+                if cache_age >= CACHE_TTL:
+                    _start_background_refresh(cache_path)
                 try:
                     current_version = Version(__version__)
                     latest_version = Version(cached_version)
@@ -120,6 +168,10 @@ def check_for_update(force: bool = False) -> UpdateCheckResult:
                 except InvalidVersion:
                     _logger.debug("Cached version string invalid, fetching from PyPI", exc_info=True)
 
+        if refresh_in_background:
+            _start_background_refresh(cache_path)
+            return UpdateCheckResult(latest_version=None, update_available=False, check_failed=True)
+
     latest_version_string = _get_latest_stable_version()
 
     if latest_version_string is None:
@@ -157,7 +209,7 @@ def notify_if_update_available() -> None:
         return
 
     try:
-        result = check_for_update(force=False)
+        result = check_for_update(force=False, refresh_in_background=True)
         if result.update_available:
             click.secho(
                 f"\nA new version of dnastack is available: {__version__} \u2192 {result.latest_version}",
@@ -0,0 +1,82 @@
+from time import time
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+from imagination import container
+
+from dnastack import ServiceEndpoint
+from dnastack.common.auth_manager import AuthManager
+from dnastack.context.models import Context
+from dnastack.http.authenticators.abstract import AuthStateStatus
+from dnastack.http.authenticators.oauth2_adapter.models import OAuth2Authentication
+from dnastack.http.session_info import SessionManager, InMemorySessionStorage, SessionInfo, SessionInfoHandler
+
+
+class TestUnit(TestCase):
+    def setUp(self):
+        self.session_manager = SessionManager(InMemorySessionStorage())
+        original_get = container.get
+
+        def get_service(cls, *args, **kwargs):
+            return self.session_manager if cls is SessionManager else original_get(cls, *args, **kwargs)
+
+        patcher = patch.object(container, 'get', side_effect=get_service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_context(self, auth_server_count: int, endpoints_per_auth_server: int) -> Context:
+        endpoints: List[ServiceEndpoint] = []
+        for server_index in range(auth_server_count):
+            auth_info = dict(type='oauth2',
+                             client_id=f'client-{server_index}',
+                             client_secret='secret',
+                             grant_type='client_credentials',
+                             resource_url=f'https://svc-{server_index}.faux.dnastack.com/',
+                             token_endpoint=f'https://auth-{server_index}.faux.dnastack.com/oauth/token')
+            for endpoint_index in range(endpoints_per_auth_server):
+                endpoints.append(ServiceEndpoint(id=f'ep-{server_index}-{endpoint_index}',
+                                                 url=f'https://svc-{server_index}.faux.dnastack.com/{endpoint_index}/',
+                                                 authentication=auth_info))
+        return Context(endpoints=endpoints)
+
+    def _save_session(self, auth_info: dict):
+        auth = OAuth2Authentication(**auth_info)
+        self.session_manager.save(auth.get_content_hash(),
+                                  SessionInfo(model_version=4,
+                                              config_hash=auth.get_content_hash(),
+                                              access_token='faux-access-token',
+                                              token_type='Bearer',
+                                              issued_at=int(time()),
+                                              valid_until=int(time()) + 3600,
+                                              handler=SessionInfoHandler(auth_info=auth_info)))
+
+    def test_get_states_groups_endpoints_by_session(self):
+        context = self._make_context(auth_server_count=3, endpoints_per_auth_server=4)
+        manager = AuthManager(context)
+
+        # Only the first auth server has an active session.
+        first_auth_info = manager.get_authenticators(['ep-0-0'])[0].get_state().auth_info
+        self._save_session(first_auth_info)
+
+        states = list(manager.get_states())
+
+        self.assertEqual(3, len(states))
+        for state in states:
+            server_index = state.auth_info['client_id'].split('-')[1]
+            self.assertEqual([f'ep-{server_index}-{i}' for i in range(4)], state.endpoints)
+            self.assertEqual(AuthStateStatus.READY if server_index == '0' else AuthStateStatus.UNINITIALIZED,
+                             state.status)
+
+    def test_revoke_only_removes_the_requested_sessions(self):
+        context = self._make_context(auth_server_count=2, endpoints_per_auth_server=3)
+        manager = AuthManager(context)
+
+        for authenticator in manager.get_authenticators():
+            self._save_session(authenticator.get_state().auth_info)
+
+        affected_endpoint_ids = manager.revoke(['ep-1-2'])
+
+        self.assertEqual(['ep-1-2 (requested)'], affected_endpoint_ids)
+        statuses = {state.auth_info['client_id']: state.status for state in manager.get_states()}
+        self.assertEqual({'client-0': AuthStateStatus.READY, 'client-1': AuthStateStatus.UNINITIALIZED}, statuses)
@@ -0,0 +1,86 @@
+import gzip
+import io
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import TestCase
+from unittest.mock import patch
+
+import urllib3
+
+from dnastack.common.buffers import AdaptiveBuffer
+
+
+class TestUnit(TestCase):
+    def test_chunks_cover_the_whole_stream(self):
+        content = os.urandom(300 * 1024)
+        buffer = AdaptiveBuffer(initial_size=1024, max_size=64 * 1024)
+
+        output = io.BytesIO()
+        for chunk in buffer.chunks(io.BytesIO(content)):
+            self.assertIsInstance(chunk, memoryview)
+            output.write(chunk)
+
+        self.assertEqual(content, output.getvalue())
+
+    def test_grow_up_to_the_maximum_size_on_fast_reads(self):
+        buffer = AdaptiveBuffer(initial_size=1024, max_size=16 * 1024)
+        sizes = []
+
+        for _ in buffer.chunks(io.BytesIO(os.urandom(256 * 1024))):
+            sizes.append(buffer.size)
+
+        self.assertEqual([2048, 4096, 8192, 16384], sorted(set(sizes)))
+
+    def test_keep_the_size_on_slow_reads(self):
+        buffer = AdaptiveBuffer(initial_size=1024, max_size=16 * 1024)
+
+        with patch.object(AdaptiveBuffer, 'TARGET_READ_DURATION', 0):
+            for _ in buffer.chunks(io.BytesIO(os.urandom(64 * 1024))):
+                pass
+
+        self.assertEqual(1024, buffer.size)
+
+    def test_previous_chunk_survives_growth(self):
+        buffer = AdaptiveBuffer(initial_size=4, max_size=8)
+        reader = io.BytesIO(b'abcdefghijkl')
+
+        first_chunk = buffer.read_from(reader)
+        second_chunk = buffer.read_from(reader)
+
+        self.assertEqual(b'abcd', bytes(first_chunk))
+        self.assertEqual(b'efghijkl', bytes(second_chunk))
+
+    def test_chunks_of_gzip_response(self):
+        content = os.urandom(16 * 1024) + b'a' * (512 * 1024)
+        compressed_content = gzip.compress(content)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(compressed_content)))
+                self.end_headers()
+                self.wfile.write(compressed_content)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        # The tiny buffer gets empty reads while the decoder waits for the header and the large one overflows on the
+        # highly compressible part.
+        for initial_size, max_size in [(4, 4), (1024, 64 * 1024)]:
+            with self.subTest(initial_size=initial_size, max_size=max_size):
+                response = urllib3.PoolManager().request('GET',
+                                                         f'http://127.0.0.1:{server.server_port}/',
+                                                         preload_content=False)
+
+                output = io.BytesIO()
+                for chunk in AdaptiveBuffer(initial_size=initial_size, max_size=max_size).chunks(response):
+                    output.write(chunk)
+
+                self.assertEqual(content, output.getvalue())
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import stat
+from unittest import TestCase
+from unittest.mock import patch
+
+from dnastack.common.content_cache import ContentCache, ContentKey
+
+
+class TestUnit(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.cache = ContentCache(os.path.join(self.temp_dir, 'cache'), max_size=100)
+
+    def _write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def _put(self, content: bytes) -> ContentKey:
+        key = ContentKey('sha256', hashlib.sha256(content).hexdigest())
+        self.cache.put(key, self._write('source', content))
+        return key
+
+    def test_make_key(self):
+        self.assertEqual(ContentKey('sha256', 'abc123'), ContentKey.make('SHA-256', ' ABC123 '))
+        self.assertEqual(ContentKey('md5', 'abc'), ContentKey.make('md5', 'abc'))
+        self.assertIsNone(ContentKey.make('etag', 'abc'))
+        self.assertIsNone(ContentKey.make('md5', '../abc'))
+
+    def test_restore(self):
+        key = self._put(b'hello')
+        destination_path = self._write('destination', b'outdated')
+
+        self.assertTrue(self.cache.restore(key, destination_path))
+        with open(destination_path, 'rb') as f:
+            self.assertEqual(b'hello', f.read())
+
+        self.assertFalse(self.cache.restore(ContentKey('sha256', 'f' * 64), destination_path))
+
+    def test_restored_file_is_independent_of_cache(self):
+        key = self._put(b'hello')
+        destination_path = os.path.join(self.temp_dir, 'destination')
+        os.utime(self.cache.get_path(key), (1, 1))
+
+        self.assertTrue(self.cache.restore(key, destination_path))
+        self.assertEqual(1, os.stat(self.cache.get_path(key)).st_mtime)
+        self.assertFalse(os.path.samefile(self.cache.get_path(key), destination_path))
+
+        with open(destination_path, 'ab') as f:
+            f.write(b', world')
+        with open(self.cache.get_path(key), 'rb') as f:
+            self.assertEqual(b'hello', f.read())
+
+    def test_restore_by_hard_link_when_enabled(self):
+        cache = ContentCache(os.path.join(self.temp_dir, 'cache'), max_size=100, hard_link=True)
+        key = self._put(b'hello')
+        destination_path = os.path.join(self.temp_dir, 'destination')
+
+        with patch.object(ContentCache, '_ContentCache__reflink', return_value=False):
+            self.assertTrue(cache.restore(key, destination_path))
+
+        self.assertTrue(os.path.samefile(cache.get_path(key), destination_path))
+        self.assertFalse(os.stat(destination_path).st_mode & stat.S_IWUSR)
+
+    def test_evict_least_recently_used(self):
+        first_key = self._put(b'a' * 40)
+        second_key = self._put(b'b' * 40)
+
+        # The first one becomes the most recently used.
+        os.utime(self.cache.get_path(second_key), (1, 1))
+        self.assertIsNotNone(self.cache.get(first_key))
+
+        third_key = self._put(b'c' * 40)
+
+        self.assertIsNotNone(self.cache.get(first_key))
+        self.assertIsNone(self.cache.get(second_key))
+        self.assertIsNotNone(self.cache.get(third_key))
+
+    def test_walk_cache_only_on_eviction(self):
+        with patch('os.walk', wraps=os.walk) as walk:
+            for content in [b'a' * 20, b'b' * 20, b'c' * 20, b'd' * 20]:
+                self._put(content)
+
+            # The first put measures the cache and nothing else needs the files until the cache is full.
+            self.assertEqual(1, walk.call_count)
+
+            self._put(b'e' * 40)
+
+            self.assertEqual(2, walk.call_count)
+            self.assertLessEqual(sum(os.path.getsize(os.path.join(parent_path, file_name))
+                                     for parent_path, _, file_names in os.walk(self.cache.directory)
+                                     for file_name in file_names), 90)
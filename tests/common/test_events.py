@@ -1,7 +1,9 @@
+from threading import Event as ThreadEvent, Thread, current_thread
 from typing import List
 from unittest import TestCase
+from unittest.mock import patch
 
-from dnastack.common.events import EventSource, EventTypeNotRegistered
+from dnastack.common.events import EventSource, EventTypeNotRegistered, Event
 
 
 class TestUnit(TestCase):
@@ -75,3 +77,136 @@ class TestUnit(TestCase):
 
         # The unhandled event should not be received.
         self.assertNotIn('echo', events)
+
+    def test_dispatch_without_listeners_does_nothing(self):
+        event_source = EventSource(['alpha'], origin=self)
+
+        self.assertFalse(event_source.has_listeners('alpha'))
+
+        with patch('dnastack.common.events.get_logger') as get_logger, \
+                patch.object(Event, 'make', wraps=Event.make) as make_event:
+            for _ in range(100):
+                event_source.dispatch('alpha', dict(content='alpha'))
+
+        get_logger.assert_not_called()
+        make_event.assert_not_called()
+
+        # The event types are still checked.
+        with self.assertRaises(EventTypeNotRegistered):
+            event_source.dispatch('foxtrot', {})
+
+    def test_event_is_immutable(self):
+        details = dict(content='alpha', tags=['a'])
+        event = Event.make(details)
+
+        # Changes to the original details do not leak into the event.
+        details['content'] = 'bravo'
+        self.assertEqual('alpha', event.details['content'])
+
+        with self.assertRaises(TypeError):
+            event.details['content'] = 'charlie'
+
+        derived_event = event.with_details(content='delta')
+        self.assertEqual('delta', derived_event.details['content'])
+        self.assertEqual('alpha', event.details['content'])
+        self.assertIs(event.details['tags'], derived_event.details['tags'])
+
+        self.assertEqual({'details': {'content': 'alpha', 'tags': ['a']}}, event.model_dump())
+
+    def test_stop_propagation(self):
+        event_source = EventSource(['alpha'])
+        events: List[str] = []
+
+        def stop(event):
+            events.append('stop')
+            event.stop_propagation()
+
+        event_source.on('alpha', stop)
+        event_source.on('alpha', lambda event: events.append('after'))
+        event_source.dispatch('alpha', {})
+
+        self.assertEqual(['stop'], events)
+
+    def test_async_delivery_coalesces_events(self):
+        event_source = EventSource(['progress', 'done', 'prompt'])
+        started = ThreadEvent()
+        gate = ThreadEvent()
+        received: List[tuple] = []
+        delivery_threads = set()
+
+        def handle_progress(event):
+            started.set()
+            gate.wait(5)
+            delivery_threads.add(current_thread())
+            received.append(('progress', event.details['file'], event.details['position']))
+
+        event_source.on('progress', handle_progress)
+        event_source.on('done', lambda event: received.append(('done', event.details['file'])))
+        event_source.on('prompt', lambda event: delivery_threads.add(current_thread()) or received.append(('prompt',)))
+
+        event_source.start_async_delivery(['progress', 'done'], {'progress': lambda e: e.details['file']})
+
+        # The first event is held by the handler while the rest are queued.
+        event_source.dispatch('progress', dict(file='a', position=0))
+        self.assertTrue(started.wait(5))
+        for position in range(1, 100):
+            event_source.dispatch('progress', dict(file='a', position=position))
+            event_source.dispatch('progress', dict(file='b', position=position))
+        event_source.dispatch('done', dict(file='a'))
+
+        # The types not delivered asynchronously are still delivered immediately.
+        event_source.dispatch('prompt', {})
+        self.assertEqual([('prompt',)], received)
+
+        gate.set()
+        self.assertTrue(event_source.flush(5))
+        event_source.stop_async_delivery()
+
+        self.assertEqual([('prompt',),
+                          ('progress', 'a', 0),
+                          ('progress', 'a', 99),
+                          ('progress', 'b', 99),
+                          ('done', 'a')],
+                         received)
+        self.assertEqual(2, len(delivery_threads))
+        self.assertIn(current_thread(), delivery_threads)
+
+    def test_stop_async_delivery_delivers_pending_events(self):
+        event_source = EventSource(['alpha'])
+        received: List[int] = []
+
+        event_source.on('alpha', lambda event: received.append(event.details['index']))
+        event_source.start_async_delivery()
+        for index in range(50):
+            event_source.dispatch('alpha', dict(index=index))
+        event_source.stop_async_delivery(5)
+
+        self.assertEqual(list(range(50)), received)
+
+        # Back to the synchronous delivery
+        event_source.dispatch('alpha', dict(index=50))
+        self.assertEqual(50, received[-1])
+
+    def test_concurrent_registration_and_dispatch(self):
+        event_source = EventSource(['alpha'])
+        received: List[int] = []
+        event_source.on('alpha', lambda event: received.append(1))
+
+        def register():
+            for _ in range(200):
+                handler = lambda event: None  # noqa: E731
+                event_source.on('alpha', handler)
+                event_source.off('alpha', handler)
+
+        def dispatch():
+            for _ in range(200):
+                event_source.dispatch('alpha', {})
+
+        threads = [Thread(target=register) for _ in range(4)] + [Thread(target=dispatch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(800, len(received))
+        self.assertEqual(1, len(event_source._event_handlers['alpha']))
@@ -0,0 +1,134 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import TestCase
+
+from dnastack.common.leases import LeaseCoordinator
+
+# Each worker process downloads the items it manages to claim from the stand-in server.
+_WORKER_SCRIPT = '''
+import sys
+import urllib.request
+from dnastack.common.leases import LeaseCoordinator
+
+directory, base_url, item_count = sys.argv[1], sys.argv[2], int(sys.argv[3])
+
+with LeaseCoordinator(directory, ttl=10) as coordinator:
+    for index in range(item_count):
+        item = f'item-{index}'
+        if coordinator.claim(item):
+            urllib.request.urlopen(f'{base_url}/{item}').read()
+            coordinator.complete(item, dict(status='success'))
+'''
+
+
+class TestUnit(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_claim_exclusively(self):
+        first = LeaseCoordinator(self.directory, owner='first')
+        second = LeaseCoordinator(self.directory, owner='second')
+
+        self.assertTrue(first.claim('a'))
+        self.assertFalse(second.claim('a'))
+
+        # Released items can be claimed again.
+        first.release('a')
+        self.assertTrue(second.claim('a'))
+
+        # Completed items cannot be claimed again.
+        second.complete('a', dict(status='success'))
+        self.assertFalse(first.claim('a'))
+        self.assertFalse(second.claim('a'))
+        self.assertEqual('success', first.get_result('a')['status'])
+        self.assertEqual('second', first.get_result('a')['owner'])
+
+    def test_reclaim_stalled_lease(self):
+        crashed = LeaseCoordinator(self.directory, ttl=10, owner='crashed')
+        other = LeaseCoordinator(self.directory, ttl=10, owner='other')
+
+        self.assertTrue(crashed.claim('a'))
+        self.assertFalse(other.claim('a'))
+
+        lease_path = os.path.join(self.directory, 'leases', os.listdir(os.path.join(self.directory, 'leases'))[0])
+        os.utime(lease_path, (time.time() - 60, time.time() - 60))
+
+        self.assertTrue(other.claim('a'))
+
+        # The original owner does not remove the lease of the new owner.
+        crashed.release('a')
+        self.assertFalse(crashed.claim('a'))
+
+    def test_heartbeat_keeps_lease_alive(self):
+        holder = LeaseCoordinator(self.directory, ttl=0.3, owner='holder')
+        other = LeaseCoordinator(self.directory, ttl=0.3, owner='other')
+
+        with holder:
+            self.assertTrue(holder.claim('a'))
+            time.sleep(0.8)
+            self.assertFalse(other.claim('a'))
+
+        # The leases are released when the coordinator stops.
+        self.assertTrue(other.claim('a'))
+
+    def test_lose_reclaimed_lease(self):
+        holder = LeaseCoordinator(self.directory, ttl=0.3, owner='holder')
+        other = LeaseCoordinator(self.directory, ttl=0.3, owner='other')
+
+        self.assertTrue(holder.claim('a'))
+        self.assertTrue(holder.is_held('a'))
+
+        # The holder stalls, and another process reclaims the lease.
+        lease_path = os.path.join(self.directory, 'leases', os.listdir(os.path.join(self.directory, 'leases'))[0])
+        os.utime(lease_path, (time.time() - 60, time.time() - 60))
+        self.assertTrue(other.claim('a'))
+
+        with holder:
+            time.sleep(0.5)
+            self.assertFalse(holder.is_held('a'))
+
+        self.assertTrue(other.is_held('a'))
+        self.assertFalse(holder.is_held('b'))
+
+    def test_split_work_between_processes(self):
+        item_count = 30
+        requested_items = Counter()
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    requested_items[self.path.strip('/')] += 1
+                time.sleep(0.01)
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        processes = [
+            subprocess.Popen([sys.executable, '-c', _WORKER_SCRIPT, self.directory,
+                              f'http://127.0.0.1:{server.server_port}', str(item_count)])
+            for _ in range(3)
+        ]
+        for process in processes:
+            self.assertEqual(0, process.wait(60))
+
+        self.assertEqual({f'item-{i}': 1 for i in range(item_count)}, dict(requested_items))
+        self.assertEqual(item_count, len(os.listdir(os.path.join(self.directory, 'done'))))
+        self.assertEqual([], os.listdir(os.path.join(self.directory, 'leases')))
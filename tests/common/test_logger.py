@@ -0,0 +1,46 @@
+import io
+import logging
+from unittest import TestCase
+from unittest.mock import patch
+
+from dnastack.common.logger import get_logger, get_logger_for, _get_handler
+
+
+class TestUnit(TestCase):
+    def test_loggers_are_shared(self):
+        self.assertIs(get_logger('shared-logger', logging.INFO), get_logger('shared-logger', logging.INFO))
+        self.assertIsNot(get_logger('shared-logger', logging.INFO), get_logger('shared-logger', logging.DEBUG))
+        self.assertIs(get_logger_for(self, logging.INFO), get_logger_for(self, logging.INFO))
+
+        logger = get_logger('shared-logger', logging.INFO)
+        self.assertEqual(1, len(logger.handlers))
+        self.assertIs(logger.handlers[0], get_logger('another-logger', logging.INFO).handlers[0])
+
+    def test_span_logger_includes_trace_context(self):
+        logger = get_logger('span-logger', logging.DEBUG)
+        span_logger = logger.fork(trace_id='t-1', span_id='s-1')
+
+        self.assertEqual('span-logger,t-1,s-1', span_logger.name)
+        self.assertEqual(logging.DEBUG, span_logger.level)
+
+        output = io.StringIO()
+        with patch.object(_get_handler(logging.DEBUG), 'stream', output):
+            span_logger.debug('Hello, %s', 'span')
+            logger.debug('Hello, logger')
+            span_logger.fork(trace_id='t-1', span_id='s-2').debug('Hello, sub-span')
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[0].endswith('span-logger,t-1,s-1: Hello, span'), lines[0])
+        self.assertTrue(lines[1].endswith('span-logger: Hello, logger'), lines[1])
+        self.assertTrue(lines[2].endswith('span-logger,t-1,s-2: Hello, sub-span'), lines[2])
+
+    def test_span_logger_respects_level(self):
+        span_logger = get_logger('quiet-logger', logging.WARNING).fork(trace_id='t-1', span_id='s-1')
+
+        output = io.StringIO()
+        with patch.object(_get_handler(logging.WARNING), 'stream', output):
+            span_logger.info('Hidden')
+            span_logger.warning('Shown')
+
+        self.assertEqual(1, len(output.getvalue().splitlines()))
@@ -0,0 +1,61 @@
+from typing import List
+from unittest import TestCase
+
+from dnastack.common.progress import ProgressAggregator, ProgressSnapshot, format_byte_rate
+from tests.util.fake_clock import FakeClock
+
+
+class TestUnit(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.snapshots: List[ProgressSnapshot] = []
+        self.aggregator = ProgressAggregator(max_updates_per_second=2, clock=self.clock)
+        self.aggregator.on_update(self.snapshots.append)
+
+    def test_running_totals(self):
+        self.aggregator.update('a', 10, 100)
+        self.aggregator.update('b', 5, 50)
+        self.aggregator.update('a', 40, 100)
+
+        snapshot = self.aggregator.snapshot()
+        self.assertEqual((45, 150), (snapshot.overall.position, snapshot.overall.total))
+        self.assertEqual((40, 100), (snapshot.transfers['a'].position, snapshot.transfers['a'].total))
+        self.assertEqual((5, 50), (snapshot.transfers['b'].position, snapshot.transfers['b'].total))
+
+    def test_notify_at_bounded_rate(self):
+        for position in range(0, 100, 10):
+            self.aggregator.update('a', position, 100)
+            self.clock.now += 0.125
+
+        # At most two notifications per second, starting from the first update
+        self.assertEqual([0, 40, 80], [s.overall.position for s in self.snapshots])
+
+        # The completion is always notified.
+        self.aggregator.update('a', 100, 100)
+        self.assertEqual(100, self.snapshots[-1].overall.position)
+
+    def test_throughput(self):
+        self.aggregator.update('a', 0, 1000)
+        self.clock.now += 1
+        self.aggregator.update('b', 0, 1000)
+        self.clock.now += 1
+        self.aggregator.update('a', 400, 1000)
+        self.aggregator.update('b', 200, 1000)
+
+        snapshot = self.aggregator.snapshot()
+        self.assertEqual(200, snapshot.transfers['a'].throughput)
+        self.assertEqual(200, snapshot.transfers['b'].throughput)
+        self.assertEqual(300, snapshot.overall.throughput)
+
+    def test_format_byte_rate(self):
+        self.assertEqual('512.0 B/s', format_byte_rate(512))
+        self.assertEqual('1.5 MiB/s', format_byte_rate(1.5 * 1024 * 1024))
+
+    def test_drop_completed_transfers(self):
+        aggregator = ProgressAggregator(clock=self.clock, keep_completed=False)
+        aggregator.update('a', 100, 100)
+        aggregator.update('b', 10, 100)
+
+        snapshot = aggregator.snapshot()
+        self.assertEqual(['b'], list(snapshot.transfers.keys()))
+        self.assertEqual((110, 200), (snapshot.overall.position, snapshot.overall.total))
@@ -0,0 +1,73 @@
+import threading
+from unittest import TestCase
+
+from dnastack.common.throttling import parse_byte_size, ByteRateLimiter, AdaptiveConcurrencyLimiter
+from tests.util.fake_clock import FakeClock
+
+
+class TestUnit(TestCase):
+    def test_parse_byte_size(self):
+        self.assertEqual(512, parse_byte_size('512'))
+        self.assertEqual(64 * 1024, parse_byte_size('64K'))
+        self.assertEqual(int(1.5 * 1024 * 1024), parse_byte_size('1.5m'))
+        self.assertEqual(2 * 1024 ** 3, parse_byte_size('2GiB'))
+
+        with self.assertRaises(ValueError):
+            parse_byte_size('fast')
+
+    def test_byte_rate_limiter(self):
+        clock = FakeClock()
+        limiter = ByteRateLimiter(1000, clock=clock, sleeper=clock.sleep)
+
+        # The first second worth of bytes is available immediately.
+        limiter.acquire(1000)
+        self.assertEqual([], clock.sleeps)
+
+        # The callers wait for the debt to be paid back.
+        limiter.acquire(500)
+        limiter.acquire(2000)
+        self.assertEqual([0.5, 2.0], clock.sleeps)
+
+    def test_concurrency_limit_follows_throughput(self):
+        clock = FakeClock()
+        limiter = AdaptiveConcurrencyLimiter(3, initial_limit=1, clock=clock)
+
+        def run_interval(byte_count: int):
+            clock.now += AdaptiveConcurrencyLimiter.ADJUSTMENT_INTERVAL
+            limiter.record(byte_count)
+
+        run_interval(1000)
+        self.assertEqual(2, limiter.limit)
+
+        run_interval(2000)
+        self.assertEqual(3, limiter.limit)
+
+        # Never beyond the maximum
+        run_interval(4000)
+        self.assertEqual(3, limiter.limit)
+
+        # Stable throughput keeps the limit.
+        run_interval(4000)
+        self.assertEqual(3, limiter.limit)
+
+        run_interval(1000)
+        self.assertEqual(2, limiter.limit)
+
+    def test_concurrency_gate(self):
+        limiter = AdaptiveConcurrencyLimiter(2)
+        limiter.acquire()
+        limiter.acquire()
+
+        acquired = threading.Event()
+
+        def acquire():
+            with limiter:
+                acquired.set()
+
+        thread = threading.Thread(target=acquire, daemon=True)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+
+        limiter.release()
+        self.assertTrue(acquired.wait(5))
+        thread.join(5)
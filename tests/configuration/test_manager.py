@@ -0,0 +1,85 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import yaml
+
+from dnastack.client.models import ServiceEndpoint
+from dnastack.configuration.manager import ConfigurationManager
+from dnastack.configuration.models import Configuration, DEFAULT_CONTEXT
+from dnastack.context.models import Context
+
+
+class TestUnit(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.config_file_path = os.path.join(self.temp_dir.name, 'config.yaml')
+
+        config = Configuration(contexts={DEFAULT_CONTEXT: Context(endpoints=[
+            ServiceEndpoint(id=f'ep-{i}', url=f'https://svc-{i}.faux.dnastack.com/',
+                            type=dict(group='org.ga4gh', artifact='drs', version='1.1.0'))
+            for i in range(50)
+        ])})
+        ConfigurationManager(self.config_file_path).save(config)
+
+    def test_load_parses_once_while_the_file_is_unchanged(self):
+        manager = ConfigurationManager(self.config_file_path, use_snapshot=False)
+
+        with patch('dnastack.configuration.manager.yaml.load', wraps=yaml.load) as yaml_load:
+            first = manager.load()
+            second = manager.load()
+
+        self.assertEqual(1, yaml_load.call_count)
+        self.assertEqual(first.model_dump(), second.model_dump())
+
+        # Each call returns an independent copy.
+        first.contexts[DEFAULT_CONTEXT].endpoints.clear()
+        self.assertEqual(50, len(manager.load().contexts[DEFAULT_CONTEXT].endpoints))
+
+    def test_load_detects_external_changes(self):
+        manager = ConfigurationManager(self.config_file_path, use_snapshot=False)
+        self.assertEqual(50, len(manager.load().contexts[DEFAULT_CONTEXT].endpoints))
+
+        # Simulate the change from another process.
+        other_manager = ConfigurationManager(self.config_file_path, use_snapshot=False)
+        config = other_manager.load()
+        config.contexts[DEFAULT_CONTEXT].endpoints.pop()
+        other_manager.save(config)
+
+        self.assertEqual(49, len(manager.load().contexts[DEFAULT_CONTEXT].endpoints))
+
+    def test_save_refreshes_the_cache(self):
+        manager = ConfigurationManager(self.config_file_path, use_snapshot=False)
+        config = manager.load()
+        config.current_context = 'alternative'
+        config.contexts['alternative'] = Context()
+        manager.save(config)
+
+        with patch('dnastack.configuration.manager.yaml.load', wraps=yaml.load) as yaml_load:
+            self.assertEqual('alternative', manager.load().current_context)
+
+        yaml_load.assert_not_called()
+
+    def test_snapshot_skips_yaml_parsing_in_new_processes(self):
+        ConfigurationManager(self.config_file_path, use_snapshot=True).load()
+        self.assertTrue(os.path.exists(f'{self.config_file_path}.snapshot.json'))
+
+        # A new manager simulates a new process.
+        with patch('dnastack.configuration.manager.yaml.load', wraps=yaml.load) as yaml_load:
+            config = ConfigurationManager(self.config_file_path, use_snapshot=True).load()
+
+        yaml_load.assert_not_called()
+        self.assertEqual(50, len(config.contexts[DEFAULT_CONTEXT].endpoints))
+
+    def test_stale_snapshot_is_ignored(self):
+        ConfigurationManager(self.config_file_path, use_snapshot=True).load()
+
+        # Modify the configuration without updating the snapshot.
+        with open(self.config_file_path, 'w') as f:
+            f.write(yaml.dump(Configuration(current_context='other',
+                                            contexts={'other': Context()}).model_dump(exclude_none=True)))
+
+        config = ConfigurationManager(self.config_file_path, use_snapshot=True).load()
+        self.assertEqual('other', config.current_context)
@@ -21,6 +21,9 @@ def test_environment():
     
     # Set test-specific environment variables
     os.environ['DNASTACK_TEST_MODE'] = 'true'
+
+    # The cached collection metadata must not leak between the tests.
+    os.environ['DNASTACK_COLLECTION_CACHE_TTL'] = '0'
     
     yield
     
@@ -28,6 +31,14 @@ def test_environment():
     os.environ.clear()
     os.environ.update(original_env)
 
+@pytest.fixture(autouse=True)
+def reset_cloud_metadata_cache():
+    """Prevent the process-wide cloud metadata cache from leaking between tests."""
+    from dnastack.http.authenticators.oauth2_adapter.cloud_providers import cloud_metadata_cache
+    cloud_metadata_cache.clear()
+    yield
+    cloud_metadata_cache.clear()
+
 # Authentication fixtures
 @pytest.fixture
 def mock_oauth2_authenticator():
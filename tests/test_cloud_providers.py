@@ -1,11 +1,59 @@
+import subprocess
+import sys
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from time import time
+from typing import List
 from unittest.mock import Mock, patch, MagicMock
+
+import jwt
+
 from dnastack.common.tracing import Span
 from dnastack.http.authenticators.oauth2_adapter.cloud_providers import (
     CloudProvider, CloudProviderFactory, GCPMetadataProvider, AWSMetadataProvider, CloudMetadataConfig
 )
 
 
+class _FakeMetadataServer:
+    """ Local stand-in for the GCP metadata server, recording the requested paths """
+
+    def __init__(self, token_ttl: int = 3600):
+        requested_paths: List[str] = []
+        self.requested_paths = requested_paths
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requested_paths.append(self.path)
+                if self.headers.get('Metadata-Flavor') != 'Google':
+                    self.send_response(403)
+                    self.end_headers()
+                    return
+                if self.path.startswith('/computeMetadata/v1/project/project-id'):
+                    body = b'faux-project'
+                else:
+                    body = jwt.encode(dict(sub='faux', exp=int(time()) + token_ttl), 'fantasy').encode()
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.__server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.__server.server_port}/computeMetadata/v1'
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+
 class TestCloudProviders(unittest.TestCase):
 
     def setUp(self):
@@ -280,6 +328,57 @@ class TestCloudProviders(unittest.TestCase):
         self.assertIsInstance(aws_provider, AWSMetadataProvider)
         self.assertEqual(aws_provider.name, "aws")
 
+    def test_gcp_availability_and_identity_token_cached_across_providers(self):
+        """Test the probe and the identity token are shared by all provider instances in the process."""
+        with _FakeMetadataServer() as server, \
+                patch.object(GCPMetadataProvider, '_METADATA_BASE_URL', server.base_url):
+            first_token = None
+            for _ in range(3):
+                # Each authenticator creates its own provider.
+                provider = GCPMetadataProvider(timeout=self.config.timeout)
+                self.assertTrue(provider.is_available())
+                token = provider.get_identity_token(self.test_audience, self.trace_context)
+                first_token = first_token or token
+                self.assertEqual(first_token, token)
+
+            self.assertEqual(1, len([p for p in server.requested_paths if 'project-id' in p]))
+            self.assertEqual(1, len([p for p in server.requested_paths if 'identity' in p]))
+
+            # A different audience requires a different token.
+            provider.get_identity_token('https://other.example.com', self.trace_context)
+            self.assertEqual(2, len([p for p in server.requested_paths if 'identity' in p]))
+
+    def test_gcp_identity_token_not_cached_when_about_to_expire(self):
+        """Test tokens too close to their expiry are fetched again."""
+        with _FakeMetadataServer(token_ttl=30) as server, \
+                patch.object(GCPMetadataProvider, '_METADATA_BASE_URL', server.base_url):
+            provider = GCPMetadataProvider(timeout=self.config.timeout)
+            provider.get_identity_token(self.test_audience, self.trace_context)
+            provider.get_identity_token(self.test_audience, self.trace_context)
+
+            self.assertEqual(2, len([p for p in server.requested_paths if 'identity' in p]))
+
+    def test_gcp_unavailability_cached(self):
+        """Test off-cloud hosts only pay for the probe once."""
+        with _FakeMetadataServer() as server:
+            unreachable_url = server.base_url
+        with patch.object(GCPMetadataProvider, '_METADATA_BASE_URL', unreachable_url), \
+                patch.object(GCPMetadataProvider, '_probe', wraps=GCPMetadataProvider(timeout=1)._probe) as probe:
+            started_at = time()
+            for _ in range(5):
+                self.assertFalse(GCPMetadataProvider(timeout=self.config.timeout).is_available())
+            self.assertEqual(1, probe.call_count)
+            self.assertLess(time() - started_at, 2)
+
+    def test_boto3_not_imported_until_aws_provider_used(self):
+        """Test importing the module does not load the AWS SDK."""
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys; import dnastack.http.authenticators.oauth2_adapter.cloud_providers; '
+            'print("boto3" in sys.modules)'
+        ])
+        self.assertEqual('False', output.decode().strip())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -12,7 +12,8 @@ from dnastack.cli.commands.explorer.questions.utils import (
     flatten_result_for_export,
     format_question_parameters,
     format_question_collections,
-    validate_question_parameters
+    validate_question_parameters,
+    write_results_to_file
 )
 from dnastack.cli.commands.explorer.questions.tables import (
     format_question_list_table,
@@ -720,6 +721,36 @@ class TestExplorerUtils:
         result = validate_question_parameters(inputs, mock_question)
         assert_that(result).is_equal_to(inputs)
 
+    def test_should_stream_results_to_json_and_yaml_files(self):
+        """Test that the results are written from an iterator without being collected first"""
+        import json
+        import yaml
+
+        results = [{'id': 1, 'nested': {'key': 'value'}}, {'id': 2, 'nested': None}]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for output_format, load in [('json', json.load), ('yaml', yaml.safe_load)]:
+                output_file = os.path.join(temp_dir, f'results.{output_format}')
+
+                assert_that(write_results_to_file(iter(results), output_file, output_format)).is_equal_to(2)
+                with open(output_file) as f:
+                    assert_that(load(f)).is_equal_to(results)
+
+                assert_that(write_results_to_file(iter([]), output_file, output_format)).is_equal_to(0)
+                with open(output_file) as f:
+                    assert_that(load(f)).is_equal_to([])
+
+    def test_should_write_csv_columns_from_all_streamed_results(self):
+        """Test that the CSV columns include the keys which only appear in later results"""
+        results = iter([{'id': 1}, {'id': 2, 'extra': {'key': 'value'}}])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, 'results.csv')
+
+            assert_that(write_results_to_file(results, output_file, 'csv')).is_equal_to(2)
+            with open(output_file) as f:
+                assert_that(f.read().splitlines()).is_equal_to(['extra.key,id', ',1', 'value,2'])
+
 
 class TestExplorerTables:
     """Test cases for explorer table formatting functions"""
@@ -0,0 +1,71 @@
+"""Unit tests for applying endpoint edits in one batch"""
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from dnastack.cli.commands.config.endpoints import endpoint_command_group
+from dnastack.configuration.manager import ConfigurationManager
+
+
+class TestApplyEndpointEditsCommand(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.config_manager = ConfigurationManager(os.path.join(self.temp_dir.name, 'config.yaml'))
+
+        patcher = patch('dnastack.cli.commands.config.endpoints.container.get', return_value=self.config_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _apply(self, edits):
+        return self.runner.invoke(endpoint_command_group, ['apply', '-'], input=json.dumps(edits))
+
+    def test_apply_saves_once(self):
+        edits = [dict(action='add', id=f'drs-{i}', type='drs') for i in range(20)]
+        edits.extend(dict(action='set', id=f'drs-{i}', property='url', value=f'https://drs-{i}.faux.dnastack.com/')
+                     for i in range(20))
+        edits.append(dict(action='set-default', id='drs-7'))
+
+        with patch.object(self.config_manager, 'save', wraps=self.config_manager.save) as save:
+            result = self._apply(edits)
+
+        self.assertEqual(0, result.exit_code, result.output)
+        save.assert_called_once()
+
+        context = self.config_manager.load().contexts[self.config_manager.load().current_context]
+        self.assertEqual(20, len(context.endpoints))
+        self.assertEqual('https://drs-3.faux.dnastack.com/', context.endpoints[3].url)
+        self.assertEqual('drs-7', context.defaults['drs'])
+
+    def test_apply_saves_nothing_on_failure(self):
+        edits = [
+            dict(action='add', id='drs-1', type='drs'),
+            dict(action='set', id='drs-unknown', property='url', value='https://faux.dnastack.com/'),
+        ]
+
+        with patch.object(self.config_manager, 'save', wraps=self.config_manager.save) as save:
+            result = self._apply(edits)
+
+        self.assertNotEqual(0, result.exit_code)
+        save.assert_not_called()
+
+
+class TestConfigurationTransaction(unittest.TestCase):
+    def test_transaction_saves_only_on_success(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = ConfigurationManager(os.path.join(temp_dir, 'config.yaml'))
+
+            with manager.transaction() as config:
+                config.current_context = 'alpha'
+
+            with self.assertRaises(RuntimeError):
+                with manager.transaction() as config:
+                    config.current_context = 'bravo'
+                    raise RuntimeError('abort')
+
+            self.assertEqual('alpha', manager.load().current_context)
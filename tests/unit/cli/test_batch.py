@@ -0,0 +1,40 @@
+"""Unit tests for running many commands in one process"""
+import json
+import unittest
+
+from click.testing import CliRunner
+
+from dnastack.omics_cli import omics
+
+
+class TestBatchCommand(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner()
+
+    def _run_batch(self, lines, *options):
+        result = self.runner.invoke(omics, ['batch', '-', *options], input='\n'.join(lines) + '\n')
+        return result.exit_code, json.loads(result.stdout)
+
+    def test_capture_each_command_separately(self):
+        exit_code, results = self._run_batch(['# The schema', 'config schema', '', 'no-such-command', 'batch -'])
+
+        self.assertEqual(1, exit_code)
+        self.assertEqual([(2, 'config schema', 0), (4, 'no-such-command', 2), (5, 'batch -', 2)],
+                         [(r['line'], r['command'], r['exit_code']) for r in results])
+
+        self.assertIn('"$defs"', results[0]['output'])
+        self.assertEqual('', results[0]['error'])
+        self.assertIn('No such command', results[1]['error'])
+        self.assertIn('cannot be used in a batch', results[2]['error'])
+
+    def test_stop_on_error(self):
+        exit_code, results = self._run_batch(['no-such-command', 'config schema'], '--stop-on-error')
+
+        self.assertEqual(1, exit_code)
+        self.assertEqual(['no-such-command'], [r['command'] for r in results])
+
+    def test_exit_normally_when_all_commands_succeed(self):
+        exit_code, results = self._run_batch(['config schema', 'config schema'])
+
+        self.assertEqual(0, exit_code)
+        self.assertEqual([0, 0], [r['exit_code'] for r in results])
@@ -0,0 +1,147 @@
+import io
+import os
+import sys
+import tempfile
+from threading import Thread, Event
+from time import sleep
+from unittest import TestCase
+from unittest.mock import patch
+
+import click
+
+from dnastack.cli.daemon.client import run_via_daemon
+from dnastack.cli.daemon.server import CliDaemon, send_control
+from dnastack.common.logger import get_logger
+
+command_started = Event()
+command_released = Event()
+
+
+@click.group()
+def faux_cli():
+    pass
+
+
+@faux_cli.command()
+@click.argument('name')
+def greet(name):
+    click.echo(f'Hello, {name}')
+    click.echo('Careful', err=True)
+
+
+@faux_cli.command()
+def cwd():
+    click.echo(os.getcwd())
+
+
+@faux_cli.command()
+def fail():
+    raise click.ClickException('It broke')
+
+
+@faux_cli.command()
+def shout():
+    click.echo(f'{sys.stdin.read().upper()} (tty: {sys.stdin.isatty()})')
+
+
+@faux_cli.command()
+def log():
+    get_logger('faux').warning('Logged')
+
+
+@faux_cli.command()
+def wait():
+    command_started.set()
+    command_released.wait(10)
+
+
+class TestCliDaemon(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.socket_path = os.path.join(self.temp_dir.name, 'daemon.sock')
+
+        self.daemon = CliDaemon(self.socket_path, command=faux_cli, idle_timeout=10)
+        self.thread = Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        self.addCleanup(self._stop_daemon)
+
+        for _ in range(100):
+            if send_control(self.socket_path, 'ping'):
+                break
+            sleep(0.05)
+
+    def _stop_daemon(self):
+        send_control(self.socket_path, 'stop')
+        self.thread.join(5)
+
+    def _run(self, argv, input_data: bytes = b''):
+        stdin = io.TextIOWrapper(io.BytesIO(input_data), encoding='utf-8')
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        stderr = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        with patch.object(sys, 'stdin', stdin), \
+                patch.object(sys, 'stdout', stdout), \
+                patch.object(sys, 'stderr', stderr):
+            exit_code = run_via_daemon(argv, 'omics', self.socket_path)
+        return exit_code, stdout.buffer.getvalue().decode(), stderr.buffer.getvalue().decode()
+
+    def test_forward_output_and_exit_code(self):
+        self.assertEqual((0, 'Hello, Alice\n', 'Careful\n'), self._run(['greet', 'Alice']))
+
+        exit_code, _, error_output = self._run(['fail'])
+        self.assertEqual(1, exit_code)
+        self.assertIn('It broke', error_output)
+
+        exit_code, _, error_output = self._run(['unknown-command'])
+        self.assertEqual(2, exit_code)
+        self.assertIn('No such command', error_output)
+
+    def test_run_in_working_directory_of_client(self):
+        working_dir = os.path.join(self.temp_dir.name, 'work')
+        os.makedirs(working_dir)
+        original_cwd = os.getcwd()
+
+        os.chdir(working_dir)
+        try:
+            exit_code, output, _ = self._run(['cwd'])
+        finally:
+            os.chdir(original_cwd)
+
+        self.assertEqual(0, exit_code)
+        self.assertEqual(os.path.realpath(working_dir), os.path.realpath(output.strip()))
+
+    def test_fall_back_when_environment_differs(self):
+        with patch.dict(os.environ, {'DNASTACK_CONTEXT': 'somewhere-else'}):
+            self.assertEqual((None, '', ''), self._run(['greet', 'Bob']))
+
+    def test_fall_back_when_daemon_is_not_running(self):
+        self.assertIsNone(run_via_daemon(['greet', 'Bob'], 'omics', os.path.join(self.temp_dir.name, 'missing.sock')))
+
+    def test_forward_standard_input(self):
+        self.assertEqual((0, 'HELLO (tty: False)\n', ''), self._run(['shout'], b'hello'))
+
+    def test_forward_log_output(self):
+        exit_code, _, error_output = self._run(['log'])
+
+        self.assertEqual(0, exit_code)
+        self.assertIn('Logged', error_output)
+
+    def test_fall_back_when_proxy_differs(self):
+        with patch.dict(os.environ, {'HTTPS_PROXY': 'http://proxy.faux.dnastack.com:3128'}):
+            self.assertEqual((None, '', ''), self._run(['greet', 'Bob']))
+
+    def test_fall_back_while_busy(self):
+        command_started.clear()
+        command_released.clear()
+        self.addCleanup(command_released.set)
+
+        background_command = Thread(target=run_via_daemon, args=(['wait'], 'omics', self.socket_path), daemon=True)
+        background_command.start()
+        self.assertTrue(command_started.wait(5))
+
+        self.assertEqual((None, '', ''), self._run(['greet', 'Bob']))
+        self.assertIsNotNone(send_control(self.socket_path, 'ping'))
+
+        command_released.set()
+        background_command.join(5)
+        self.assertEqual((0, 'Hello, Bob\n', 'Careful\n'), self._run(['greet', 'Bob']))
@@ -1,7 +1,17 @@
+import json
+import os
+import tempfile
 from unittest.mock import MagicMock, patch
 
-from dnastack.client.collections.client import CollectionServiceClient
+import pytest
+import requests
+
+from dnastack.client.collections.cache import CollectionMetadataCache
+from dnastack.client.collections.client import CollectionServiceClient, UnknownCollectionError
+from dnastack.client.collections.model import DeleteCollectionItemsRequest
 from dnastack.client.models import ServiceEndpoint
+from dnastack.http.session import ClientError, ServerError
+from tests.util.fake_clock import FakeClock
 
 
 def _make_client(url='http://localhost:8093/'):
@@ -43,3 +53,315 @@ class TestSubmitTelemetry:
             json={'resourceLogs': []},
             trace_context=mock_trace
         )
+
+
+def _mock_session():
+    mock_session = MagicMock()
+    mock_session.__enter__ = MagicMock(return_value=mock_session)
+    mock_session.__exit__ = MagicMock(return_value=False)
+    return mock_session
+
+
+def _http_error(error_class, status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return error_class(response)
+
+
+class TestDeleteCollectionItemsInBulk:
+
+    def test_deletes_in_batches(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+        request = DeleteCollectionItemsRequest(dataSourceId='ds-1', sourceKeys=['a', 'b', 'c', 'a'])
+
+        with patch.object(client, 'create_http_session', return_value=mock_session):
+            results = list(client.delete_collection_items_in_bulk('col-1', request, batch_size=2))
+
+        assert [(r.sourceKey, r.deleted) for r in results] == [('a', True), ('b', True), ('c', True)]
+        assert mock_session.post.call_count == 2
+        assert mock_session.post.call_args_list[0].args[0] == 'http://localhost:8093/collections/col-1/items/bulk-delete'
+        assert mock_session.post.call_args_list[0].kwargs['json']['sourceKeys'] == ['a', 'b']
+        mock_session.delete.assert_not_called()
+
+    def test_falls_back_to_concurrent_deletion_with_retries(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+        mock_session.post.side_effect = _http_error(ClientError, 404)
+        attempts = {}
+
+        def delete(url, params, trace_context):
+            source_key = params['sourceKey']
+            attempts[source_key] = attempts.get(source_key, 0) + 1
+            if source_key == 'flaky' and attempts[source_key] < 2:
+                raise _http_error(ServerError, 503)
+            if source_key == 'forbidden':
+                raise _http_error(ClientError, 403)
+
+        mock_session.delete.side_effect = delete
+        request = DeleteCollectionItemsRequest(dataSourceId='ds-1', sourceKeys=['ok', 'flaky', 'forbidden'])
+
+        with patch.object(client, 'create_http_session', return_value=mock_session), \
+                patch('dnastack.client.collections.client.sleep'):
+            results = {r.sourceKey: r for r in client.delete_collection_items_in_bulk('col-1', request)}
+
+            # The lack of support is remembered.
+            list(client.delete_collection_items_in_bulk('col-1', request))
+
+        assert mock_session.post.call_count == 1
+        assert (results['ok'].deleted, results['ok'].attempts) == (True, 1)
+        assert (results['flaky'].deleted, results['flaky'].attempts) == (True, 2)
+        assert results['forbidden'].deleted is False
+        assert attempts['forbidden'] == 2
+
+
+    def test_retries_connection_errors_and_records_failures(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+        mock_session.post.side_effect = [requests.exceptions.ConnectionError('reset'),
+                                         None,
+                                         requests.exceptions.Timeout('slow'),
+                                         requests.exceptions.Timeout('slow'),
+                                         requests.exceptions.Timeout('slow')]
+        request = DeleteCollectionItemsRequest(dataSourceId='ds-1', sourceKeys=['a', 'b'])
+
+        with patch.object(client, 'create_http_session', return_value=mock_session), \
+                patch('dnastack.client.collections.client.sleep'):
+            results = list(client.delete_collection_items_in_bulk('col-1', request, batch_size=1))
+
+        assert [(r.sourceKey, r.deleted, r.attempts) for r in results] == [('a', True, 2), ('b', False, 3)]
+        assert 'slow' in results[1].error
+
+
+class TestCreateCollectionItemsInChunks:
+
+    def test_creates_in_chunks_bounded_by_count_and_size(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+        source_keys = iter(['a', 'b', 'b', 'c', 'x' * 100, 'd'])
+
+        with patch.object(client, 'create_http_session', return_value=mock_session):
+            results = list(client.create_collection_items_in_chunks('col-1', 'ds-1', source_keys,
+                                                                    max_chunk_item_count=2,
+                                                                    max_chunk_byte_size=50,
+                                                                    max_concurrency=1))
+
+        results = sorted(results, key=lambda r: r.index)
+        assert [(r.index, r.itemCount, r.created) for r in results] == [(0, 2, True), (1, 1, True), (2, 1, True),
+                                                                         (3, 1, True)]
+        submitted_chunks = [c.kwargs['json']['sourceKeys'] for c in mock_session.post.call_args_list]
+        assert submitted_chunks == [['a', 'b'], ['c'], ['x' * 100], ['d']]
+        assert mock_session.post.call_args_list[0].args[0] == 'http://localhost:8093/collections/col-1/items'
+        assert mock_session.post.call_args_list[0].kwargs['json']['dataSourceId'] == 'ds-1'
+
+    def test_records_connection_failures(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+        mock_session.post.side_effect = requests.exceptions.ConnectionError('reset')
+
+        with patch.object(client, 'create_http_session', return_value=mock_session), \
+                patch('dnastack.client.collections.client.sleep'):
+            results = list(client.create_collection_items_in_chunks('col-1', 'ds-1', ['a', 'b'], max_attempts=2))
+
+        assert [(r.created, r.error) for r in results] == [(False, 'reset')]
+        assert mock_session.post.call_count == 2
+
+    def test_resumes_from_checkpoint(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+        attempts = {}
+
+        def post(url, json, trace_context):
+            chunk = tuple(json['sourceKeys'])
+            attempts[chunk] = attempts.get(chunk, 0) + 1
+            if chunk == ('c', 'd') and attempts[chunk] == 1:
+                raise _http_error(ServerError, 503)
+            if chunk == ('e',) and attempts[chunk] == 1:
+                raise _http_error(ClientError, 400)
+
+        mock_session.post.side_effect = post
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(client, 'create_http_session', return_value=mock_session), \
+                patch('dnastack.client.collections.client.sleep'):
+            checkpoint_path = os.path.join(temp_dir, 'checkpoint.json')
+
+            def create():
+                return {
+                    r.index: r
+                    for r in client.create_collection_items_in_chunks('col-1', 'ds-1', ['a', 'b', 'c', 'd', 'e'],
+                                                                      max_chunk_item_count=2,
+                                                                      checkpoint_path=checkpoint_path)
+                }
+
+            results = create()
+            assert (results[0].created, results[0].attempts) == (True, 1)
+            assert (results[1].created, results[1].attempts) == (True, 2)
+            assert results[2].created is False
+
+            with open(checkpoint_path) as f:
+                assert list(json.load(f)['completedChunks'].keys()) == ['0', '1']
+
+            # Only the failed chunk is submitted again.
+            results = create()
+            assert [results[i].skipped for i in range(3)] == [True, True, False]
+            assert results[2].created is True
+            assert attempts == {('a', 'b'): 1, ('c', 'd'): 2, ('e',): 2}
+
+            # The checkpoint cannot be reused with another input.
+            with pytest.raises(ValueError):
+                list(client.create_collection_items_in_chunks('col-1', 'ds-1', ['a', 'x', 'c', 'd', 'e'],
+                                                              max_chunk_item_count=2,
+                                                              checkpoint_path=checkpoint_path))
+
+            # The checkpoint cannot be reused with other settings.
+            with pytest.raises(ValueError):
+                list(client.create_collection_items_in_chunks('col-1', 'ds-2', ['a'], checkpoint_path=checkpoint_path))
+
+
+def _collection_response(status_code=200, etag=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {'ETag': etag} if etag else {}
+    response.json.return_value = dict(id='col-id', name='Collection', slugName='col-slug',
+                                      itemsQuery='SELECT * FROM items')
+    return response
+
+
+class TestCollectionMetadataCache:
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.clock = FakeClock(1_700_000_000.0)
+        self.cache_path = os.path.join(self.temp_dir.name, 'collections.json')
+        self.client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        self.client.metadata_cache = CollectionMetadataCache(self.cache_path, ttl=60, clock=self.clock)
+        self.session = _mock_session()
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def test_data_connect_endpoint_reuses_cached_collection(self):
+        self.session.get.return_value = _collection_response()
+
+        with patch.object(self.client, 'create_http_session', return_value=self.session):
+            assert self.client.get('col-id', use_cache=True).slugName == 'col-slug'
+            endpoint = self.client.data_connect_endpoint('col-id')
+
+            # The cache is shared with the other clients of the same endpoint.
+            other_client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+            other_client.metadata_cache = CollectionMetadataCache(self.cache_path, ttl=60, clock=self.clock)
+            other_client.data_connect_endpoint('col-slug')
+
+        assert endpoint.url == 'http://localhost:8093/collection/col-slug/data-connect/'
+        assert self.session.get.call_count == 1
+
+    def test_stale_collection_is_revalidated(self):
+        self.session.get.return_value = _collection_response(etag='"v1"')
+
+        with patch.object(self.client, 'create_http_session', return_value=self.session):
+            self.client.get('col-slug', use_cache=True)
+
+            self.clock.now += 61
+            self.session.get.return_value = _collection_response(status_code=304)
+            assert self.client.get('col-slug', use_cache=True).id == 'col-id'
+            assert self.session.get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+
+            # The revalidated collection is fresh again.
+            self.client.get('col-slug', use_cache=True)
+
+        assert self.session.get.call_count == 2
+
+    def test_unknown_collection_is_invalidated(self):
+        self.session.get.return_value = _collection_response()
+
+        with patch.object(self.client, 'create_http_session', return_value=self.session):
+            self.client.get('col-id', use_cache=True)
+
+            self.session.get.side_effect = _http_error(ClientError, 404)
+            with pytest.raises(UnknownCollectionError):
+                self.client.get('col-id')
+
+        assert self.client.metadata_cache.get('col-slug') is None
+
+        with open(self.cache_path) as f:
+            assert json.load(f) == {}
+
+    def test_plain_get_only_replaces_outdated_entry(self):
+        self.session.get.return_value = _collection_response(etag='"v1"')
+
+        with patch.object(self.client, 'create_http_session', return_value=self.session):
+            self.client.get('col-id')
+            assert not os.path.exists(self.cache_path)
+
+            self.client.get('col-id', use_cache=True)
+            modified_time = os.stat(self.cache_path).st_mtime_ns
+
+            self.clock.now += 10
+            self.client.get('col-id')
+            assert os.stat(self.cache_path).st_mtime_ns == modified_time
+
+            self.session.get.return_value = _collection_response(etag='"v2"')
+            self.client.get('col-id')
+
+        with open(self.cache_path) as f:
+            assert [entry['etag'] for entry in json.load(f).values()] == ['"v2"']
+
+    def test_entries_are_kept_apart_by_identity(self):
+        self.session.get.return_value = _collection_response()
+
+        with patch.object(self.client, 'create_http_session', return_value=self.session):
+            self.client.get('col-id', use_cache=True)
+            self.client.get('col-id', use_cache=True, no_auth=True)
+            self.client.get('col-id', use_cache=True, no_auth=True)
+
+        assert self.session.get.call_count == 2
+
+
+class TestConcurrentLookups:
+
+    def test_get_many_preserves_order_and_reports_errors(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+
+        def get(url, headers, trace_context):
+            id_or_slug_name = url.split('/')[-1]
+            if id_or_slug_name == 'missing':
+                raise _http_error(ClientError, 404)
+            if id_or_slug_name == 'broken':
+                raise _http_error(ServerError, 500)
+            response = MagicMock()
+            response.headers = {}
+            response.json.return_value = dict(id=id_or_slug_name, name=id_or_slug_name, slugName=id_or_slug_name)
+            return response
+
+        mock_session.get.side_effect = get
+
+        with patch.object(client, 'create_http_session', return_value=mock_session):
+            results = client.get_many(['c', 'missing', 'a', 'broken', 'c', 'b'], max_concurrency=3)
+
+        assert [r.idOrSlugName for r in results] == ['c', 'missing', 'a', 'broken', 'b']
+        assert [r.collection.id if r.collection else None for r in results] == ['c', None, 'a', None, 'b']
+        assert results[1].error == 'The collection does not exist.'
+        assert results[3].error
+        assert mock_session.get.call_count == 5
+
+    def test_get_collection_statuses(self):
+        client = CollectionServiceClient.make(ServiceEndpoint(url='http://localhost:8093/'))
+        mock_session = _mock_session()
+
+        def get(url, trace_context):
+            if '/forbidden/' in url:
+                raise _http_error(ClientError, 403)
+            response = MagicMock()
+            response.json.return_value = dict(validationsStatus='MISSING_ITEMS', missingItems=url.count('/'))
+            return response
+
+        mock_session.get.side_effect = get
+
+        with patch.object(client, 'create_http_session', return_value=mock_session):
+            results = client.get_collection_statuses(['col-1', 'forbidden'])
+
+        assert [r.idOrSlugName for r in results] == ['col-1', 'forbidden']
+        assert results[0].status.missingItems == 5
+        assert (results[1].status, bool(results[1].error)) == (None, True)
@@ -0,0 +1,170 @@
+import os
+import re
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Tuple
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+from urllib.parse import urlparse, parse_qs
+
+from dnastack.client.drs import Blob, DrsObject, DrsObjectAccessUrl, DrsApiError
+
+
+class _FakeObjectStorage:
+    """ Serve one object with range requests, accepting only the latest access token """
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.valid_token = 'token-1'
+        self.range_supported = True
+        self.truncated_byte_count = 0
+        self.requested_ranges: List[Tuple[int, int]] = []
+        storage = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                token = parse_qs(urlparse(self.path).query).get('token', [None])[0]
+                if token != storage.valid_token:
+                    self.send_response(403)
+                    self.end_headers()
+                    return
+
+                match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range') or '')
+                start, end = int(match.group(1)), min(int(match.group(2)), len(storage.content) - 1)
+                storage.requested_ranges.append((start, end))
+
+                if storage.range_supported:
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{len(storage.content)}')
+                    content = storage.content[start:end + 1]
+                else:
+                    self.send_response(200)
+                    content = storage.content
+
+                content = content[:len(content) - storage.truncated_byte_count]
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def url(self, token: str) -> str:
+        return f'http://127.0.0.1:{self.server.server_port}/object?token={token}'
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestBlobReader(TestCase):
+    def setUp(self):
+        self.content = os.urandom(10 * 1024 + 123)
+        self.storage = _FakeObjectStorage(self.content)
+        self.addCleanup(self.storage.shutdown)
+
+        self.blob = Blob('drs://drs.faux.dnastack.com/object-1', MagicMock())
+        self.addCleanup(self.blob.close)
+
+        drs_object = DrsObject(id='object-1', name='object-1', checksums=[], size=len(self.content),
+                               created_time=datetime.now(), updated_time=datetime.now())
+        patcher = patch.object(Blob, 'get_object', return_value=drs_object)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def get_access_url_object(refresh: bool = False) -> DrsObjectAccessUrl:
+            self.access_url_requests.append(refresh)
+            return DrsObjectAccessUrl(url=self.storage.url(self.storage.valid_token))
+
+        self.access_url_requests: List[bool] = []
+        patcher = patch.object(Blob, 'get_access_url_object', side_effect=get_access_url_object)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _open(self, read_ahead: int = 2, cache_size: int = 4):
+        return self.blob.open(block_size=1024, cache_size=cache_size, read_ahead=read_ahead)
+
+    def test_random_access(self):
+        with self._open() as reader:
+            reader.seek(5000)
+            self.assertEqual(self.content[5000:5100], reader.read(100))
+
+            reader.seek(-50, os.SEEK_END)
+            self.assertEqual(self.content[-50:], reader.read())
+            self.assertEqual(b'', reader.read(10))
+
+            reader.seek(10)
+            self.assertEqual(self.content[10:20], reader.read(10))
+
+        # Only the blocks being read are downloaded.
+        self.assertEqual([(4096, 5119), (10240, 10362), (0, 1023)], self.storage.requested_ranges)
+
+    def test_sequential_read_with_read_ahead(self):
+        with self._open(read_ahead=2) as reader:
+            self.assertEqual(self.content, reader.read())
+
+        self.assertEqual([(0, 1023), (1024, 4095), (4096, 7167), (7168, 10239), (10240, 10362)],
+                         self.storage.requested_ranges)
+
+    def test_cached_blocks_are_reused(self):
+        with self._open() as reader:
+            for _ in range(5):
+                reader.seek(100)
+                reader.read(10)
+
+        self.assertEqual([(0, 1023)], self.storage.requested_ranges)
+
+    def test_refresh_expired_access_url(self):
+        with self._open() as reader:
+            reader.read(10)
+
+            # The current access URL expires.
+            self.storage.valid_token = 'token-2'
+
+            reader.seek(9000)
+            self.assertEqual(self.content[9000:9010], reader.read(10))
+
+        self.assertEqual([False, True], self.access_url_requests)
+
+    def test_fail_when_refreshed_access_url_is_rejected(self):
+        original_url = self.storage.url
+        self.storage.url = lambda token: original_url('invalid')
+
+        with self._open() as reader:
+            with self.assertRaises(DrsApiError):
+                reader.read(10)
+
+    def test_server_without_range_support(self):
+        self.storage.range_supported = False
+
+        with self._open() as reader:
+            reader.seek(5000)
+            self.assertEqual(self.content[5000:5100], reader.read(100))
+
+            reader.seek(10)
+            self.assertEqual(self.content[10:20], reader.read(10))
+
+            reader.seek(0)
+            self.assertEqual(self.content, reader.read())
+
+        # The whole object is only downloaded once.
+        self.assertEqual(1, len(self.storage.requested_ranges))
+
+    def test_fail_on_short_range_response(self):
+        self.storage.truncated_byte_count = 10
+
+        with self._open() as reader:
+            with self.assertRaises(DrsApiError):
+                reader.read(10)
+
+    def test_fail_on_short_full_response(self):
+        self.storage.range_supported = False
+        self.storage.truncated_byte_count = 10
+
+        with self._open() as reader:
+            with self.assertRaises(DrsApiError):
+                reader.read(10)
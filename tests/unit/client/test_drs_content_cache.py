@@ -0,0 +1,78 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from dnastack.client.drs import DrsClient
+from dnastack.client.models import ServiceEndpoint
+from dnastack.common.content_cache import ContentCache
+
+
+class TestDrsContentCache(TestCase):
+    def setUp(self):
+        self.content = os.urandom(64 * 1024)
+        self.request_count = 0
+        test = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                test.request_count += 1
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(test.content)))
+                self.end_headers()
+                self.wfile.write(test.content)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+        object_info = dict(id='object-1',
+                           name='object-1',
+                           size=len(self.content),
+                           created_time='2024-01-01T00:00:00Z',
+                           updated_time='2024-01-01T00:00:00Z',
+                           checksums=[dict(type='etag', checksum='abc'),
+                                      dict(type='sha-256', checksum=hashlib.sha256(self.content).hexdigest())],
+                           access_methods=[dict(type='https',
+                                                access_url=dict(url=f'http://127.0.0.1:{server.server_port}/a.bin'))])
+        session = MagicMock()
+        session.get.return_value.json.return_value = object_info
+
+        self.client = DrsClient.make(ServiceEndpoint(url='https://drs.faux.dnastack.com/'))
+        self.client.content_cache = ContentCache(os.path.join(self.temp_dir, 'cache'), max_size=1024 * 1024)
+        patcher = patch.object(self.client, 'create_http_session', return_value=session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _download(self, output_dir_name: str) -> bytes:
+        output_dir = os.path.join(self.temp_dir, output_dir_name)
+        self.client._download_files(['object-1'], output_dir)
+        with open(os.path.join(output_dir, 'a.bin'), 'rb') as f:
+            return f.read()
+
+    def test_repeated_downloads_are_restored_from_cache(self):
+        self.assertEqual(self.content, self._download('first'))
+        self.assertEqual(self.content, self._download('second'))
+        self.assertEqual(1, self.request_count)
+
+    def test_blob_reads_are_served_from_cache(self):
+        self._download('first')
+
+        with self.client.get_blob('object-1') as blob:
+            self.assertEqual(self.content, blob.data)
+            with blob.open() as reader:
+                reader.seek(100)
+                self.assertEqual(self.content[100:200], reader.read(100))
+
+        self.assertEqual(1, self.request_count)
@@ -0,0 +1,302 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Tuple
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from dnastack.client.drs import DownloadScheduler, DownloadOrder, DrsClient, DownloadStatus, DRSDownloadException, \
+    DrsObject, DownloadTask, iterate_unique, get_lease_item
+from dnastack.client.models import ServiceEndpoint
+from dnastack.common.leases import LeaseCoordinator
+
+
+class TestDownloadScheduler(TestCase):
+    def test_sort_by_size(self):
+        sizes = {'small': 1, 'medium': 100, 'large': 10000}
+        id_or_urls = ['unknown', 'medium', 'small', 'large']
+
+        self.assertEqual(['large', 'medium', 'small', 'unknown'],
+                         DownloadScheduler(order=DownloadOrder.LARGEST_FIRST).sort(id_or_urls, sizes))
+        self.assertEqual(['small', 'medium', 'large', 'unknown'],
+                         DownloadScheduler(order=DownloadOrder.SMALLEST_FIRST).sort(id_or_urls, sizes))
+        self.assertEqual(id_or_urls, DownloadScheduler(order=DownloadOrder.INPUT).sort(id_or_urls, sizes))
+
+    def test_run_within_concurrency_limit(self):
+        scheduler = DownloadScheduler(max_concurrency=4, initial_concurrency=2)
+        lock = threading.Lock()
+        active_counts = []
+        active_count = 0
+        downloaded = []
+
+        def download(id_or_url: str):
+            nonlocal active_count
+            with lock:
+                active_count += 1
+                active_counts.append(active_count)
+            threading.Event().wait(0.01)
+            with lock:
+                active_count -= 1
+                downloaded.append(id_or_url)
+
+        scheduler.run((f'object-{i}' for i in range(20)), download)
+
+        self.assertEqual({f'object-{i}' for i in range(20)}, set(downloaded))
+        self.assertLessEqual(max(active_counts), 2)
+
+    def test_throttled_buffer_size(self):
+        self.assertEqual(256, DownloadScheduler(max_bytes_per_second=1024).create_buffer().size)
+
+
+class TestStreamingDownloads(TestCase):
+    def setUp(self):
+        self.client = DrsClient.make(ServiceEndpoint(url='https://drs.faux.dnastack.com/'))
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        self.consumed_count = 0
+        self.consumed_counts_at_first_download: List[int] = []
+        self.resolved_windows: List[List[str]] = []
+
+        def resolve_objects(id_or_urls, no_auth=False):
+            self.resolved_windows.append(list(id_or_urls))
+            return {}
+
+        def download_file(drs_id_or_url, output_dir, scheduler, report, no_auth, file_name=None,
+                          is_lease_held=None):
+            if not self.consumed_counts_at_first_download:
+                self.consumed_counts_at_first_download.append(self.consumed_count)
+            if drs_id_or_url.endswith('-failed'):
+                report.add(drs_id_or_url, DownloadStatus.FAIL, 'Boom')
+                return DownloadStatus.FAIL
+            else:
+                report.add(drs_id_or_url, DownloadStatus.SUCCESS, 'Download Successful', f'/tmp/{drs_id_or_url}')
+                return DownloadStatus.SUCCESS
+
+        for name, side_effect in [('resolve_objects', resolve_objects), ('_DrsClient__download_file', download_file)]:
+            patcher = patch.object(self.client, name, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _manifest(self, count: int):
+        for i in range(count):
+            self.consumed_count += 1
+            yield f'object-{i % (count // 2)}\n'
+
+    def test_consume_manifest_lazily(self):
+        status_output = io.StringIO()
+        scheduler = DownloadScheduler(max_concurrency=2)
+
+        with patch.object(DownloadScheduler, 'SCHEDULING_WINDOW_SIZE', 10):
+            report = self.client._download_files(self._manifest(200), self.output_dir, scheduler=scheduler,
+                                                 status_output=status_output)
+
+        # The manifest is resolved and scheduled window by window, after skipping the duplicates.
+        self.assertEqual(10, len(self.resolved_windows))
+        self.assertTrue(all(len(window) == 10 for window in self.resolved_windows))
+        self.assertEqual(10, self.consumed_counts_at_first_download[0])
+
+        self.assertEqual(100, report.total_count)
+        self.assertEqual(0, report.failure_count)
+
+        statuses = [json.loads(line) for line in status_output.getvalue().splitlines()]
+        self.assertEqual(100, len(statuses))
+        self.assertEqual({'id_or_url': 'object-0', 'status': 'success', 'message': 'Download Successful',
+                          'output_file_path': '/tmp/object-0'},
+                         [s for s in statuses if s['id_or_url'] == 'object-0'][0])
+
+    def test_report_failures(self):
+        with self.assertRaises(DRSDownloadException):
+            self.client._download_files(['a-failed', 'b-failed'], self.output_dir)
+
+        report = self.client._download_files(['a-failed', 'b'], self.output_dir)
+        self.assertEqual(1, report.failure_count)
+        self.assertEqual('a-failed', report.failures[0].url)
+
+    def test_coordinated_downloads(self):
+        coordinator = LeaseCoordinator(os.path.join(self.output_dir, 'coordination'))
+        other_coordinator = LeaseCoordinator(os.path.join(self.output_dir, 'coordination'))
+
+        def item(id_or_url: str) -> str:
+            return get_lease_item(DownloadTask(id_or_url, self.output_dir), self.output_dir)
+
+        self.assertTrue(other_coordinator.claim(item('in-progress')))
+        other_coordinator.complete(item('done'))
+
+        report = self.client._download_files(['in-progress', 'done', 'new', 'new-failed'], self.output_dir,
+                                             coordinator=coordinator)
+
+        self.assertEqual((4, 1), (report.total_count, report.failure_count))
+        self.assertTrue(coordinator.is_done(item('new')))
+
+        # The failed download is released for the other processes.
+        self.assertFalse(coordinator.is_done(item('new-failed')))
+        self.assertTrue(other_coordinator.claim(item('new-failed')))
+
+    def test_iterate_unique(self):
+        self.assertEqual(['a', 'b', 'c'], list(iterate_unique(['a\n', ' b', '', 'a', 'c', 'b\n'])))
+
+
+class TestBundleDownloads(TestCase):
+    def setUp(self):
+        self.client = DrsClient.make(ServiceEndpoint(url='https://drs.faux.dnastack.com/'))
+
+        def make_object(object_id: str, name: str, size: int = 1, contents: list = None,
+                        access_methods: list = None) -> DrsObject:
+            return DrsObject(id=object_id, name=name, size=size, checksums=[], contents=contents,
+                             access_methods=access_methods or [],
+                             created_time='2024-01-01T00:00:00Z', updated_time='2024-01-01T00:00:00Z')
+
+        self.catalog = {
+            'bundle-1': make_object('bundle-1', 'dataset', contents=[
+                dict(name='readme.txt', id='file-1'),
+                dict(name='raw', contents=[dict(name='a.bam', drs_uri=['drs://drs.faux.dnastack.com/file-2'])]),
+                dict(name='sub', id='bundle-2'),
+            ]),
+            'bundle-2': make_object('bundle-2', 'sub', contents=[
+                dict(name='../b.vcf', id='file-3'),
+                dict(name='loop', id='bundle-1'),
+            ]),
+            'file-1': make_object('file-1', 'readme.txt', size=10),
+            'drs://drs.faux.dnastack.com/file-2': make_object('file-2', 'a.bam', size=1000),
+            'file-3': make_object('file-3', 'b.vcf', size=100),
+            'bundle-3': make_object('bundle-3', 'other-dataset', contents=[dict(name='readme.txt', id='file-1')]),
+            'empty-bundle': make_object('empty-bundle', 'nothing', contents=[]),
+            'blob-with-empty-contents': make_object('blob-with-empty-contents', 'c.txt', contents=[],
+                                                    access_methods=[dict(type='https',
+                                                                         access_url=dict(url='https://faux/c.txt'))]),
+        }
+        self.resolved_levels: List[List[str]] = []
+        self.tasks: List[Tuple[str, str, str]] = []
+
+        def resolve_objects(id_or_urls, no_auth=False):
+            self.resolved_levels.append(sorted(id_or_urls))
+            return {id_or_url: self.catalog[id_or_url] for id_or_url in id_or_urls if id_or_url in self.catalog}
+
+        def download_file(drs_id_or_url, output_dir, scheduler, report, no_auth, file_name=None,
+                          is_lease_held=None):
+            self.tasks.append((drs_id_or_url, output_dir, file_name))
+            report.add(drs_id_or_url, DownloadStatus.SUCCESS)
+
+        for name, side_effect in [('resolve_objects', resolve_objects), ('_DrsClient__download_file', download_file)]:
+            patcher = patch.object(self.client, name, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_download_bundle_tree(self):
+        scheduler = DownloadScheduler(max_concurrency=1, order=DownloadOrder.LARGEST_FIRST)
+        self.client._download_files(['bundle-1'], '/output', scheduler=scheduler)
+
+        self.assertEqual([('drs://drs.faux.dnastack.com/file-2', '/output/dataset/raw', 'a.bam'),
+                          ('file-3', '/output/dataset/sub', '.._b.vcf'),
+                          ('file-1', '/output/dataset', 'readme.txt')],
+                         self.tasks)
+
+        # Each level of the tree is resolved together.
+        self.assertEqual([['bundle-1'],
+                          ['bundle-2', 'file-1'],
+                          ['bundle-1', 'drs://drs.faux.dnastack.com/file-2', 'file-3']],
+                         self.resolved_levels)
+
+    def test_coordinate_blob_shared_by_bundles(self):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        coordinator = LeaseCoordinator(os.path.join(output_dir, 'coordination'))
+
+        report = self.client._download_files(['bundle-1', 'bundle-3'], output_dir, coordinator=coordinator)
+
+        # The blob is saved in both bundles.
+        self.assertEqual(0, report.failure_count)
+        self.assertEqual({('file-1', os.path.join(output_dir, 'dataset'), 'readme.txt'),
+                          ('file-1', os.path.join(output_dir, 'other-dataset'), 'readme.txt')},
+                         {task for task in self.tasks if task[0] == 'file-1'})
+
+    def test_report_empty_bundle(self):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        status_output = io.StringIO()
+
+        report = self.client._download_files(['empty-bundle', 'blob-with-empty-contents'],
+                                             output_dir,
+                                             status_output=status_output)
+
+        self.assertEqual((2, 0), (report.total_count, report.failure_count))
+        self.assertEqual([('blob-with-empty-contents', output_dir, None)], self.tasks)
+        self.assertTrue(os.path.isdir(os.path.join(output_dir, 'nothing')))
+        self.assertIn(dict(id_or_url='empty-bundle',
+                           status='success',
+                           message='Empty bundle',
+                           output_file_path=os.path.join(output_dir, 'nothing')),
+                      [json.loads(line) for line in status_output.getvalue().splitlines()])
+
+
+class TestLeasedDownloads(TestCase):
+    def setUp(self):
+        self.content = os.urandom(64 * 1024)
+        test = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(test.content)))
+                self.end_headers()
+                self.wfile.write(test.content)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        session = MagicMock()
+        session.get.return_value.json.return_value = dict(
+            id='object-1',
+            name='object-1',
+            size=len(self.content),
+            created_time='2024-01-01T00:00:00Z',
+            updated_time='2024-01-01T00:00:00Z',
+            checksums=[],
+            access_methods=[dict(type='https', access_url=dict(url=f'http://127.0.0.1:{server.server_port}/a.bin'))]
+        )
+
+        self.client = DrsClient.make(ServiceEndpoint(url='https://drs.faux.dnastack.com/'))
+        patcher = patch.object(self.client, 'create_http_session', return_value=session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.coordinator = MagicMock(spec=LeaseCoordinator)
+        self.coordinator.claim.return_value = True
+
+    def test_download_while_lease_is_held(self):
+        self.coordinator.is_held.return_value = True
+
+        report = self.client._download_files(['object-1'], self.output_dir, coordinator=self.coordinator)
+
+        self.assertEqual((1, 0), (report.total_count, report.failure_count))
+        self.assertEqual(['a.bin'], os.listdir(self.output_dir))
+        with open(os.path.join(self.output_dir, 'a.bin'), 'rb') as f:
+            self.assertEqual(self.content, f.read())
+        self.coordinator.complete.assert_called_once()
+
+    def test_stop_download_when_lease_is_lost(self):
+        self.coordinator.is_held.return_value = False
+        status_output = io.StringIO()
+
+        report = self.client._download_files(['object-1'], self.output_dir, coordinator=self.coordinator,
+                                             status_output=status_output)
+
+        # The file is left to the new holder of the lease.
+        self.assertEqual((1, 0), (report.total_count, report.failure_count))
+        self.assertEqual('skipped', json.loads(status_output.getvalue())['status'])
+        self.assertEqual([], os.listdir(self.output_dir))
+        self.coordinator.complete.assert_not_called()
+        self.coordinator.release.assert_called_once()
@@ -0,0 +1,204 @@
+from datetime import datetime, timezone
+from typing import List
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from dnastack.client.drs import DrsClient, DrsResolutionCache, DrsObject, DrsObjectAccessUrl, \
+    get_signed_url_expiry
+from dnastack.client.models import ServiceEndpoint
+from dnastack.http.session import ClientError, ServerError
+from tests.util.fake_clock import FakeClock
+
+SERVER_URL = 'https://drs.faux.dnastack.com/ga4gh/drs/v1/'
+
+
+def _object_info(object_id: str, access_url: str = None) -> dict:
+    return dict(id=object_id,
+                name=object_id,
+                checksums=[],
+                size=10,
+                created_time='2024-01-01T00:00:00Z',
+                updated_time='2024-01-01T00:00:00Z',
+                access_methods=[dict(type='https', access_url=dict(url=access_url))] if access_url else
+                [dict(type='https', access_id='access-1')])
+
+
+def _response(body: dict, status_code: int = 200) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body
+    return response
+
+
+class TestSignedUrlExpiry(TestCase):
+    def test_read_expiry_from_known_signatures(self):
+        signed_at = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+        self.assertEqual(signed_at + 900,
+                         get_signed_url_expiry('https://s3/a?X-Amz-Date=20240101T000000Z&X-Amz-Expires=900'))
+        self.assertEqual(signed_at + 600,
+                         get_signed_url_expiry('https://gcs/a?X-Goog-Date=20240101T000000Z&X-Goog-Expires=600'))
+        self.assertEqual(signed_at, get_signed_url_expiry(f'https://gcs/a?Expires={int(signed_at)}'))
+        self.assertEqual(signed_at, get_signed_url_expiry('https://azure/a?se=2024-01-01T00:00:00Z&sig=x'))
+
+    def test_unknown_expiry(self):
+        self.assertIsNone(get_signed_url_expiry('https://storage/a?token=abc'))
+        self.assertIsNone(get_signed_url_expiry('https://s3/a?X-Amz-Date=invalid&X-Amz-Expires=900'))
+
+
+class TestDrsResolutionCache(TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1_700_000_000.0)
+        self.cache = DrsResolutionCache(clock=self.clock)
+
+    def test_access_url_is_kept_until_shortly_before_expiry(self):
+        access_url = DrsObjectAccessUrl(url=f'https://storage/a?Expires={int(self.clock.now) + 100}')
+        self.cache.set_access_url('drs://a/1', access_url)
+
+        self.clock.now += 100 - DrsResolutionCache.EXPIRY_MARGIN - 1
+        self.assertEqual(access_url, self.cache.get_access_url('drs://a/1'))
+
+        self.clock.now += 1
+        self.assertIsNone(self.cache.get_access_url('drs://a/1'))
+
+    def test_expired_access_url_is_not_cached(self):
+        access_url = DrsObjectAccessUrl(url=f'https://storage/a?Expires={int(self.clock.now)}')
+        self.cache.set_access_url('drs://a/1', access_url)
+        self.assertIsNone(self.cache.get_access_url('drs://a/1'))
+
+    def test_object_expires_with_embedded_access_url(self):
+        self.cache.set_object('drs://a/1', DrsObject(**_object_info('1')))
+        signed_url = f'https://storage/2?Expires={int(self.clock.now) + 90}'
+        self.cache.set_object('drs://a/2', DrsObject(**_object_info('2', signed_url)))
+
+        self.clock.now += 90 - DrsResolutionCache.EXPIRY_MARGIN
+        self.assertIsNotNone(self.cache.get_object('drs://a/1'))
+        self.assertIsNone(self.cache.get_object('drs://a/2'))
+
+        self.clock.now += DrsResolutionCache.OBJECT_TTL
+        self.assertIsNone(self.cache.get_object('drs://a/1'))
+
+
+class TestBulkResolution(TestCase):
+    def setUp(self):
+        self.client = DrsClient.make(ServiceEndpoint(url='https://drs.faux.dnastack.com/'))
+        self.session = MagicMock()
+        patcher = patch.object(self.client, 'create_http_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _serve_single_objects(self):
+        requested_urls: List[str] = []
+
+        def get(url, **kwargs):
+            requested_urls.append(url)
+            if '/access/' in url:
+                return _response(dict(url=f'https://storage/{url.split("/")[-3]}?token=x'))
+            return _response(_object_info(url.split('/')[-1]))
+
+        self.session.get.side_effect = get
+        return requested_urls
+
+    def test_resolve_with_bulk_endpoint(self):
+        self.session.post.return_value = _response(dict(
+            summary=dict(requested=3, resolved=2, unresolved=1),
+            resolved_drs_object=[_object_info('obj-1'), _object_info('obj-2')],
+            unresolved_drs_objects=[dict(error_code=404, object_ids=['obj-3'])],
+        ))
+        requested_urls = self._serve_single_objects()
+
+        blobs = self.client.get_blobs(['obj-1', 'obj-2', 'drs://drs.faux.dnastack.com/obj-3'])
+
+        self.session.post.assert_called_once()
+        self.assertEqual(f'{SERVER_URL}objects', self.session.post.call_args.args[0])
+        self.assertEqual({'obj-1', 'obj-2', 'obj-3'},
+                         set(self.session.post.call_args.kwargs['json']['bulk_object_ids']))
+
+        # The objects missing from the bulk response are requested individually.
+        self.assertEqual([f'{SERVER_URL}objects/obj-3'], requested_urls)
+
+        # The resolved objects are reused by the blobs.
+        self.assertEqual('obj-1', blobs['obj-1'].drs_object.id)
+        self.assertEqual('obj-3', blobs['drs://drs.faux.dnastack.com/obj-3'].drs_object.id)
+        self.assertEqual([f'{SERVER_URL}objects/obj-3'], requested_urls)
+
+    def test_fall_back_to_concurrent_requests(self):
+        self.session.post.side_effect = ClientError(_response({}, status_code=405))
+        requested_urls = self._serve_single_objects()
+
+        resolved_objects = self.client.resolve_objects(['obj-1', 'obj-2'])
+        self.assertEqual({'obj-1', 'obj-2'}, set(resolved_objects.keys()))
+        self.assertEqual({f'{SERVER_URL}objects/obj-1', f'{SERVER_URL}objects/obj-2'}, set(requested_urls))
+
+        # The lack of support is remembered.
+        self.client.resolve_objects(['obj-3', 'obj-4'])
+        self.assertEqual(1, self.session.post.call_count)
+
+    def test_fall_back_on_failed_batch(self):
+        self.session.post.side_effect = ServerError(_response({}, status_code=503))
+        requested_urls = self._serve_single_objects()
+
+        resolved_objects = self.client.resolve_objects(['obj-1', 'obj-2'])
+        self.assertEqual({'obj-1', 'obj-2'}, set(resolved_objects.keys()))
+        self.assertEqual({f'{SERVER_URL}objects/obj-1', f'{SERVER_URL}objects/obj-2'}, set(requested_urls))
+
+        # The server still supports the bulk endpoint.
+        self.client.resolve_objects(['obj-3', 'obj-4'])
+        self.assertEqual(2, self.session.post.call_count)
+
+    def test_fall_back_on_malformed_object(self):
+        self.session.post.return_value = _response(dict(
+            resolved_drs_object=[_object_info('obj-1'), dict(id='obj-2', size='invalid')],
+        ))
+        requested_urls = self._serve_single_objects()
+
+        resolved_objects = self.client.resolve_objects(['obj-1', 'obj-2'])
+        self.assertEqual({'obj-1', 'obj-2'}, set(resolved_objects.keys()))
+
+        # Only the malformed object is requested individually.
+        self.assertEqual([f'{SERVER_URL}objects/obj-2'], requested_urls)
+
+    def test_fall_back_on_connection_error(self):
+        self.session.post.side_effect = requests.exceptions.ConnectionError('Connection reset')
+        requested_urls = self._serve_single_objects()
+        original_get = self.session.get.side_effect
+
+        def get(url, **kwargs):
+            if url.endswith('/obj-2'):
+                raise requests.exceptions.ReadTimeout('Read timed out')
+            return original_get(url, **kwargs)
+
+        self.session.get.side_effect = get
+
+        resolved_objects = self.client.resolve_objects(['obj-1', 'obj-2', 'obj-3'])
+
+        # The object which cannot be fetched individually either is left out.
+        self.assertEqual({'obj-1', 'obj-3'}, set(resolved_objects.keys()))
+        self.assertEqual({f'{SERVER_URL}objects/obj-1', f'{SERVER_URL}objects/obj-3'}, set(requested_urls))
+
+        # The server still supports the bulk endpoint.
+        self.client.resolve_objects(['obj-4', 'obj-5'])
+        self.assertEqual(2, self.session.post.call_count)
+
+    def test_access_url_is_resolved_once_per_object(self):
+        requested_urls = self._serve_single_objects()
+
+        with self.client.get_blob('obj-1') as blob:
+            self.assertEqual('obj-1', blob.name)
+            self.assertEqual('https://storage/obj-1?token=x', blob.get_download_url())
+
+        with self.client.get_blob('obj-1') as blob:
+            self.assertEqual('https://storage/obj-1?token=x', blob.get_download_url())
+
+        self.assertEqual([f'{SERVER_URL}objects/obj-1', f'{SERVER_URL}objects/obj-1/access/access-1'], requested_urls)
+
+    def test_refresh_access_url(self):
+        requested_urls = self._serve_single_objects()
+        blob = self.client.get_blob('obj-1')
+
+        blob.get_access_url_object()
+        blob.get_access_url_object(refresh=True)
+
+        self.assertEqual(4, len(requested_urls))
@@ -1,7 +1,11 @@
 """Unit tests for EWesClient methods"""
+import threading
 import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from unittest.mock import Mock, patch, MagicMock
 
+import requests
+
 from dnastack.client.workbench.ewes.client import EWesClient
 from dnastack.client.workbench.ewes.models import SimpleSample, ExtendedRunStatus
 from dnastack.client.models import ServiceEndpoint
@@ -81,3 +85,48 @@ class TestEWesClientUpdateRunSamples(unittest.TestCase):
 
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestEWesClientStreamLogUrl(unittest.TestCase):
+    """Unit tests for EWesClient.stream_log_url method"""
+
+    def test_first_chunk_arrives_before_the_rest_of_the_logs(self):
+        first_chunk_received = threading.Event()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for line in [b'line 1\n', b'line 2\n']:
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+                    self.wfile.flush()
+                    # The next line is only sent after the client received the previous one (or after a while).
+                    first_chunk_received.wait(5)
+                self.wfile.write(b'0\r\n\r\n')
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        session = MagicMock()
+        session.__enter__ = Mock(return_value=session)
+        session.__exit__ = Mock(return_value=False)
+        session.get.side_effect = lambda url, params, stream, trace_context: requests.get(url, params=params,
+                                                                                           stream=stream)
+
+        client = EWesClient(ServiceEndpoint(url=f'http://127.0.0.1:{server.server_port}/'), 'test-namespace')
+        chunks = []
+        with patch.object(client, 'create_http_session', return_value=session):
+            for chunk in client.stream_log_url('logs', max_bytes=None, offset=None):
+                chunks.append((chunk, first_chunk_received.is_set()))
+                first_chunk_received.set()
+
+        self.assertEqual((b'line 1\n', False), chunks[0])
+        self.assertEqual(b'line 1\nline 2\n', b''.join(chunk for chunk, _ in chunks))
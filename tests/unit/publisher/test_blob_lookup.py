@@ -0,0 +1,57 @@
+import re
+from unittest.mock import MagicMock
+
+from dnastack.alpha.app.publisher_helper.collection_service import BlobApiMixin
+from dnastack.client.collections.model import Collection
+
+
+class FakeSearchOperation:
+    def __init__(self, rows):
+        self.__rows = rows
+
+    def to_list(self):
+        return self.__rows
+
+
+class FakeCollection(BlobApiMixin):
+    BLOB_LOOKUP_CHUNK_SIZE = 2
+
+    def __init__(self, items):
+        self._collection = Collection(name='test', slugName='test', itemsQuery='SELECT * FROM items')
+        self._no_auth = False
+        self._drs = MagicMock()
+        self._drs.get_blobs.side_effect = lambda ids, no_auth: {id: f'blob:{id}' for id in ids}
+        self.items = items
+        self.queries = []
+
+    def query(self, query: str):
+        self.queries.append(query)
+        column_name, values = re.search(r'WHERE (\w+) IN \((.+)\)$', query).groups()
+        values = [v[1:-1].replace("''", "'") for v in values.split(', ')]
+        return FakeSearchOperation([item for item in self.items if item[column_name] in values])
+
+
+def _items():
+    return [dict(id=f'id-{i}', name=f"file-{i}'s.txt") for i in range(5)]
+
+
+class TestBlobLookup:
+
+    def test_look_up_names_in_chunks(self):
+        collection = FakeCollection(_items())
+
+        blobs = collection.blobs(names=["file-0's.txt", "file-3's.txt", "file-4's.txt", 'unknown', "file-0's.txt"])
+
+        assert blobs == {"file-0's.txt": 'blob:id-0', "file-3's.txt": 'blob:id-3', "file-4's.txt": 'blob:id-4'}
+        assert len(collection.queries) == 2
+        assert "WHERE name IN ('file-0''s.txt', 'file-3''s.txt')" in collection.queries[0]
+
+        # The DRS objects are resolved in bulk.
+        collection._drs.get_blobs.assert_called_once()
+
+    def test_look_up_ids(self):
+        collection = FakeCollection(_items())
+
+        assert collection.blobs(ids=['id-1', 'id-2', 'id-9']) == {'id-1': 'blob:id-1', 'id-2': 'blob:id-2'}
+        assert collection.blob(name="file-2's.txt") == 'blob:id-2'
+        assert collection.blob(id='id-9') is None
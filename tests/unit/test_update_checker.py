@@ -257,6 +257,69 @@ class TestCheckForUpdate:
             assert result.latest_version == "3.2.0"
 
 
+class TestBackgroundRefresh:
+    """Tests for refreshing the cache without blocking the current command."""
+
+    def test_stale_cache_refreshed_in_background(self, tmp_path):
+        cache_file = tmp_path / UPDATE_CHECK_CACHE_FILENAME
+        cache_file.write_text(json.dumps({"latest_version": "3.2.0", "last_checked": "2020-01-01T00:00:00Z"}))
+
+        with patch("dnastack.update_checker.__version__", "3.1.0"), \
+             patch("dnastack.update_checker._get_cache_path", return_value=str(cache_file)), \
+             patch("dnastack.update_checker._get_latest_stable_version") as mock_fetch, \
+             patch("dnastack.update_checker.subprocess.Popen") as mock_popen:
+            result = check_for_update(force=False, refresh_in_background=True)
+
+        mock_fetch.assert_not_called()
+        mock_popen.assert_called_once()
+        assert mock_popen.call_args.kwargs["start_new_session"] is True
+        assert result.update_available is True
+        assert result.latest_version == "3.2.0"
+
+    def test_missing_cache_refreshed_in_background(self, tmp_path):
+        cache_file = tmp_path / UPDATE_CHECK_CACHE_FILENAME
+
+        with patch("dnastack.update_checker._get_cache_path", return_value=str(cache_file)), \
+             patch("dnastack.update_checker._get_latest_stable_version") as mock_fetch, \
+             patch("dnastack.update_checker.subprocess.Popen") as mock_popen:
+            result = check_for_update(force=False, refresh_in_background=True)
+
+        mock_fetch.assert_not_called()
+        mock_popen.assert_called_once()
+        assert result.update_available is False
+
+    def test_fresh_cache_does_not_start_refresh(self, tmp_path):
+        cache_file = str(tmp_path / UPDATE_CHECK_CACHE_FILENAME)
+        _write_cache(cache_file, "3.2.0")
+
+        with patch("dnastack.update_checker._get_cache_path", return_value=cache_file), \
+             patch("dnastack.update_checker.subprocess.Popen") as mock_popen:
+            check_for_update(force=False, refresh_in_background=True)
+
+        mock_popen.assert_not_called()
+
+    def test_refresh_attempts_are_throttled(self, tmp_path):
+        cache_file = tmp_path / UPDATE_CHECK_CACHE_FILENAME
+
+        with patch("dnastack.update_checker._get_cache_path", return_value=str(cache_file)), \
+             patch("dnastack.update_checker.subprocess.Popen") as mock_popen:
+            for _ in range(3):
+                check_for_update(force=False, refresh_in_background=True)
+
+        mock_popen.assert_called_once()
+
+    def test_notification_does_not_query_pypi(self, tmp_path):
+        cache_file = tmp_path / UPDATE_CHECK_CACHE_FILENAME
+
+        with patch("dnastack.update_checker._is_suppressed", return_value=False), \
+             patch("dnastack.update_checker._get_cache_path", return_value=str(cache_file)), \
+             patch("dnastack.update_checker._get_latest_stable_version") as mock_fetch, \
+             patch("dnastack.update_checker.subprocess.Popen"):
+            notify_if_update_available()
+
+        mock_fetch.assert_not_called()
+
+
 class TestNotifyIfUpdateAvailable:
     """Tests for the stderr notification function."""
 
@@ -0,0 +1,16 @@
+from typing import List
+
+
+class FakeClock:
+    """ Manually advanced clock, used as both the clock (by calling it) and the sleeper ("sleep") of the code """
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, duration: float):
+        self.sleeps.append(duration)
+        self.now += duration